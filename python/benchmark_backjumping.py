@@ -0,0 +1,49 @@
+import sys
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+from benchmark_dominios import roster_sintetico
+
+# Benchmark do backjumping dirigido por conflitos (CBJ) com e sem aprendizado de nogoods,
+# contra o retrocesso cronológico, contando todas as soluções.
+# Uso: python benchmark_backjumping.py [max_jogadores]
+
+MODOS = (
+    ("cronológico", {}),
+    ("CBJ", {"backjumping": True}),
+    ("CBJ + nogoods", {"backjumping": True, "nogoods": 1000}),
+)
+
+# Elenco sintético com três jogadores a mais numa mesma posição (J_Z1..J_Z3, últimos pela ordem de nome).
+# Só com os arcos par a par da C7 (c7_global=False) a inviabilidade aparece apenas no fundo da árvore,
+# e o retrocesso cronológico refaz a mesma falha para cada combinação dos jogadores anteriores.
+def roster_com_trinca(n, semente=0):
+    dados = roster_sintetico(n, semente)
+    for j in ("J_Z1", "J_Z2", "J_Z3"):
+        dados["jogadores"][j] = ["T1", "T2"]
+        dados["overais"][j] = "75"
+        dados["posicoes"][j] = "posZ"
+    return dados
+
+def medir(dados, **opcoes):
+    inicio = time.perf_counter()
+    contagem, stats = com_ac3.contar_solucoes(dados, **opcoes)
+    return time.perf_counter() - inicio, contagem, stats
+
+def main(max_jogadores=24):
+    casos = []
+    for n in range(12, max_jogadores + 1, 4):
+        casos.append((f"sintético {n}", roster_sintetico(n), {}))
+        casos.append((f"sintético {n} C8=78", dict(roster_sintetico(n), limite=78), {}))
+        casos.append((f"trinca {n}", roster_com_trinca(n), {"c7_global": False}))
+
+    print(f"{'instância':>20} {'modo':>14} {'soluções':>9} {'nós':>8} {'retroc.':>8} {'saltos':>7} {'pulados':>8} "
+          f"{'nogoods':>8} {'podas':>6} {'tempo (s)':>10}")
+    for nome, dados, extra in casos:
+        for modo, opcoes in MODOS:
+            t, contagem, stats = medir(dados, **extra, **opcoes)
+            print(f"{nome:>20} {modo:>14} {contagem:>9} {stats['nodes']:>8} {stats['retrocessos']:>8} {stats['saltos']:>7} "
+                  f"{stats['niveis_pulados']:>8} {stats['nogoods_aprendidos']:>8} {stats['nogoods_podas']:>6} {t:>10.4f}")
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,74 @@
+import random
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+import psr_python_trab_sem_ac3 as sem_ac3 # Versão antiga: C7 com arcos para cada par e verificação O(n²)
+
+# Benchmark da C7: índice por posição + restrição global (com_ac3) x pares de arcos e laço duplo (sem_ac3)
+# em elencos sintéticos de 1k a 50k jogadores.
+
+# As versões O(n²) só rodam até este tamanho (acima disso levam minutos)
+MAX_JOGADORES_QUADRATICO = 5000
+
+# Elenco sintético com uma solução conhecida: cada posição tem um jogador do T1 e um do T2,
+# e J1..J5 respeitam C2, C3, C5 e C6. Retorna (dados, solucao)
+def roster_pareado(n, semente=0):
+    rnd = random.Random(semente)
+    solucao = {"J1": "T2", "J2": "T1", "J3": "T2", "J4": "T2", "J5": "T1"}
+    t1 = 2
+    for i in range(6, n + 1):
+        t = "T1" if t1 * 2 < len(solucao) + 1 else "T2" # Mantém os times balanceados (C1)
+        solucao[f"J{i}"] = t
+        t1 += t == "T1"
+    time1 = [j for j, t in solucao.items() if t == "T1"]
+    time2 = [j for j, t in solucao.items() if t == "T2"]
+    rnd.shuffle(time1)
+    rnd.shuffle(time2)
+    posicoes = {}
+    for i, j in enumerate(time1):
+        posicoes[j] = f"pos{i}"
+    for i, j in enumerate(time2):
+        posicoes[j] = f"pos{i}"
+    dados = {
+        "jogadores": {j: (["T1"] if j == "J5" else ["T1", "T2"]) for j in solucao},
+        "overais": {j: str(rnd.randint(60, 90)) for j in solucao},
+        "posicoes": posicoes,
+        "restricoes": {"C1": "", "C2": "", "C3": "", "C4": "", "C5": "", "C6": "", "C7": ""},
+    }
+    return dados, solucao
+
+def cronometrar(fn, *args):
+    inicio = time.perf_counter()
+    resultado = fn(*args)
+    return time.perf_counter() - inicio, resultado
+
+def main(tamanhos=(1000, 5000, 10000, 50000), tempo_maximo=20.0):
+    print(f"{'jogadores':>10} {'pares (s)':>10} {'grupos (s)':>11} {'verif. O(n²)':>13} {'verif. O(n)':>12} "
+          f"{'inviável (s)':>13} {'1ª solução (s)':>15} {'nós':>7}")
+    for n in tamanhos:
+        dados, solucao = roster_pareado(n)
+        lista_ordenada = sorted(dados["jogadores"])
+        quadratico = n <= MAX_JOGADORES_QUADRATICO
+
+        t_pares = cronometrar(sem_ac3.construir_restricoes_binarias, lista_ordenada, dados["posicoes"])[0] if quadratico else None
+        t_grupos = cronometrar(com_ac3.RestricaoPosicao, lista_ordenada, dados["posicoes"])[0]
+        t_verif_antiga, ok_antiga = cronometrar(sem_ac3.verificacao_final, solucao, dados) if quadratico else (None, True)
+        t_verif, ok = cronometrar(com_ac3.verificacao_final, solucao, dados)
+        assert ok and ok_antiga
+
+        # Três jogadores na mesma posição: inviável com dois times, detectado antes da busca
+        inviavel = dict(dados, posicoes=dict(dados["posicoes"], J5=dados["posicoes"]["J1"], J2=dados["posicoes"]["J1"]))
+        stats_inviavel = {}
+        t_inviavel = cronometrar(lambda: list(com_ac3.iter_solucoes(inviavel, stats=stats_inviavel)))[0]
+        assert stats_inviavel["solutions"] == 0 and stats_inviavel["nodes"] == 0
+
+        stats = {}
+        t_primeira = cronometrar(lambda: list(com_ac3.iter_solucoes(dados, max_solucoes=1, tempo_maximo=tempo_maximo, stats=stats)))[0]
+        primeira = f"{t_primeira:.4f}" if stats["solutions"] else f"> {tempo_maximo:.0f}"
+
+        fmt = lambda t: "-" if t is None else f"{t:.4f}"
+        print(f"{n:>10} {fmt(t_pares):>10} {t_grupos:>11.4f} {fmt(t_verif_antiga):>13} {t_verif:>12.5f} "
+              f"{t_inviavel:>13.4f} {primeira:>15} {stats['nodes']:>7}")
+
+if __name__ == "__main__":
+    main()
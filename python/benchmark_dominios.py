@@ -0,0 +1,77 @@
+import random
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+import psr_python_trab_sem_ac3 as sem_ac3 # Versão antiga: domínios em dict de listas copiados a cada nó
+
+# Benchmark: domínios em máscaras de bits com trilha (com_ac3) x dict de listas copiado a cada valor (sem_ac3)
+
+# Gera um elenco sintético no mesmo formato do JSON, com as posições em pares (C7 satisfazível com 2 times) e o
+# limite da C8 dois pontos acima da média geral
+def roster_sintetico(n, semente=0):
+    rnd = random.Random(semente)
+    jogadores = [f"J{i}" for i in range(1, n + 1)]
+    while True:
+        ordem = jogadores[:]
+        rnd.shuffle(ordem)
+        posicoes = {j: f"pos{i // 2}" for i, j in enumerate(ordem)}
+        if posicoes["J3"] != posicoes["J4"]: # C3 exige J3 e J4 juntos, então não podem dividir posição
+            break
+    overais = {j: str(rnd.randint(60, 90)) for j in jogadores}
+    return {
+        "jogadores": {j: (["T1"] if j == "J5" else ["T1", "T2"]) for j in jogadores},
+        "overais": overais,
+        "posicoes": posicoes,
+        "limite": {"numero": str(round(sum(int(o) for o in overais.values()) / n + 2, 2))},
+        "restricoes": {"C1": "", "C2": "", "C3": "", "C4": "", "C5": "", "C6": "", "C7": "", "C8": ""},
+    }
+
+# Custo médio de um forward checking (copiando o dict) x forward checking na trilha + desfazer
+def medir_forward_checking(n, repeticoes=200):
+    dados = roster_sintetico(n)
+    lista_ordenada = sorted(dados["jogadores"].keys())
+    restricoes, vizinhos, _ = com_ac3.construir_restricoes_binarias(lista_ordenada, dados["posicoes"])
+    listas = {v: list(dados["jogadores"][v]) for v in lista_ordenada}
+    bitset = com_ac3.DominiosBitset(listas)
+    variaveis = [v for v in lista_ordenada if len(listas[v]) == 2]
+
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        sem_ac3.forward_checking(listas, variaveis[i % len(variaveis)], "T1", restricoes)
+    t_listas = (time.perf_counter() - inicio) / repeticoes
+
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        marca = bitset.marca()
+        com_ac3.forward_checking(bitset, variaveis[i % len(variaveis)], "T1", restricoes, vizinhos)
+        bitset.desfazer(marca)
+    t_bitset = (time.perf_counter() - inicio) / repeticoes
+    return t_listas, t_bitset
+
+# Busca completa (MRV + LCV + FC) nas duas versões, conferindo que acham as mesmas soluções
+def medir_busca(n):
+    dados = roster_sintetico(n)
+    inicio = time.perf_counter()
+    sol_listas, stats_listas = sem_ac3.backtracking_solver_sem_ac3(dados)
+    t_listas = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    sol_bitset, stats_bitset = com_ac3.backtracking_solver_com_ac3(dados, propagar_globais=False) # Mesma busca da versão antiga, só muda o domínio
+    t_bitset = time.perf_counter() - inicio
+    iguais = sorted(map(sorted, (s.items() for s in sol_listas))) == sorted(map(sorted, (s.items() for s in sol_bitset)))
+    return t_listas, t_bitset, stats_bitset["nodes"], len(sol_bitset), iguais
+
+def main():
+    print("-- Forward checking por nó (média) --")
+    print(f"{'jogadores':>10} {'listas (s)':>14} {'bitset (s)':>14} {'ganho':>8}")
+    for n in (10, 50, 100, 500, 1000):
+        t_listas, t_bitset = medir_forward_checking(n)
+        print(f"{n:>10} {t_listas:>14.8f} {t_bitset:>14.8f} {t_listas / t_bitset:>7.1f}x")
+
+    print("\n-- Busca completa (todas as soluções) --")
+    print(f"{'jogadores':>10} {'listas (s)':>14} {'bitset (s)':>14} {'nós':>8} {'soluções':>9} {'iguais':>7}")
+    for n in (10, 16, 20, 24):
+        t_listas, t_bitset, nos, qtd, iguais = medir_busca(n)
+        print(f"{n:>10} {t_listas:>14.6f} {t_bitset:>14.6f} {nos:>8} {qtd:>9} {str(iguais):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+import psr_paralelo
+import psr_python_trab_com_ac3 as com_ac3
+from benchmark_dominios import roster_sintetico
+
+# Benchmark de escalabilidade do solver paralelo: conta as soluções de um elenco sintético com 1..N processos
+# Uso: python benchmark_paralelo.py [jogadores] [max_trabalhadores]
+
+def main(n_jogadores=32, max_trabalhadores=None):
+    max_trabalhadores = max_trabalhadores or os.cpu_count() or 1
+    dados = roster_sintetico(n_jogadores)
+
+    inicio = time.perf_counter()
+    esperado, stats_seq = com_ac3.contar_solucoes(dados)
+    t_seq = time.perf_counter() - inicio
+    print(f"Sequencial: {esperado} soluções, {stats_seq['nodes']} nós, {t_seq:.4f} s\n")
+
+    print(f"{'processos':>10} {'tempo (s)':>10} {'speedup':>8} {'eficiência':>11} {'tarefas':>8} {'redivisões':>11} {'nós':>9} {'ok':>4}")
+    trabalhadores = 1
+    while True:
+        inicio = time.perf_counter()
+        contagem, stats = psr_paralelo.resolver_paralelo(dados, trabalhadores=trabalhadores, apenas_contar=True, nos_por_tarefa=2000)
+        t = time.perf_counter() - inicio
+        print(f"{trabalhadores:>10} {t:>10.4f} {t_seq / t:>7.2f}x {t_seq / t / trabalhadores:>10.0%} {stats['tarefas']:>8} "
+              f"{stats['redivisoes']:>11} {stats['nodes']:>9} {str(contagem == esperado):>4}")
+        if trabalhadores >= max_trabalhadores:
+            break
+        trabalhadores = min(trabalhadores * 2, max_trabalhadores)
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import psr_python_trab_com_ac3 as com_ac3
+import psr_python_trab_sem_ac3 as sem_ac3
+from gerador_instancias import gerar_suite
+
+# Suíte de benchmark: roda cada motor em cada instância (JSONs de exemplo + instâncias geradas com semente),
+# com aquecimento e repetições cronometradas por perf_counter, e grava os resultados em JSON e/ou CSV.
+# Dois arquivos de resultado podem ser comparados para detectar regressões de tempo, nós ou soluções.
+# Uso:
+#   python benchmark_suite.py rodar [--saida resultados.json] [--csv resultados.csv] [--repeticoes 5] ...
+#   python benchmark_suite.py comparar base.json novo.json [--tolerancia 0.10]
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Motores comparados: nome -> função(dados) que retorna (soluções, stats) como os backtracking_solver_*.
+# Novos motores entram aqui.
+MOTORES = {
+    "com_ac3": com_ac3.backtracking_solver_com_ac3,
+    "sem_ac3": sem_ac3.backtracking_solver_sem_ac3,
+    "com_ac3_rm": lambda dados: com_ac3.backtracking_solver_com_ac3(dados, propagacao="ac3rm"),
+    "com_ac3_cbj": lambda dados: com_ac3.backtracking_solver_com_ac3(dados, backjumping=True, nogoods=1000),
+    "com_ac3_sac": lambda dados: com_ac3.backtracking_solver_com_ac3(dados, consistencia=("unaria", "sac")),
+    # Enumeração em blocos (psr_enumeracao) quando a instância cabe; senão cai na busca
+    "enumeracao": lambda dados: com_ac3.backtracking_solver_com_ac3(dados, enumeracao="auto"),
+}
+
+# Colunas do CSV (mesmas chaves dos registros do JSON)
+CAMPOS = ("instancia", "motor", "jogadores", "repeticoes", "tempo_min", "tempo_mediana", "tempo_media", "tempo_desvio",
+          "solucoes", "nos", "retrocessos", "pico_memoria", "nos_por_segundo", "solucoes_por_segundo", "erro")
+
+# Instâncias de exemplo do repositório (facil.json, medio.json, dificil.json)
+def instancias_exemplo():
+    instancias = []
+    for nome in ("facil", "medio", "dificil"):
+        caminho = os.path.join(DIRETORIO, f"{nome}.json")
+        if os.path.exists(caminho):
+            with open(caminho) as arquivo:
+                instancias.append((nome, json.load(arquivo)))
+    return instancias
+
+# Mede um motor numa instância
+# Roda `aquecimento` vezes sem medir, `repeticoes` vezes cronometrando e uma vez com tracemalloc para o pico de memória
+# (separada, porque o tracemalloc deixa a execução bem mais lenta).
+# Retorna o registro com as métricas (ou com "erro" preenchido se o motor falhar)
+def medir(nome_instancia, dados, nome_motor, repeticoes=5, aquecimento=1):
+    motor = MOTORES[nome_motor]
+    registro = {campo: None for campo in CAMPOS}
+    registro.update({"instancia": nome_instancia, "motor": nome_motor, "jogadores": len(dados["jogadores"]),
+                     "repeticoes": repeticoes})
+    try:
+        for _ in range(aquecimento):
+            motor(dados)
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            solucoes, stats = motor(dados)
+            tempos.append(time.perf_counter() - inicio)
+        tracemalloc.start()
+        try:
+            motor(dados)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as erro: # Ex.: motor de dois times numa instância com k times
+        registro["erro"] = f"{type(erro).__name__}: {erro}"
+        return registro
+
+    mediana = statistics.median(tempos)
+    registro.update({
+        "tempo_min": min(tempos),
+        "tempo_mediana": mediana,
+        "tempo_media": statistics.fmean(tempos),
+        "tempo_desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        "solucoes": len(solucoes),
+        "nos": stats["nodes"],
+        "retrocessos": stats["retrocessos"],
+        "pico_memoria": pico,
+        "nos_por_segundo": stats["nodes"] / mediana if mediana > 0 else None,
+        "solucoes_por_segundo": len(solucoes) / mediana if mediana > 0 else None,
+    })
+    return registro
+
+# Roda todos os motores em todas as instâncias
+# Retorna {"ambiente": {...}, "resultados": [registros]}
+def rodar(instancias, motores=None, repeticoes=5, aquecimento=1, progresso=True):
+    motores = motores or list(MOTORES)
+    resultados = []
+    for nome_instancia, dados in instancias:
+        for nome_motor in motores:
+            registro = medir(nome_instancia, dados, nome_motor, repeticoes, aquecimento)
+            resultados.append(registro)
+            if progresso:
+                if registro["erro"]:
+                    print(f"{nome_instancia:>14} {nome_motor:>12}  erro: {registro['erro']}")
+                else:
+                    print(f"{nome_instancia:>14} {nome_motor:>12} {registro['tempo_mediana']:>11.6f} s {registro['nos']:>8} nós "
+                          f"{registro['solucoes']:>7} soluções {registro['pico_memoria'] / 1024:>9.1f} KiB")
+    ambiente = {
+        "python": platform.python_version(),
+        "implementacao": platform.python_implementation(),
+        "sistema": platform.platform(),
+        "processador": platform.processor(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeticoes": repeticoes,
+        "aquecimento": aquecimento,
+    }
+    return {"ambiente": ambiente, "resultados": resultados}
+
+def salvar_json(resultado, caminho):
+    with open(caminho, "w") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+def salvar_csv(resultado, caminho):
+    with open(caminho, "w", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS)
+        escritor.writeheader()
+        for registro in resultado["resultados"]:
+            escritor.writerow(registro)
+
+# Lê resultados salvos em JSON ou CSV. Retorna {(instancia, motor): registro}
+def carregar(caminho):
+    if caminho.endswith(".csv"):
+        with open(caminho, newline="") as arquivo:
+            registros = []
+            for linha in csv.DictReader(arquivo):
+                for campo in ("tempo_mediana", "nos", "solucoes"):
+                    linha[campo] = float(linha[campo]) if linha[campo] else None
+                linha["erro"] = linha["erro"] or None
+                registros.append(linha)
+    else:
+        with open(caminho) as arquivo:
+            registros = json.load(arquivo)["resultados"]
+    return {(r["instancia"], r["motor"]): r for r in registros}
+
+# Compara dois arquivos de resultado (base x novo), casando por (instância, motor)
+# tolerancia: aumento relativo da mediana de tempo aceito antes de acusar regressão (0.10 = 10%)
+# Retorna lista de (instancia, motor, motivo) das regressões. Soluções diferentes, mais nós ou um erro novo
+# sempre contam como regressão
+def comparar(base, novo, tolerancia=0.10):
+    regressoes = []
+    for chave in sorted(set(base) & set(novo)):
+        antes, depois = base[chave], novo[chave]
+        if depois["erro"] and not antes["erro"]:
+            regressoes.append((*chave, f"passou a falhar: {depois['erro']}"))
+            continue
+        if antes["erro"] or depois["erro"]:
+            continue
+        if antes["solucoes"] != depois["solucoes"]:
+            regressoes.append((*chave, f"soluções {antes['solucoes']} -> {depois['solucoes']}"))
+        if depois["nos"] > antes["nos"]:
+            regressoes.append((*chave, f"nós {antes['nos']} -> {depois['nos']}"))
+        if antes["tempo_mediana"] and depois["tempo_mediana"] > antes["tempo_mediana"] * (1 + tolerancia):
+            regressoes.append((*chave, f"tempo {antes['tempo_mediana']:.6f} -> {depois['tempo_mediana']:.6f} s "
+                                       f"({depois['tempo_mediana'] / antes['tempo_mediana']:.2f}x)"))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos solvers do PSR de divisão de times")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_rodar = comandos.add_parser("rodar", help="roda a suíte e grava os resultados")
+    p_rodar.add_argument("--saida", default="resultados_benchmark.json", help="arquivo JSON de saída")
+    p_rodar.add_argument("--csv", default=None, help="também grava em CSV")
+    p_rodar.add_argument("--motores", nargs="+", choices=sorted(MOTORES), default=None)
+    p_rodar.add_argument("--tamanhos", nargs="+", type=int, default=[8, 12, 16, 20])
+    p_rodar.add_argument("--sementes", nargs="+", type=int, default=[0, 1])
+    p_rodar.add_argument("--repeticoes", type=int, default=5)
+    p_rodar.add_argument("--aquecimento", type=int, default=1)
+
+    p_comparar = comandos.add_parser("comparar", help="compara dois arquivos de resultado")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("novo")
+    p_comparar.add_argument("--tolerancia", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.comando == "rodar":
+        instancias = instancias_exemplo() + gerar_suite(args.tamanhos, args.sementes)
+        resultado = rodar(instancias, args.motores, args.repeticoes, args.aquecimento)
+        salvar_json(resultado, args.saida)
+        if args.csv:
+            salvar_csv(resultado, args.csv)
+        return 0
+
+    regressoes = comparar(carregar(args.base), carregar(args.novo), args.tolerancia)
+    for instancia, motor, motivo in regressoes:
+        print(f"REGRESSÃO {instancia} [{motor}]: {motivo}")
+    if not regressoes:
+        print("Sem regressões")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
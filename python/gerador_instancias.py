@@ -0,0 +1,103 @@
+import json
+import random
+import sys
+
+# Gerador de instâncias (elencos) no mesmo esquema JSON de facil.json / medio.json / dificil.json.
+# A mesma semente sempre gera a mesma instância, então os benchmarks podem ser repetidos em qualquer máquina.
+# Uso: python gerador_instancias.py jogadores [semente] [saida.json]
+
+# Textos das restrições como nos JSONs de exemplo (o solver só olha as chaves)
+TEXTOS_RESTRICOES = {
+    "C1": "{j | Vj=T1}| = |{j | Vj=T2}| +- 1",
+    "C2": "V1 != V2",
+    "C3": "V3 = V4",
+    "C4": "Minimo 2 jogadores por time",
+    "C5": "V5 != T2",
+    "C6": "Se V3 = V4 = T1 entao V1 = T2",
+    "C7": "Jogadores na mesma posicao nao podem estar no mesmo time (opcional)",
+    "C8": "Media de overais por time nao pode ultrapassar limite (opcional)",
+}
+
+# n: número de jogadores (J1..Jn, mínimo 5 por causa de C2, C3, C5 e C6)
+# semente: semente do gerador aleatório
+# densidade_posicoes: fração dos jogadores que dividem posição com outro (0 = todas distintas, 1 = todos em duplas)
+# por_posicao: quantos jogadores no máximo em cada posição repetida (acima de 2 a C7 fica inviável com dois times)
+# fracao_restritos: fração dos jogadores (fora J5, que já não pode ir para o T2) com domínio de um time só
+# limite: limite da C8 (média máxima de overall por time); folga_limite: limite = média geral + folga
+#        (use um dos dois; None nos dois = sem C8)
+# c7: inclui a restrição de posição
+# overall_min, overall_max: faixa dos overais sorteados
+# times: quantidade de times (acima de 2 a instância ganha dados["times"] com T1..Tk; ver LimitesTimes)
+# Retorna: dicionário no formato dos JSONs de entrada
+def gerar_instancia(n, semente=0, densidade_posicoes=0.5, por_posicao=2, fracao_restritos=0.0, limite=None,
+                    folga_limite=None, c7=True, overall_min=60, overall_max=90, times=2):
+    if n < 5:
+        raise ValueError("São necessários pelo menos 5 jogadores (C2, C3, C5 e C6 usam J1..J5)")
+    rnd = random.Random(semente)
+    jogadores = [f"J{i}" for i in range(1, n + 1)]
+    nomes_times = [f"T{i}" for i in range(1, times + 1)]
+
+    dominios = {}
+    for j in jogadores:
+        if j == "J5":
+            dominios[j] = [t for t in nomes_times if t != "T2"]
+        elif rnd.random() < fracao_restritos:
+            dominios[j] = [rnd.choice(nomes_times)]
+        else:
+            dominios[j] = nomes_times[:]
+
+    overais = {j: str(rnd.randint(overall_min, overall_max)) for j in jogadores}
+
+    # Jogadores que dividem posição entram em grupos de até por_posicao; os demais ganham posição própria
+    ordem = jogadores[:]
+    rnd.shuffle(ordem)
+    repetidos = int(round(densidade_posicoes * n))
+    posicoes = {}
+    for i, j in enumerate(ordem[:repetidos]):
+        posicoes[j] = f"pos{i // max(por_posicao, 1)}"
+    proxima = (repetidos + por_posicao - 1) // max(por_posicao, 1)
+    for i, j in enumerate(ordem[repetidos:]):
+        posicoes[j] = f"pos{proxima + i}"
+
+    restricoes = ["C1", "C2", "C3", "C4", "C5", "C6"] + (["C7"] if c7 else [])
+    if folga_limite is not None:
+        limite = round(sum(int(o) for o in overais.values()) / n + folga_limite, 2)
+    if limite is not None:
+        restricoes.append("C8")
+
+    dados = {
+        "jogadores": {j: dominios[j] for j in jogadores},
+        "overais": overais,
+        "posicoes": {j: posicoes[j] for j in jogadores},
+    }
+    if limite is not None:
+        dados["limite"] = {"numero": str(limite)}
+    if times > 2:
+        dados["times"] = nomes_times
+    dados["restricoes"] = {c: TEXTOS_RESTRICOES[c] for c in restricoes}
+    return dados
+
+# Conjunto de instâncias para o benchmark: para cada tamanho e semente, uma instância sem C8 e uma com C8 apertada.
+# Retorna lista de (nome, dados)
+def gerar_suite(tamanhos=(8, 12, 16, 20), sementes=(0, 1), **opcoes):
+    suite = []
+    for n in tamanhos:
+        for semente in sementes:
+            suite.append((f"n{n}_s{semente}", gerar_instancia(n, semente, **opcoes)))
+            suite.append((f"n{n}_s{semente}_c8", gerar_instancia(n, semente, folga_limite=1.0, **opcoes)))
+    return suite
+
+def main(n, semente=0, saida=None):
+    dados = gerar_instancia(n, semente)
+    texto = json.dumps(dados, indent=2, ensure_ascii=False)
+    if saida is None:
+        print(texto)
+    else:
+        with open(saida, "w") as arquivo:
+            arquivo.write(texto + "\n")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python gerador_instancias.py jogadores [semente] [saida.json]")
+        sys.exit(1)
+    main(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 0, sys.argv[3] if len(sys.argv) > 3 else None)
@@ -0,0 +1,188 @@
+import json
+import time
+
+# Instrumentação da busca (iter_solucoes(..., instrumentacao=Instrumentacao())).
+# Sem instrumentação a busca chama as funções diretamente e só testa "instr is not None" uma vez por nó;
+# com ela, cada fase passa por um invólucro que mede o tempo com perf_counter_ns e marca a origem das podas.
+#
+# Fases (tempos inclusivos: "globais" inclui "C1/C4", "C8" e "C6"):
+#   pre_c5, pre_c7, pre_ac3, pre_globais -> pré-processamento
+#   selecao, lcv, forward_checking, globais, C1/C4, C8, C6, nogoods, verificacao_final -> busca
+# Eventos (callbacks registrados com registrar recebem o dicionário do evento, o mesmo gravado no rastro):
+#   no        {"e": "no", "p": profundidade, "x": variável, "v": valor,       valor sendo testado
+#              "vizinhos": vizinhos e companheiros de posição (C7) que o forward checking percorre}
+#   propagar  {"e": "propagar", "p", "x", "v", "podas": valores removidos,   propagação do valor terminou bem
+#              "origens": {origem: valores removidos}, "esvaziamentos": domínios esvaziados}
+#   falha     {"e": "falha", "p", "x", "v", "podas", "origens", "esvaziamentos",
+#              "conflito": [variáveis]}                                        propagação esvaziou um domínio
+#   solucao   {"e": "solucao", "p", "n": soluções até agora}
+#   retorno   {"e": "retorno", "p", "destino": nível para onde a busca volta} acabaram os valores do nível p
+#   pre       {"e": "pre", "origens", "esvaziamentos"}                         podas fora de um nó (pré-processamento)
+# Os contadores e as podas por origem saem só dos eventos (contabilizar), então reproduzir um rastro refaz o
+# mesmo resumo() da execução ao vivo. Montar os eventos custa: com instrumentação a busca fica ~40% mais lenta, e
+# gravando o rastro, ~2x (medido em gerar_instancia(26, 1, folga_limite=0.5), contando as soluções).
+
+EVENTOS = ("no", "propagar", "falha", "solucao", "retorno", "pre")
+
+class Instrumentacao:
+    # rastro: arquivo texto aberto para escrita; cada evento vira uma linha JSON (JSONL), que pode ser
+    #         lida de volta com ler_rastro e repassada para reproduzir
+    def __init__(self, rastro=None):
+        self.rastro = rastro
+        self.tempos_ns = {} # Fase -> tempo acumulado (ns)
+        self.chamadas = {} # Fase -> quantidade de chamadas
+        self.contadores = {"nos": 0, "falhas": 0, "solucoes": 0, "retornos": 0, "podas_busca": 0,
+                           "profundidade_maxima": 0, "esvaziamentos": 0, "vizinhos_visitados": 0}
+        self.podas = {} # Origem da poda (fase ou tipo de restrição) -> valores removidos
+        self.callbacks = {evento: [] for evento in EVENTOS}
+        self.origem = None # Fase em execução (usada para classificar as podas)
+        self.var_atual = None # Variável do nó em teste
+        self.podas_no = 0 # Valores removidos desde o último nó
+        self.origens = {} # Podas por origem ainda não emitidas em um evento
+        self.esvaziamentos = 0 # Domínios esvaziados ainda não emitidos em um evento
+        self.restricoes = {}
+        self.vizinhos = {}
+        self.c7 = None
+
+    # Registra funcao(evento) para ser chamada a cada evento do tipo dado
+    def registrar(self, evento, funcao):
+        if evento not in self.callbacks:
+            raise ValueError(f"Evento desconhecido: {evento}")
+        self.callbacks[evento].append(funcao)
+
+    # Liga a instrumentação aos domínios e restrições de uma busca (c7: RestricaoPosicao global ou None)
+    def preparar(self, dominios, restricoes, vizinhos, c7=None):
+        self.restricoes = restricoes
+        self.vizinhos = vizinhos
+        self.c7 = c7
+        dominios.observadores.append(self.ao_mudar)
+
+    # Desliga dos domínios; podas feitas fora de um nó (pré-processamento) saem num evento "pre"
+    def encerrar(self, dominios):
+        if self.ao_mudar in dominios.observadores:
+            dominios.observadores.remove(self.ao_mudar)
+        if self.origens or self.esvaziamentos:
+            self.emitir({"e": "pre", **self.pendentes()})
+
+    # Devolve funcao cronometrada na fase dada; as podas feitas lá dentro são contadas para a fase
+    def envolver(self, fase, funcao):
+        tempos, chamadas = self.tempos_ns, self.chamadas
+        tempos.setdefault(fase, 0)
+        chamadas.setdefault(fase, 0)
+        relogio = time.perf_counter_ns
+        def medida(*args):
+            anterior = self.origem
+            self.origem = fase
+            inicio = relogio()
+            try:
+                return funcao(*args)
+            finally:
+                tempos[fase] += relogio() - inicio
+                chamadas[fase] += 1
+                self.origem = anterior
+        return medida
+
+    # Observador dos domínios: conta as podas (o desfazer não conta) e os domínios esvaziados
+    def ao_mudar(self, var, antiga, nova):
+        if nova & ~antiga:
+            return
+        removidos = (antiga & ~nova).bit_count()
+        origem = self.origem or "outra" # Fora de uma fase cronometrada
+        if origem == "forward_checking":
+            origem = self.tipo_poda(var)
+        self.origens[origem] = self.origens.get(origem, 0) + removidos
+        self.podas_no += removidos
+        if not nova:
+            self.esvaziamentos += 1
+
+    # Podas por origem e esvaziamentos desde o último evento que os levou (zera os acumulados)
+    def pendentes(self):
+        campos = {"origens": self.origens, "esvaziamentos": self.esvaziamentos}
+        self.origens = {}
+        self.esvaziamentos = 0
+        return campos
+
+    # Poda do forward checking: restrição binária entre var e a variável atribuída, ou a C7 global
+    def tipo_poda(self, var):
+        if var == self.var_atual:
+            return "atribuicao"
+        restricao = self.restricoes.get((var, self.var_atual))
+        if restricao is not None:
+            return getattr(restricao, "nome", "binaria")
+        return "C7"
+
+    def no(self, p, var, valor):
+        self.var_atual = var
+        self.podas_no = 0
+        vizinhos = len(self.vizinhos.get(var, ()))
+        if self.c7 is not None:
+            vizinhos += len(self.c7.grupo_de.get(var, (var,))) - 1
+        self.emitir({"e": "no", "p": p, "x": var, "v": valor, "vizinhos": vizinhos})
+
+    def propagou(self, p, var, valor):
+        self.emitir({"e": "propagar", "p": p, "x": var, "v": valor, "podas": self.podas_no, **self.pendentes()})
+
+    def falhou(self, p, var, valor, conflito):
+        self.emitir({"e": "falha", "p": p, "x": var, "v": valor, "podas": self.podas_no, **self.pendentes(),
+                     "conflito": list(conflito) if conflito else [var]})
+
+    def solucao(self, p, n):
+        self.emitir({"e": "solucao", "p": p, "n": n})
+
+    def retornou(self, p, destino):
+        self.emitir({"e": "retorno", "p": p, "destino": destino})
+
+    def emitir(self, evento):
+        self.contabilizar(evento)
+        for funcao in self.callbacks[evento["e"]]:
+            funcao(evento)
+        if self.rastro is not None:
+            self.rastro.write(json.dumps(evento, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    # Contadores que dependem só dos eventos (os mesmos ao reproduzir um rastro)
+    def contabilizar(self, evento):
+        contadores = self.contadores
+        tipo = evento["e"]
+        if tipo == "no":
+            contadores["nos"] += 1
+            contadores["vizinhos_visitados"] += evento["vizinhos"]
+            if evento["p"] + 1 > contadores["profundidade_maxima"]:
+                contadores["profundidade_maxima"] = evento["p"] + 1
+        elif tipo == "solucao":
+            contadores["solucoes"] += 1
+        elif tipo == "retorno":
+            contadores["retornos"] += 1
+        else: # propagar, falha e pre levam as podas
+            if tipo == "falha":
+                contadores["falhas"] += 1
+            if tipo != "pre":
+                contadores["podas_busca"] += evento["podas"]
+            contadores["esvaziamentos"] += evento["esvaziamentos"]
+            for origem, removidos in evento["origens"].items():
+                self.podas[origem] = self.podas.get(origem, 0) + removidos
+
+    # Reexecuta os eventos de um rastro: atualiza os contadores e chama os callbacks, sem gravar de novo
+    def reproduzir(self, eventos):
+        for evento in eventos:
+            self.contabilizar(evento)
+            for funcao in self.callbacks[evento["e"]]:
+                funcao(evento)
+
+    # Contadores e podas por origem: a parte do relatório que sai só dos eventos (igual ao reproduzir o rastro)
+    def resumo(self):
+        return {"contadores": dict(self.contadores), "podas": dict(self.podas)}
+
+    # Relatório em dicionário (vai para stats["instrumentacao"] no fim da busca)
+    def relatorio(self):
+        return {
+            "tempos_ms": {fase: ns / 1e6 for fase, ns in self.tempos_ns.items()},
+            "chamadas": dict(self.chamadas),
+            **self.resumo(),
+        }
+
+# Lê um rastro JSONL gravado pela Instrumentacao, um evento por linha
+def ler_rastro(caminho):
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
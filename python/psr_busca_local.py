@@ -0,0 +1,335 @@
+import json
+import random
+import sys
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+
+# Busca local (min-conflicts com lista tabu) para elencos grandes demais para o backtracking completo.
+# Começa de uma atribuição gulosa que respeita os domínios (e a C5) e, a cada passo, troca de time o jogador cuja
+# troca mais reduz as violações. As violações nunca são recalculadas do zero: o estado guarda as contagens e somas
+# de overall por time (C1, C4, C8) e a ocupação (posição, time) da C7, e o efeito de uma troca sai delas em O(1).
+# Para achar a melhor troca sem olhar todos os jogadores, os jogadores livres ficam em baldes por
+# (time, efeito na C7, overall): todos do mesmo balde têm o mesmo efeito, então cada passo avalia só os baldes
+# (no máximo 2 x 3 x overais distintos), mais J1..J4, que aparecem em C2/C3/C6 e são avaliados um a um.
+# Jogadores trocados há pouco ficam tabu por `tenure` passos (a menos que a troca leve a um novo melhor); se a busca
+# passa `estagnacao` passos sem melhorar, recomeça de uma nova atribuição gulosa em ordem aleatória.
+# Não prova que não há solução: devolve a melhor atribuição achada e se ela passa na verificacao_final.
+# Uso: python psr_busca_local.py instancia.json [tempo_maximo]
+
+# Jogadores citados por nome em C2, C3 e C6 (ficam fora dos baldes)
+ESPECIAIS = ("J1", "J2", "J3", "J4")
+
+class EstadoBuscaLocal:
+    def __init__(self, dados, rnd):
+        self.rnd = rnd
+        self.jogadores = sorted(dados["jogadores"])
+        self.indice = {j: i for i, j in enumerate(self.jogadores)}
+        n = self.n = len(self.jogadores)
+        self.overall = [int(dados["overais"][j]) for j in self.jogadores]
+        self.min_t1 = max(n // 2, 2) # C1 e C4, como em RestricoesGlobais
+        self.max_t1 = min((n + 1) // 2, n - 2)
+        self.limite = com_ac3.ler_limite(dados) # C8
+        self.escala_c8 = 1 / max(self.overall, default=1) # Excesso de um overall inteiro ~ uma violação
+        self.c7 = com_ac3.c7_ativa(dados) # Mesma regra dos motores exatos
+        ids = {}
+        self.posicao = [ids.setdefault(dados["posicoes"][j], len(ids)) for j in self.jogadores]
+        self.grupos = [[] for _ in ids] # Posição -> jogadores
+        for i, p in enumerate(self.posicao):
+            self.grupos[p].append(i)
+        # Domínio de cada jogador como times possíveis (0 = T1, 1 = T2); C5 tira o T2 do J5
+        self.dominio = []
+        for j in self.jogadores:
+            times = [k for k, t in enumerate(("T1", "T2")) if t in dados["jogadores"][j]]
+            if j == "J5":
+                times = [k for k in times if k == 0]
+            self.dominio.append(times)
+        self.livre = [len(d) == 2 for d in self.dominio]
+        especiais = [self.indice.get(j) for j in ESPECIAIS]
+        self.j1, self.j2, self.j3, self.j4 = especiais
+        self.especiais = [i for i in especiais if i is not None and self.livre[i]]
+
+    # Atribuição gulosa: fixos primeiro; os livres (por overall decrescente, ou em ordem aleatória nos reinícios)
+    # vão para o time sem companheiro de posição, com menos jogadores e, no empate, menor soma de overais
+    def inicial(self, aleatoria=False):
+        n = self.n
+        self.zerar()
+        livres = []
+        for i in range(n):
+            if self.livre[i]:
+                livres.append(i)
+            else:
+                self.colocar(i, self.dominio[i][0])
+        if aleatoria:
+            self.rnd.shuffle(livres)
+        else:
+            livres.sort(key=lambda i: -self.overall[i])
+        for i in livres:
+            p = self.posicao[i]
+            t = min((0, 1), key=lambda t: (self.c7 and self.ocupacao.get((p, t), 0) > 0, self.conta[t], self.soma[t]))
+            self.colocar(i, t)
+        self.montar_baldes()
+        self.total = self.violacoes()
+
+    # Coloca a atribuição dada (time de cada jogador) e recalcula o total do zero
+    def recontar(self, times):
+        self.zerar()
+        for i, t in enumerate(times):
+            self.colocar(i, t)
+        self.montar_baldes()
+        self.total = self.violacoes()
+        return self.total
+
+    def zerar(self):
+        self.time = [0] * self.n
+        self.conta = [0, 0]
+        self.soma = [0, 0]
+        self.ocupacao = {}
+
+    def colocar(self, i, t):
+        self.time[i] = t
+        self.conta[t] += 1
+        self.soma[t] += self.overall[i]
+        chave = (self.posicao[i], t)
+        self.ocupacao[chave] = self.ocupacao.get(chave, 0) + 1
+
+    # --- Violações ---
+
+    def violacao_c1(self, n1):
+        return max(0, self.min_t1 - n1) + max(0, n1 - self.max_t1)
+
+    def violacao_c8(self, soma, conta):
+        if self.limite is None or conta == 0:
+            return 0
+        excesso = soma - self.limite * conta
+        return excesso * self.escala_c8 if excesso > com_ac3.TOLERANCIA_C8 else 0
+
+    def violacao_especiais(self):
+        t = self.time
+        v = 0
+        if self.j1 is not None and self.j2 is not None and t[self.j1] == t[self.j2]: # C2
+            v += 1
+        if self.j3 is not None and self.j4 is not None:
+            if t[self.j3] != t[self.j4]: # C3
+                v += 1
+            elif self.j1 is not None and t[self.j3] == 0 and t[self.j1] == 0: # C6
+                v += 1
+        return v
+
+    # Total calculado do zero (no início de cada descida e a cada melhora: as variações da C8 são floats e
+    # somá-las troca após troca acumula erro)
+    def violacoes(self):
+        total = self.violacao_c1(self.conta[0]) + self.violacao_especiais()
+        total += sum(self.violacao_c8(self.soma[t], self.conta[t]) for t in (0, 1))
+        if self.c7:
+            total += sum(c - 1 for c in self.ocupacao.values() if c > 1)
+        return total
+
+    # Efeito na C7 de tirar um jogador da posição p do time t (e pôr no outro): -1, 0 ou +1
+    def classe_c7(self, p, t):
+        if not self.c7:
+            return 0
+        return (self.ocupacao.get((p, 1 - t), 0) >= 1) - (self.ocupacao[(p, t)] >= 2)
+
+    # Variação das violações de C1/C4 e C8 ao mover um jogador de overall r do time t para o outro
+    def delta_contagens(self, t, r):
+        u = 1 - t
+        n1 = self.conta[0] + (1 if t == 1 else -1)
+        delta = self.violacao_c1(n1) - self.violacao_c1(self.conta[0])
+        if self.limite is not None:
+            delta += (self.violacao_c8(self.soma[t] - r, self.conta[t] - 1) + self.violacao_c8(self.soma[u] + r, self.conta[u] + 1)
+                      - self.violacao_c8(self.soma[t], self.conta[t]) - self.violacao_c8(self.soma[u], self.conta[u]))
+        return delta
+
+    # Variação completa para trocar o jogador i de time
+    def delta(self, i):
+        t = self.time[i]
+        d = self.delta_contagens(t, self.overall[i]) + self.classe_c7(self.posicao[i], t)
+        if i in self.especiais:
+            antes = self.violacao_especiais()
+            self.time[i] = 1 - t
+            d += self.violacao_especiais() - antes
+            self.time[i] = t
+        return d
+
+    # --- Baldes de jogadores livres por (time, classe da C7, overall) ---
+
+    def montar_baldes(self):
+        self.baldes = {}
+        self.balde_de = [None] * self.n
+        self.lugar = [0] * self.n # Posição do jogador na lista do seu balde
+        for i in range(self.n):
+            if self.livre[i] and i not in self.especiais:
+                self.entrar_balde(i)
+
+    def entrar_balde(self, i):
+        t = self.time[i]
+        chave = (t, self.classe_c7(self.posicao[i], t), self.overall[i])
+        balde = self.baldes.setdefault(chave, [])
+        self.balde_de[i] = chave
+        self.lugar[i] = len(balde)
+        balde.append(i)
+
+    def sair_balde(self, i):
+        chave = self.balde_de[i]
+        balde = self.baldes[chave]
+        ultimo = balde.pop()
+        if ultimo != i: # Tira em O(1): o último ocupa o lugar de i
+            balde[self.lugar[i]] = ultimo
+            self.lugar[ultimo] = self.lugar[i]
+        if not balde:
+            del self.baldes[chave]
+        self.balde_de[i] = None
+
+    # Troca i de time, atualizando contagens, ocupação, total e os baldes dos companheiros de posição
+    def trocar(self, i, delta):
+        t = self.time[i]
+        p = self.posicao[i]
+        r = self.overall[i]
+        nos_baldes = self.balde_de[i] is not None
+        if nos_baldes:
+            self.sair_balde(i)
+        self.time[i] = 1 - t
+        self.conta[t] -= 1
+        self.conta[1 - t] += 1
+        self.soma[t] -= r
+        self.soma[1 - t] += r
+        self.ocupacao[(p, t)] -= 1
+        self.ocupacao[(p, 1 - t)] = self.ocupacao.get((p, 1 - t), 0) + 1
+        self.total += delta
+        if nos_baldes:
+            self.entrar_balde(i)
+        if self.c7: # A classe dos outros jogadores da posição pode ter mudado
+            for k in self.grupos[p]:
+                if k != i and self.balde_de[k] is not None:
+                    chave = (self.time[k], self.classe_c7(p, self.time[k]), self.overall[k])
+                    if chave != self.balde_de[k]:
+                        self.sair_balde(k)
+                        self.entrar_balde(k)
+
+    # Primeiro jogador não tabu do balde, a partir de uma posição aleatória (None se todos estão tabu)
+    def escolher_no_balde(self, balde, tabu, passo):
+        inicio = self.rnd.randrange(len(balde))
+        for k in range(len(balde)):
+            i = balde[(inicio + k) % len(balde)]
+            if tabu[i] <= passo:
+                return i
+        return None
+
+    # Melhor troca (menor variação) entre os baldes e os jogadores especiais; empates sorteados
+    # aspiracao: variação abaixo da qual uma troca tabu é aceita (leva a um novo melhor)
+    def melhor_troca(self, tabu, passo, aspiracao):
+        # Parte de C1/C4 e C8 que só depende do time de origem; a de C8 que depende do overall é calculada uma vez
+        # por (time, overall), e não uma vez por balde
+        c8 = self.violacao_c8
+        conta, soma = self.conta, self.soma
+        base = []
+        for t in (0, 1):
+            u = 1 - t
+            d = self.violacao_c1(conta[0] + (1 if t == 1 else -1)) - self.violacao_c1(conta[0])
+            base.append(d - c8(soma[t], conta[t]) - c8(soma[u], conta[u]) if self.limite is not None else d)
+        por_overall = {}
+        candidatos = []
+        for chave, balde in self.baldes.items():
+            t, classe, r = chave
+            d = por_overall.get((t, r))
+            if d is None:
+                d = base[t]
+                if self.limite is not None:
+                    d += c8(soma[t] - r, conta[t] - 1) + c8(soma[1 - t] + r, conta[1 - t] + 1)
+                por_overall[(t, r)] = d
+            candidatos.append((d + classe, balde))
+        for i in self.especiais:
+            candidatos.append((self.delta(i), [i]))
+        candidatos.sort(key=lambda c: c[0])
+        melhor, escolhido, empates = None, None, 0
+        for d, balde in candidatos: # Em ordem de variação: para no primeiro valor depois dos empates
+            if melhor is not None and d > melhor:
+                break
+            i = self.escolher_no_balde(balde, tabu, passo)
+            if i is None:
+                if d >= aspiracao:
+                    continue
+                i = balde[0]
+            if melhor is None:
+                melhor, escolhido, empates = d, i, 1
+            else:
+                empates += 1
+                if self.rnd.randrange(empates) == 0:
+                    escolhido = i
+        return escolhido, melhor
+
+    def atribuicao(self, times):
+        return {j: ("T1", "T2")[times[i]] for i, j in enumerate(self.jogadores)}
+
+# Busca local min-conflicts/tabu
+# tempo_maximo: orçamento em segundos; max_flips: orçamento de trocas (None = só o tempo)
+# tenure: passos que um jogador trocado fica tabu (no máximo metade dos jogadores livres)
+# estagnacao: passos sem melhorar antes de reiniciar (padrão: max(1000, 2 * jogadores))
+# semente: semente do gerador aleatório (desempates, reinícios)
+# Retorna: (melhor atribuição encontrada ou None se algum domínio é vazio, stats). stats tem "valida" (passou na
+#          verificacao_final), "violacoes" (da melhor atribuição), "flips", "flips_por_segundo", "reinicios" e "time"
+def busca_local(dados, tempo_maximo=10.0, max_flips=None, tenure=10, estagnacao=None, semente=0):
+    com_ac3.exigir_dois_times(dados)
+    inicio = time.perf_counter()
+    rnd = random.Random(semente)
+    estado = EstadoBuscaLocal(dados, rnd)
+    stats = {"flips": 0, "reinicios": 0, "violacoes": None, "valida": False, "flips_por_segundo": 0.0, "time": 0.0}
+    if any(not d for d in estado.dominio):
+        stats["time"] = time.perf_counter() - inicio
+        return None, stats
+    if estagnacao is None:
+        estagnacao = max(1000, 2 * estado.n)
+    limite_relogio = inicio + tempo_maximo if tempo_maximo is not None else None
+    tabu = [0] * estado.n # Passo até o qual cada jogador está tabu
+    tenure = min(tenure, sum(estado.livre) // 2) # Com tenure alto num elenco pequeno todos ficariam tabu
+    estado.inicial()
+    melhor_total, melhor_times = estado.total, estado.time[:]
+    passo = 0
+    ultima_melhora = 0
+    while melhor_total > com_ac3.TOLERANCIA_C8:
+        if max_flips is not None and passo >= max_flips:
+            break
+        if limite_relogio is not None and passo % 64 == 0 and time.perf_counter() >= limite_relogio:
+            break
+        if passo - ultima_melhora > estagnacao: # Reinício aleatório
+            stats["reinicios"] += 1
+            estado.inicial(aleatoria=True)
+            tabu = [0] * estado.n
+            ultima_melhora = passo
+            if estado.total < melhor_total:
+                melhor_total, melhor_times = estado.total, estado.time[:]
+            continue
+        i, d = estado.melhor_troca(tabu, passo, melhor_total - estado.total)
+        if i is None:
+            break # Nenhum jogador pode trocar de time
+        estado.trocar(i, d)
+        passo += 1
+        tabu[i] = passo + tenure
+        if estado.total < melhor_total - 1e-12:
+            estado.total = estado.violacoes()
+            if estado.total < melhor_total:
+                melhor_total, melhor_times = estado.total, estado.time[:]
+                ultima_melhora = passo
+    solucao = estado.atribuicao(melhor_times)
+    tempo = time.perf_counter() - inicio
+    stats.update({"flips": passo, "violacoes": estado.recontar(melhor_times), "valida": com_ac3.verificacao_final(solucao, dados),
+                  "flips_por_segundo": passo / tempo if tempo > 0 else 0.0, "time": tempo})
+    return solucao, stats
+
+def main(caminho, tempo_maximo=10.0):
+    with open(caminho) as arquivo:
+        dados = json.load(arquivo)
+    solucao, stats = busca_local(dados, tempo_maximo)
+    if solucao is None:
+        print("Algum jogador não tem time possível")
+        return 1
+    print(f"Válida: {stats['valida']} | Violações: {stats['violacoes']:.4f} | Trocas: {stats['flips']} "
+          f"({stats['flips_por_segundo']:.0f}/s) | Reinícios: {stats['reinicios']} | Tempo: {stats['time']:.4f} s")
+    return 0 if stats["valida"] else 1
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python psr_busca_local.py instancia.json [tempo_maximo]")
+        sys.exit(1)
+    sys.exit(main(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 10.0))
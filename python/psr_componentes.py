@@ -0,0 +1,299 @@
+import itertools
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+
+# Contagem de soluções por componentes do grafo de restrições.
+# As restrições locais (C2, C3, C5, C6, C7) só ligam poucos jogadores (duplas de mesma posição, J1-J2, J1-J3-J4),
+# então o grafo se quebra em muitos componentes pequenos. Cada componente é enumerado sozinho e resumido num
+# perfil {(jogadores no T1, soma de overais do T1): quantidade de atribuições}; as restrições globais
+# C1/C4 (tamanho dos times) e C8 (média máxima) só dependem da soma desses perfis, que é feita por convolução.
+# Componentes com a mesma forma (domínios, overais e arestas) reaproveitam o perfil já enumerado.
+#
+# A soma do T1 é guardada como peso = soma - base * k (base = limite da C8 arredondado), o que mantém os pesos
+# pequenos. Para não guardar um dicionário com todas as somas possíveis, cada perfil parcial é um inteiro grande
+# por quantidade k de jogadores no T1: a contagem com peso w fica na "casa" w (bits [w*B, (w+1)*B) do inteiro),
+# e a convolução com um componente vira deslocamentos e somas de inteiros grandes, feitos em C pelo Python.
+# Sem C8 o peso não importa e cada perfil parcial é só uma contagem por k.
+# O custo cresce com (faixa de k possível) x (faixa de pesos): com C8 e centenas de jogadores sem nenhuma
+# restrição local ele fica grande (MAX_BYTES_PERFIL limita a memória). Para conter a faixa de pesos, cada inteiro
+# só guarda as casas a partir do corte de baixo (o que nunca mais alcança a janela da C8 sai no próprio
+# deslocamento da convolução), a máscara do corte de cima é montada uma vez por etapa, B vem do produto dos
+# totais (e não da soma dos bits de cada um) e as etapas estreitas entram primeiro, então a tabela só fica
+# larga nas últimas etapas.
+
+# Maior produto de tamanhos de domínio que um componente pode ter (cada componente é enumerado por força bruta)
+MAX_PRODUTO = 1 << 20
+
+# Memória máxima (aproximada) dos perfis parciais com C8
+MAX_BYTES_PERFIL = 1 << 30
+
+# Grafo de restrições do modelo: {var: set(vizinhos)} com as restrições binárias, os grupos da C7 global
+# e a C6 (ternária: liga J1, J3 e J4)
+def grafo_restricoes(modelo):
+    grafo = {v: set() for v in modelo.lista_ordenada}
+    for (x, y) in modelo.restricoes:
+        grafo[x].add(y)
+        grafo[y].add(x)
+    if modelo.c7 is not None:
+        for grupo in modelo.c7.grupos:
+            for j in grupo:
+                grafo[j].update(o for o in grupo if o != j)
+    if tem_c6(grafo):
+        for j in ("J1", "J3", "J4"):
+            grafo[j].update(o for o in ("J1", "J3", "J4") if o != j)
+    return grafo
+
+def tem_c6(variaveis): # Como em RestricoesGlobais: C6 só vale se J1, J3 e J4 existem
+    return all(j in variaveis for j in ("J1", "J3", "J4"))
+
+# Componentes conexos (listas de variáveis na ordem de lista_ordenada)
+def componentes_conexos(lista_ordenada, grafo):
+    visitado = set()
+    componentes = []
+    for inicio in lista_ordenada:
+        if inicio in visitado:
+            continue
+        visitado.add(inicio)
+        componente = [inicio]
+        pilha = [inicio]
+        while pilha:
+            for outro in grafo[pilha.pop()]:
+                if outro not in visitado:
+                    visitado.add(outro)
+                    componente.append(outro)
+                    pilha.append(outro)
+        componentes.append(componente)
+    return componentes
+
+# Atribuições de um componente que respeitam as restrições internas (C2, C3, C6, C7 e restrições do usuário)
+def atribuicoes_componente(componente, modelo, c6):
+    dominios = [modelo.dominios[v] for v in componente]
+    produto = 1
+    for d in dominios:
+        produto *= len(d)
+    if produto > MAX_PRODUTO:
+        raise ValueError(f"Componente com {len(componente)} jogadores grande demais para enumerar ({produto} atribuições)")
+    local = {v: i for i, v in enumerate(componente)}
+    arcos = [(local[x], local[y], r) for (x, y), r in modelo.restricoes.items() if x in local and y in local]
+    grupos = []
+    if modelo.c7 is not None:
+        grupos = [[local[j] for j in g] for g in modelo.c7.grupos if g[0] in local]
+    ternaria = tuple(local[j] for j in ("J1", "J3", "J4")) if c6 and "J1" in local else None
+    # C2 e C3 também explícitas: com C7 em pares, o arco de mesma posição sobrescreve o de C3 em restricoes
+    iguais = [(local["J3"], local["J4"])] if "J3" in local and "J4" in local else []
+    diferentes = [(local["J1"], local["J2"])] if "J1" in local and "J2" in local else []
+    if "J5" in local: # C5 (sem propagar_globais ela não foi aplicada nos domínios)
+        dominios[local["J5"]] = [t for t in dominios[local["J5"]] if t != "T2"]
+    for valores in itertools.product(*dominios):
+        if any(not r(valores[i], valores[j]) for i, j, r in arcos):
+            continue
+        if any(valores[i] != valores[j] for i, j in iguais) or any(valores[i] == valores[j] for i, j in diferentes):
+            continue
+        if any(len({valores[i] for i in g}) < len(g) for g in grupos):
+            continue
+        if ternaria is not None:
+            v1, v3, v4 = (valores[i] for i in ternaria)
+            if v3 == "T1" and v4 == "T1" and v1 != "T2":
+                continue
+        yield valores
+
+# Forma do componente, usada como chave do cache de perfis: domínios e overais dos jogadores mais as arestas
+# (por índice local). Componentes com a mesma forma têm o mesmo perfil.
+def forma_componente(componente, modelo, overais):
+    ordem = sorted(range(len(componente)), key=lambda i: (tuple(modelo.dominios[componente[i]]), overais[componente[i]]))
+    componente = [componente[i] for i in ordem]
+    local = {v: i for i, v in enumerate(componente)}
+    arestas = []
+    for (x, y), r in modelo.restricoes.items():
+        if x in local and y in local:
+            arestas.append((local[x], local[y], getattr(r, "nome", id(r))))
+    if modelo.c7 is not None:
+        for g in modelo.c7.grupos:
+            if g[0] in local:
+                arestas.append(("C7", tuple(sorted(local[j] for j in g))))
+    especiais = tuple(j for j in componente if j in ("J1", "J2", "J3", "J4", "J5")) # C6 e afins dependem do nome
+    return (tuple((tuple(modelo.dominios[v]), overais[v]) for v in componente), tuple(sorted(map(str, arestas))), especiais)
+
+# Perfil de um componente: {k: {peso: quantidade}}, k = jogadores no T1, peso = soma dos pesos do T1
+def perfil_componente(componente, modelo, pesos, c6):
+    perfil = {}
+    for valores in atribuicoes_componente(componente, modelo, c6):
+        k = 0
+        w = 0
+        for v, t in zip(componente, valores):
+            if t == "T1":
+                k += 1
+                w += pesos[v]
+        contagem = perfil.setdefault(k, {})
+        contagem[w] = contagem.get(w, 0) + 1
+    return perfil
+
+# Maior soma s de k overais com s / k <= limite, com a mesma conta em float de verificacao_final
+def maior_soma(k, limite):
+    if k == 0:
+        return 0
+    s = int(limite * k) + 1
+    while s / k > limite:
+        s -= 1
+    return s
+
+# Convolução das etapas em inteiros grandes com as faixas de C1/C4 e C8 (usada também por psr_contagem_dp)
+# etapas: [(termos [(dk, casa, coeficiente)], k_min, k_max, largura)], com as casas de cada etapa a partir de 0
+# n, soma_total: jogadores e soma dos overais da instância; limite, base: C8 (limite None = sem C8)
+# deslocamento: peso da casa 0 do resultado; inicial: {k: contagem} antes da primeira etapa
+# guardar_camadas: guarda a tabela depois de cada etapa em tabelas (com o corte em cortes), para amostrar
+# Resultado em por_k ({k: soluções}) e quantidade; janelas dá a faixa de casas de cada k final
+class Convolucao:
+    def __init__(self, etapas, n, soma_total, limite, base, deslocamento, inicial, guardar_camadas=False):
+        self.tabelas = []
+        self.cortes = []
+        self.por_k = {}
+        self.quantidade = 0
+        # B = bits de cada casa, suficiente para o total de atribuições (que limita qualquer contagem)
+        total = sum(inicial.values())
+        for termos, _, _, _ in etapas:
+            total *= sum(t[2] for t in termos)
+        B = self.B = (total.bit_length() + 1 + 7) // 8 * 8
+
+        # C1 e C4: intervalo de jogadores no T1 (como em RestricoesGlobais)
+        min_t1 = max(n // 2, 2)
+        max_t1 = min((n + 1) // 2, n - 2)
+        # C8: para cada k válido, faixa de casas [menor, maior] em que as médias dos dois times ficam no limite
+        self.janelas = {}
+        for k in range(min_t1, max_t1 + 1):
+            if limite is None:
+                self.janelas[k] = None
+            else:
+                maior = maior_soma(k, limite) - base * k - deslocamento # Média do T1
+                menor = soma_total - maior_soma(n - k, limite) - base * k - deslocamento # Média do T2
+                menor = max(menor, 0)
+                if menor <= maior:
+                    self.janelas[k] = (menor, maior)
+        if not self.janelas:
+            return
+        casa_min = min(j[0] for j in self.janelas.values()) if limite is not None else 0
+        casa_max = max(j[1] for j in self.janelas.values()) if limite is not None else 0
+
+        k_min_resto = sum(e[1] for e in etapas)
+        k_max_resto = sum(e[2] for e in etapas)
+        largura_resto = sum(e[3] for e in etapas)
+        tabela = dict(inicial) # {k: inteiro grande com as contagens por casa, a partir da casa `corte`}
+        corte = 0
+        memoria = 0
+        if guardar_camadas:
+            self.tabelas.append(tabela)
+            self.cortes.append(corte)
+        for termos, k_min, k_max, largura in etapas:
+            k_min_resto -= k_min
+            k_max_resto -= k_max
+            largura_resto -= largura
+            # Casas abaixo de casa_min - largura_resto não chegam mais à janela da C8, mesmo com o peso que falta
+            # somar: o corte sobe e o deslocamento de cada termo já as descarta (deslocamento negativo)
+            novo_corte = max(corte, casa_min - largura_resto) if limite is not None else 0
+            subida = novo_corte - corte
+            nova = {}
+            for k1, p in tabela.items():
+                for dk, d, coef in termos:
+                    k = k1 + dk
+                    if k + k_max_resto < min_t1 or k + k_min_resto > max_t1: # Não alcança mais a faixa da C1/C4
+                        continue
+                    termo = p * coef if coef != 1 else p
+                    deslocar = B * (d - subida)
+                    nova[k] = nova.get(k, 0) + (termo << deslocar if deslocar >= 0 else termo >> -deslocar)
+            # Casas acima de casa_max já passaram da janela da C8
+            bits_max = B * (casa_max - novo_corte + 1)
+            mascara = (1 << bits_max) - 1 if limite is not None else None
+            tamanho = 0
+            for k, p in nova.items():
+                if mascara is not None and p.bit_length() > bits_max:
+                    p &= mascara
+                    nova[k] = p
+                tamanho += p.bit_length() // 8
+            memoria = memoria + tamanho if guardar_camadas else tamanho
+            if memoria > MAX_BYTES_PERFIL:
+                raise MemoryError(f"Perfis parciais passaram de {MAX_BYTES_PERFIL} bytes; use contar_solucoes")
+            tabela = nova
+            corte = novo_corte
+            if guardar_camadas:
+                self.tabelas.append(tabela)
+                self.cortes.append(corte)
+        self.tabela = tabela
+        self.corte = corte
+
+        # Soma as casas dentro da janela de cada k
+        mascara_casa = (1 << B) - 1
+        for k, p in tabela.items():
+            if k not in self.janelas:
+                continue
+            if self.janelas[k] is None:
+                self.por_k[k] = p
+            else:
+                menor, maior = self.janelas[k]
+                janela = (p >> (B * (menor - corte))) & ((1 << (B * (maior - menor + 1))) - 1)
+                # Como 2^B = 1 (mod 2^B - 1), o resto da janela é a soma das casas (o total cabe numa casa)
+                self.por_k[k] = janela % mascara_casa
+        self.quantidade = sum(self.por_k.values())
+
+    # Contagem do estado (k, casa d) depois de i etapas (0 se a casa já foi cortada)
+    def casa(self, i, k, d):
+        d -= self.cortes[i]
+        if d < 0:
+            return 0
+        return (self.tabelas[i].get(k, 0) >> (self.B * d)) & ((1 << self.B) - 1)
+
+# Conta as soluções por componentes
+# modelo: ModeloCompilado (compilar_modelo); se None, compila com as opções dadas
+# Retorna: (quantidade de soluções, stats) com o mesmo total de contar_solucoes
+def contar_por_componentes(dados, modelo=None, **opcoes):
+    com_ac3.exigir_dois_times(dados)
+    inicio = time.time()
+    if modelo is None:
+        modelo = com_ac3.compilar_modelo(dados, **opcoes)
+    stats = {"time": 0.0, "time_pre": modelo.stats_pre["time_pre"], "componentes": 0, "formas": 0,
+             "maior_componente": 0, "perfis_reaproveitados": 0, "solutions": 0}
+    if not modelo.consistente:
+        stats["time"] = time.time() - inicio
+        return 0, stats
+
+    n = len(modelo.lista_ordenada)
+    overais = {j: int(dados["overais"][j]) for j in modelo.lista_ordenada}
+    limite = com_ac3.ler_limite(dados)
+    base = round(limite) if limite is not None else 0
+    pesos = {j: (r - base if limite is not None else 0) for j, r in overais.items()}
+    c6 = tem_c6(modelo.lista_ordenada)
+
+    grafo = grafo_restricoes(modelo)
+    componentes = componentes_conexos(modelo.lista_ordenada, grafo)
+    stats["componentes"] = len(componentes)
+    stats["maior_componente"] = max((len(c) for c in componentes), default=0)
+
+    # Perfis agrupados por forma: {forma: [perfil, quantas vezes aparece]}
+    perfis = {}
+    for componente in componentes:
+        forma = forma_componente(componente, modelo, overais)
+        if forma in perfis:
+            perfis[forma][1] += 1
+            stats["perfis_reaproveitados"] += 1
+        else:
+            perfis[forma] = [perfil_componente(componente, modelo, pesos, c6), 1]
+    stats["formas"] = len(perfis)
+
+    # Cada perfil vira termos [(k, peso - menor peso, quantidade)], uma etapa por vez que a forma aparece
+    etapas = []
+    deslocamento = 0 # Soma dos menores pesos: peso da casa 0 do inteiro final
+    for perfil, vezes in perfis.values():
+        if not perfil:
+            stats["time"] = time.time() - inicio
+            return 0, stats # Componente sem nenhuma atribuição válida
+        menor = min(w for contagem in perfil.values() for w in contagem)
+        termos = [(k, w - menor, c) for k, contagem in perfil.items() for w, c in contagem.items()]
+        largura = max(w for contagem in perfil.values() for w in contagem) - menor
+        etapas.extend([(termos, min(perfil), max(perfil), largura)] * vezes)
+        deslocamento += menor * vezes
+    etapas.sort(key=lambda e: e[3]) # Estreitas primeiro: a faixa de pesos da tabela cresce o mais tarde possível
+
+    convolucao = Convolucao(etapas, n, sum(overais.values()), limite, base, deslocamento, {0: 1})
+    stats["solutions"] = convolucao.quantidade
+    stats["time"] = time.time() - inicio
+    return convolucao.quantidade, stats
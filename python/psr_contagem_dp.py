@@ -0,0 +1,230 @@
+import json
+import math
+import random
+import sys
+import time
+
+import psr_componentes
+import psr_python_trab_com_ac3 as com_ac3
+
+# Contagem exata (e amostragem uniforme) por programação dinâmica sobre (jogadores no T1, soma de overais do T1).
+# C1/C4 (tamanho dos times) e C8 (média máxima) só dependem desse par, então, depois de colapsar as restrições
+# locais, contar vira uma mochila: o número de soluções é a soma das casas da tabela final que cabem nas faixas.
+#   1. Colapso: os componentes do grafo de restrições (psr_componentes) viram escolhas conjuntas. Componentes
+#      com uma só opção (k, peso) — jogadores forçados por C5/C6/domínio ou pela propagação — entram como
+#      constante. Componentes com a mesma forma e duas opções (jogador livre, dupla de mesma posição da C7) se
+#      juntam numa camada binomial: j cópias na opção A e m - j na B, de C(m, j) jeitos. Os demais (J1-J4
+#      ligados por C2/C3/C6, grupos maiores) são uma camada cada.
+#   2. DP: uma camada por vez, pela mesma convolução de psr_componentes (psr_componentes.Convolucao: um inteiro
+#      grande por k, uma casa de B bits por peso), de modo que cada transição é um deslocamento e uma soma de
+#      inteiros grandes, feita em C pelo Python. Estados que não chegam mais às faixas de C1/C4/C8 são descartados
+#      a cada camada.
+#   3. Amostragem: com as tabelas de todas as camadas guardadas, sorteia a casa final proporcional à contagem e
+#      volta camada por camada escolhendo o termo proporcional a (contagem anterior x coeficiente); dentro da
+#      camada, as cópias e as atribuições de cada componente são sorteadas uniformemente. Cada solução sai com
+#      a mesma probabilidade.
+# O custo é polinomial em (jogadores) x (faixa de k) x (faixa de pesos), ou seja, no tamanho do elenco vezes a
+# faixa de overais; guardar as tabelas para amostrar multiplica a memória pelo número de camadas
+# (psr_componentes.MAX_BYTES_PERFIL limita as duas).
+# Uso: python psr_contagem_dp.py instancia.json [amostras]
+
+class ContadorDP:
+    # modelo: ModeloCompilado (compilar_modelo) da instância
+    # guardar_camadas: guarda a tabela depois de cada camada (necessário para amostrar)
+    def __init__(self, dados, modelo, guardar_camadas=False):
+        com_ac3.exigir_dois_times(dados)
+        self.dados = dados
+        self.modelo = modelo
+        self.guardar_camadas = guardar_camadas
+        self.stats = {"componentes": 0, "formas": 0, "forcados": 0, "camadas": 0, "camadas_binomiais": 0}
+        self.janelas = {}
+        self.por_k = {}
+        self.quantidade = 0
+        if modelo.consistente:
+            self.colapsar()
+            if self.fator:
+                self.programacao_dinamica()
+
+    # Passo 1: componentes -> constante (forçados) + camadas
+    def colapsar(self):
+        modelo = self.modelo
+        n = len(modelo.lista_ordenada)
+        self.overais = {j: int(self.dados["overais"][j]) for j in modelo.lista_ordenada}
+        self.limite = com_ac3.ler_limite(self.dados)
+        self.base = round(self.limite) if self.limite is not None else 0
+        self.pesos = {j: (r - self.base if self.limite is not None else 0) for j, r in self.overais.items()}
+        self.c6 = psr_componentes.tem_c6(modelo.lista_ordenada)
+        self.componentes = psr_componentes.componentes_conexos(modelo.lista_ordenada, psr_componentes.grafo_restricoes(modelo))
+        self.opcoes_cache = {} # Índice do componente -> {(k, peso): [atribuições]}
+        self.stats["componentes"] = len(self.componentes)
+
+        formas = {} # Forma -> [opções {(k, peso): quantidade}, índices dos componentes]
+        for c, componente in enumerate(self.componentes):
+            forma = psr_componentes.forma_componente(componente, modelo, self.overais)
+            if forma in formas:
+                formas[forma][1].append(c)
+            else:
+                opcoes = {chave: len(lista) for chave, lista in self.opcoes(c).items()}
+                formas[forma] = [opcoes, [c]]
+        self.stats["formas"] = len(formas)
+
+        self.fator = 1 # Produto das contagens dos componentes forçados
+        self.k_fixo = 0
+        self.peso_fixo = 0
+        self.forcados = [] # Componentes de uma opção só (sorteados direto na amostragem)
+        self.camadas = [] # Cada camada: (termos [(dk, dpeso, coeficiente, escolha)], componentes, opções)
+        for opcoes, indices in formas.values():
+            if not opcoes:
+                self.fator = 0
+                return
+            m = len(indices)
+            if len(opcoes) == 1:
+                (k, w), c = next(iter(opcoes.items()))
+                self.fator *= c ** m
+                self.k_fixo += k * m
+                self.peso_fixo += w * m
+                self.forcados.extend(indices)
+                self.stats["forcados"] += m
+            elif len(opcoes) == 2:
+                (a, ca), (b, cb) = opcoes.items()
+                termos = [(j * a[0] + (m - j) * b[0], j * a[1] + (m - j) * b[1], math.comb(m, j) * ca ** j * cb ** (m - j), j)
+                          for j in range(m + 1)]
+                self.camadas.append((termos, indices, (a, b)))
+                self.stats["camadas_binomiais"] += 1
+            else:
+                for c in indices:
+                    termos = [(k, w, quantidade, (k, w)) for (k, w), quantidade in opcoes.items()]
+                    self.camadas.append((termos, [c], None))
+        self.stats["camadas"] = len(self.camadas)
+        self.n = n
+
+    # Atribuições válidas do componente c agrupadas por (k, peso)
+    def opcoes(self, c):
+        opcoes = self.opcoes_cache.get(c)
+        if opcoes is None:
+            componente = self.componentes[c]
+            opcoes = {}
+            for valores in psr_componentes.atribuicoes_componente(componente, self.modelo, self.c6):
+                k = 0
+                w = 0
+                for v, t in zip(componente, valores):
+                    if t == "T1":
+                        k += 1
+                        w += self.pesos[v]
+                opcoes.setdefault((k, w), []).append(valores)
+            self.opcoes_cache[c] = opcoes
+        return opcoes
+
+    # Passo 2: DP camada a camada com as faixas de C1/C4 e C8 (a convolução de psr_componentes)
+    def programacao_dinamica(self):
+        # Termos com o deslocamento de cada camada já descontado (casas sempre >= 0)
+        etapas = []
+        deslocamento = self.peso_fixo
+        for termos, _, _ in self.camadas:
+            menor = min(t[1] for t in termos)
+            etapas.append(([(dk, dw - menor, coef) for dk, dw, coef, _ in termos],
+                           min(t[0] for t in termos), max(t[0] for t in termos), max(t[1] for t in termos) - menor))
+            deslocamento += menor
+        self.etapas = etapas
+        self.convolucao = psr_componentes.Convolucao(etapas, self.n, sum(self.overais.values()), self.limite, self.base,
+                                                     deslocamento, {self.k_fixo: self.fator}, self.guardar_camadas)
+        self.janelas = self.convolucao.janelas
+        self.por_k = self.convolucao.por_k # k -> soluções com k jogadores no T1
+        self.quantidade = self.convolucao.quantidade
+
+    # Passo 3: uma solução sorteada uniformemente (None se não há solução)
+    def amostrar(self, rnd):
+        if not self.quantidade:
+            return None
+        # Estado final proporcional à contagem
+        r = rnd.randrange(self.quantidade)
+        for k, quantidade in self.por_k.items():
+            if r < quantidade:
+                break
+            r -= quantidade
+        if self.janelas[k] is None:
+            d = 0
+        else:
+            menor, maior = self.janelas[k]
+            for d in range(menor, maior + 1):
+                c = self.convolucao.casa(len(self.etapas), k, d)
+                if r < c:
+                    break
+                r -= c
+        # Volta pelas camadas escolhendo o termo de cada uma
+        escolhas = []
+        for i in range(len(self.camadas) - 1, -1, -1):
+            r = rnd.randrange(self.convolucao.casa(i + 1, k, d))
+            for (dk, dd, coef), termo in zip(self.etapas[i][0], self.camadas[i][0]):
+                if dd > d:
+                    continue
+                c = self.convolucao.casa(i, k - dk, d - dd) * coef
+                if r < c:
+                    break
+                r -= c
+            escolhas.append(termo[3])
+            k, d = k - dk, d - dd
+        escolhas.reverse()
+
+        # Atribuição de cada componente
+        solucao = {}
+        def atribuir(c, chave):
+            lista = self.opcoes(c)[chave]
+            for v, t in zip(self.componentes[c], lista[rnd.randrange(len(lista))]):
+                solucao[v] = t
+        for c in self.forcados:
+            atribuir(c, next(iter(self.opcoes(c))))
+        for (termos, indices, par), escolha in zip(self.camadas, escolhas):
+            if par is None: # Camada de um componente: a escolha é a opção
+                atribuir(indices[0], escolha)
+            else: # Binomial: `escolha` cópias (sorteadas) na opção A, o resto na B
+                na_a = set(rnd.sample(range(len(indices)), escolha))
+                for i, c in enumerate(indices):
+                    atribuir(c, par[0] if i in na_a else par[1])
+        return solucao
+
+# Conta as soluções pela DP
+# modelo: ModeloCompilado (compilar_modelo); se None, compila com as opções dadas
+# Retorna: (quantidade de soluções, stats) com o mesmo total de contar_solucoes
+def contar_dp(dados, modelo=None, **opcoes):
+    inicio = time.time()
+    if modelo is None:
+        modelo = com_ac3.compilar_modelo(dados, **opcoes)
+    contador = ContadorDP(dados, modelo)
+    stats = dict(contador.stats, solutions=contador.quantidade, time_pre=modelo.stats_pre["time_pre"],
+                 time=time.time() - inicio)
+    return contador.quantidade, stats
+
+# Sorteia soluções uniformemente (com reposição) entre todas as soluções
+# quantidade: número de amostras; semente: semente do gerador aleatório
+# Retorna: (lista de soluções {jogador: time}, stats) — lista vazia se não há solução
+def amostrar_dp(dados, quantidade, semente=0, modelo=None, **opcoes):
+    inicio = time.time()
+    if modelo is None:
+        modelo = com_ac3.compilar_modelo(dados, **opcoes)
+    contador = ContadorDP(dados, modelo, guardar_camadas=True)
+    rnd = random.Random(semente)
+    amostras = [contador.amostrar(rnd) for _ in range(quantidade)] if contador.quantidade else []
+    stats = dict(contador.stats, solutions=contador.quantidade, time_pre=modelo.stats_pre["time_pre"],
+                 time=time.time() - inicio)
+    return amostras, stats
+
+def main(caminho, amostras=0):
+    with open(caminho) as arquivo:
+        dados = json.load(arquivo)
+    if amostras:
+        solucoes, stats = amostrar_dp(dados, amostras)
+    else:
+        solucoes, stats = [], contar_dp(dados)[1]
+    print(f"Soluções: {stats['solutions']} | Componentes: {stats['componentes']} ({stats['forcados']} forçados, "
+          f"{stats['camadas']} camadas, {stats['camadas_binomiais']} binomiais) | Tempo: {stats['time']:.4f} s")
+    for i, s in enumerate(solucoes, start=1):
+        print(f"--- Amostra {i} ---")
+        print("  T1: " + " ".join(j for j in sorted(s) if s[j] == "T1"))
+        print("  T2: " + " ".join(j for j in sorted(s) if s[j] == "T2"))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python psr_contagem_dp.py instancia.json [amostras]")
+        sys.exit(1)
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 0)
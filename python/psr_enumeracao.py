@@ -0,0 +1,300 @@
+import json
+import sys
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele os blocos são verificados em Python puro (e o limite de tamanho cai)
+    np = None
+
+# Enumeração exaustiva para instâncias pequenas: cada atribuição dos jogadores ainda livres (domínio {T1, T2})
+# é um inteiro de n bits (bit i = 1 se o i-ésimo livre vai para o T1) e os inteiros de 0 a 2^n - 1 são testados
+# em blocos, com operações sobre vetores do NumPy — uma verificacao_final em lote:
+#   - C1/C4: contagem de bits (popcount) mais os fixos no T1 tem de cair em [min_t1, max_t1];
+#   - C2/C3/C6/C7 e restrições binárias do usuário: cada combinação proibida vira um padrão (máscara, valor) sobre
+#     os bits dos livres (jogadores fixos já entram resolvidos), e a atribuição viola se (x & máscara) == valor;
+#   - C8: soma de overais do T1 por tabelas de 256 entradas, uma por byte de x (produto escalar mascarado),
+#     com a mesma divisão em float de verificacao_final.
+# Para até ~20 livres isso custa menos que a busca com forward checking. Com iter_solucoes(enumeracao="auto")
+# este motor é escolhido quando o modelo tem no máximo MAX_LIVRES livres (o padrão é a busca); oraculo()
+# enumera a partir do JSON, sem nenhuma propagação, para conferir os outros motores (ver tests/test_enumeracao.py).
+# Uso: python psr_enumeracao.py instancia.json
+
+# Máximo de jogadores livres para a escolha automática (com e sem NumPy)
+MAX_LIVRES = 24
+MAX_LIVRES_SEM_NUMPY = 16
+
+# Atribuições testadas por bloco
+BLOCO = 1 << 16
+
+def contar_bits(x): # Popcount de um vetor de uint64
+    if hasattr(np, "bitwise_count"): # NumPy >= 2.0
+        return np.bitwise_count(x).astype(np.int64)
+    bytes_ = x.view(np.uint8).reshape(len(x), 8)
+    return np.unpackbits(bytes_, axis=1).sum(axis=1, dtype=np.int64)
+
+class Enumerador:
+    # modelo: ModeloCompilado; enumera sobre os domínios já reduzidos. Se None, usa os domínios do JSON e as
+    #        restrições binárias par a par, sem propagação (oráculo)
+    def __init__(self, dados, modelo=None):
+        com_ac3.exigir_dois_times(dados)
+        if modelo is None:
+            lista_ordenada = sorted(dados["jogadores"])
+            dominios = {v: list(dados["jogadores"][v]) for v in lista_ordenada}
+            restricoes = com_ac3.construir_restricoes_binarias(lista_ordenada, dados["posicoes"],
+                                                               c7_pares=com_ac3.c7_ativa(dados))[0]
+            grupos = []
+        else:
+            lista_ordenada = modelo.lista_ordenada
+            dominios = {v: list(modelo.dominios[v]) for v in lista_ordenada}
+            restricoes = modelo.restricoes
+            grupos = modelo.c7.grupos if modelo.c7 is not None else []
+        if "J5" in dominios: # C5
+            dominios["J5"] = [t for t in dominios["J5"] if t != "T2"]
+        if any(t not in ("T1", "T2") for d in dominios.values() for t in d):
+            raise ValueError("A enumeração por bits só trata os times T1 e T2")
+        self.lista_ordenada = lista_ordenada
+        self.vazio = any(not d for d in dominios.values()) # Algum domínio vazio: nenhuma solução
+        self.livres = [v for v in lista_ordenada if len(dominios[v]) == 2]
+        self.bit = {v: 1 << i for i, v in enumerate(self.livres)}
+        self.fixos = {v: d[0] for v, d in dominios.items() if len(d) == 1}
+
+        n = len(lista_ordenada)
+        self.n = n
+        self.min_t1 = max(n // 2, 2) # C1 e C4, como em RestricoesGlobais
+        self.max_t1 = min((n + 1) // 2, n - 2)
+        self.k_fixo = sum(1 for t in self.fixos.values() if t == "T1")
+        self.limite = com_ac3.ler_limite(dados)
+        overais = {j: int(dados["overais"][j]) for j in lista_ordenada}
+        self.soma_total = sum(overais.values())
+        self.soma_fixa = sum(overais[j] for j, t in self.fixos.items() if t == "T1")
+        # tabelas[b][c]: soma dos overais dos livres do byte b de x cujos bits estão ligados em c
+        self.tabelas = []
+        for b in range(0, len(self.livres), 8):
+            grupo = [overais[v] for v in self.livres[b:b + 8]]
+            self.tabelas.append([sum(r for i, r in enumerate(grupo) if c >> i & 1) for c in range(256)])
+
+        self.padroes = set() # (máscara, valor) proibidos sobre os bits dos livres
+        for (x, y), r in restricoes.items():
+            for a in dominios[x]:
+                for b in dominios[y]:
+                    if not r(a, b):
+                        self.proibir(((x, a), (y, b)))
+        if "J1" in dominios and "J2" in dominios: # C2 e C3 explícitas (com C7 em pares o arco de C3 pode ter sido sobrescrito)
+            self.proibir((("J1", "T1"), ("J2", "T1")))
+            self.proibir((("J1", "T2"), ("J2", "T2")))
+        if "J3" in dominios and "J4" in dominios:
+            self.proibir((("J3", "T1"), ("J4", "T2")))
+            self.proibir((("J3", "T2"), ("J4", "T1")))
+        for grupo in grupos: # C7 global: com dois times, times diferentes dois a dois
+            for i in range(len(grupo)):
+                for j in range(i + 1, len(grupo)):
+                    for t in ("T1", "T2"):
+                        self.proibir(((grupo[i], t), (grupo[j], t)))
+        if all(j in dominios for j in ("J1", "J3", "J4")): # C6: V3 = V4 = T1 e V1 = T1
+            self.proibir((("J1", "T1"), ("J3", "T1"), ("J4", "T1")))
+        self.colapsar()
+
+    # Registra a combinação proibida de literais (var, valor), resolvendo os jogadores fixos
+    def proibir(self, literais):
+        mascara = 0
+        valor = 0
+        for var, t in literais:
+            if var in self.fixos:
+                if self.fixos[var] != t:
+                    return # Nunca acontece
+                continue
+            if var not in self.bit: # Domínio vazio (self.vazio já marcado)
+                return
+            mascara |= self.bit[var]
+            if t == "T1":
+                valor |= self.bit[var]
+        if mascara == 0:
+            self.vazio = True # Só fixos: toda atribuição viola
+        else:
+            self.padroes.add((mascara, valor))
+
+    # Livres ligados dois a dois por = ou ≠ (C3, C2, C7 em dupla: as duas combinações iguais, ou as duas
+    # diferentes, proibidas) formam classes com um representante; cada livre é o bit do representante, invertido
+    # ou não (paridade). A enumeração percorre só os representantes, e os bits de todos os livres saem de
+    # x = paridade ^ (classes dos representantes ligados), por tabelas de 256 entradas por byte.
+    def colapsar(self):
+        m = len(self.livres)
+        pai = list(range(m))
+        paridade = [0] * m # Em relação ao pai
+        def raiz(i):
+            p = 0
+            while pai[i] != i:
+                p ^= paridade[i]
+                i = pai[i]
+            return i, p
+        proibidos = {}
+        for mascara, valor in self.padroes:
+            if mascara.bit_count() == 2:
+                proibidos.setdefault(mascara, set()).add(valor)
+        for mascara, valores in proibidos.items():
+            i = (mascara & -mascara).bit_length() - 1
+            j = mascara.bit_length() - 1
+            if {0, mascara} <= valores:
+                diferenca = 1
+            elif {1 << i, 1 << j} <= valores:
+                diferenca = 0
+            else:
+                continue
+            (ri, pi), (rj, pj) = raiz(i), raiz(j)
+            if ri == rj:
+                if pi ^ pj != diferenca:
+                    self.vazio = True # Ciclo de = e ≠ contraditório
+                continue
+            pai[rj] = ri
+            paridade[rj] = pi ^ pj ^ diferenca
+        raizes = [raiz(i) for i in range(m)]
+        representantes = [i for i in range(m) if pai[i] == i]
+        self.dimensao = len(representantes) # Bits enumerados
+        self.paridade = sum(1 << i for i, (_, p) in enumerate(raizes) if p)
+        classe = {r: 0 for r in representantes}
+        for i, (r, _) in enumerate(raizes):
+            classe[r] |= 1 << i
+        self.expansao = [] # expansao[b][c]: livres invertidos pelos representantes do byte b ligados em c
+        if self.dimensao < m:
+            for b in range(0, self.dimensao, 8):
+                grupo = [classe[r] for r in representantes[b:b + 8]]
+                self.expansao.append([sum(g for i, g in enumerate(grupo) if c >> i & 1) for c in range(256)])
+        # Padrões dentro de uma só classe valem sempre ou nunca (ou restringem só o representante)
+        padroes = []
+        for mascara, valor in self.padroes:
+            r = {raizes[i][0] for i in range(m) if mascara >> i & 1}
+            if len(r) == 1:
+                viola = [(x & mascara) == valor for x in (self.paridade, self.paridade ^ classe[r.pop()])]
+                if all(viola):
+                    self.vazio = True
+                if not any(viola) or all(viola):
+                    continue
+            padroes.append((mascara, valor))
+        self.padroes = sorted(padroes)
+
+    # Atribuições válidas do bloco [inicio, fim) de representantes (vetor do NumPy), como bits dos livres
+    def validos_numpy(self, inicio, fim):
+        x = np.arange(inicio, fim, dtype=np.uint64)
+        if self.expansao:
+            representantes = x
+            x = np.full(len(x), self.paridade, dtype=np.uint64)
+            for b, tabela in enumerate(self.expansao):
+                x ^= np.asarray(tabela, dtype=np.uint64)[((representantes >> np.uint64(8 * b)) & np.uint64(255)).astype(np.intp)]
+        k = self.k_fixo + contar_bits(x)
+        ok = (k >= self.min_t1) & (k <= self.max_t1)
+        x, k = x[ok], k[ok]
+        if len(x) and self.padroes:
+            ok = np.ones(len(x), dtype=bool)
+            for mascara, valor in self.padroes:
+                ok &= (x & np.uint64(mascara)) != np.uint64(valor)
+            x, k = x[ok], k[ok]
+        if len(x) and self.limite is not None:
+            soma = np.full(len(x), self.soma_fixa, dtype=np.int64)
+            for b, tabela in enumerate(self.tabelas):
+                soma += np.asarray(tabela, dtype=np.int64)[((x >> np.uint64(8 * b)) & np.uint64(255)).astype(np.intp)]
+            ok = (soma / k <= self.limite) & ((self.soma_total - soma) / (self.n - k) <= self.limite)
+            x = x[ok]
+        return x.tolist()
+
+    # Mesma verificação, um inteiro por vez
+    def validos_python(self, inicio, fim):
+        validos = []
+        padroes = self.padroes
+        for x in range(inicio, fim):
+            if self.expansao:
+                representantes = x
+                x = self.paridade
+                for b, tabela in enumerate(self.expansao):
+                    x ^= tabela[representantes >> (8 * b) & 255]
+            k = self.k_fixo + x.bit_count()
+            if k < self.min_t1 or k > self.max_t1:
+                continue
+            if any(x & mascara == valor for mascara, valor in padroes):
+                continue
+            if self.limite is not None:
+                soma = self.soma_fixa
+                for b, tabela in enumerate(self.tabelas):
+                    soma += tabela[x >> (8 * b) & 255]
+                if soma / k > self.limite or (self.soma_total - soma) / (self.n - k) > self.limite:
+                    continue
+            validos.append(x)
+        return validos
+
+    def solucao(self, x): # Inteiro -> {jogador: time}
+        bit = self.bit
+        return {v: (self.fixos[v] if v in self.fixos else ("T1" if x & bit[v] else "T2")) for v in self.lista_ordenada}
+
+    # Gera listas com os inteiros válidos, bloco a bloco. stats["testadas"] soma as atribuições testadas
+    def blocos(self, stats, usar_numpy=None, limite_relogio=None):
+        if self.vazio or self.min_t1 > self.max_t1:
+            return
+        if usar_numpy is None:
+            usar_numpy = np is not None
+        validos = self.validos_numpy if usar_numpy and len(self.livres) <= 64 else self.validos_python # uint64
+        total = 1 << self.dimensao
+        for inicio in range(0, total, BLOCO):
+            if limite_relogio is not None and time.time() >= limite_relogio:
+                stats["interrompido"] = "tempo"
+                return
+            fim = min(inicio + BLOCO, total)
+            stats["testadas"] += fim - inicio
+            yield validos(inicio, fim)
+
+# O modelo é pequeno o bastante para a escolha automática da enumeração?
+def cabe(dados, modelo):
+    if not com_ac3.LimitesTimes(dados).padrao or any(t not in ("T1", "T2") for t in modelo.valores):
+        return False
+    if sum(1 for v in modelo.lista_ordenada if len(modelo.dominios[v]) == 2) > 64:
+        return False
+    return Enumerador(dados, modelo).dimensao <= (MAX_LIVRES if np is not None else MAX_LIVRES_SEM_NUMPY)
+
+# Motor de iter_solucoes: gera as soluções (ou, com apenas_contar, a contagem acumulada a cada bloco) e
+# preenche stats no formato da busca (nodes e retrocessos ficam em 0)
+def enumerar(dados, modelo, stats, max_solucoes=None, apenas_contar=False, tempo_maximo=None, usar_numpy=None):
+    enumerador = Enumerador(dados, modelo)
+    usar_numpy = (np is not None) if usar_numpy is None else usar_numpy
+    stats.update({"motor": "enumeracao", "numpy": usar_numpy, "livres": len(enumerador.livres),
+                  "dimensao": enumerador.dimensao, "testadas": 0})
+    limite_relogio = (time.time() + tempo_maximo) if tempo_maximo is not None else None
+    for validos in enumerador.blocos(stats, usar_numpy, limite_relogio):
+        if max_solucoes is not None and stats["solutions"] + len(validos) >= max_solucoes:
+            validos = validos[:max_solucoes - stats["solutions"]]
+            stats["interrompido"] = "solucoes"
+        if apenas_contar:
+            if validos:
+                stats["solutions"] += len(validos)
+                yield stats["solutions"]
+        else:
+            for x in validos:
+                stats["solutions"] += 1
+                yield enumerador.solucao(x)
+        if stats["interrompido"] is not None:
+            return
+
+# Oráculo para conferir os outros motores: todas as soluções da instância, por enumeração direta do JSON
+# (domínios originais, sem AC-3 nem restrições globais). Retorna: (lista de soluções, stats)
+def oraculo(dados, usar_numpy=None):
+    inicio = time.time()
+    enumerador = Enumerador(dados)
+    stats = {"livres": len(enumerador.livres), "dimensao": enumerador.dimensao, "testadas": 0, "interrompido": None}
+    solucoes = []
+    for validos in enumerador.blocos(stats, usar_numpy):
+        solucoes.extend(map(enumerador.solucao, validos))
+    stats["solutions"] = len(solucoes)
+    stats["time"] = time.time() - inicio
+    return solucoes, stats
+
+def main(caminho):
+    with open(caminho, "r") as arquivo:
+        dados = json.load(arquivo)
+    solucoes, stats = oraculo(dados)
+    print(f"Jogadores livres: {stats['livres']} ({stats['dimensao']} bits enumerados) | Atribuições testadas: {stats['testadas']}")
+    print(f"Soluções: {stats['solutions']} | Tempo: {stats['time']:.6f} s")
+    quantidade, stats_busca = com_ac3.contar_solucoes(dados, enumeracao=False)
+    print(f"Busca com AC-3: {quantidade} soluções em {stats_busca['time']:.6f} s")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "dificil.json")
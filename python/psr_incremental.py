@@ -0,0 +1,305 @@
+import copy
+import operator
+import time
+from bisect import insort
+
+import psr_python_trab_com_ac3 as com_ac3
+
+# Resolução incremental para edições ao vivo do elenco (interface interativa).
+# SolverIncremental guarda o modelo compilado, o ponto fixo do AC-3 (restrições binárias e C7) e a última solução.
+# Cada edição (entrar/sair jogador, apertar/afrouxar domínio, mudar overall, ligar/desligar C7 e C8) atualiza só o
+# que mudou:
+#   - apertar (restringir domínio, novo jogador, ligar C7): o ponto fixo antigo continua válido como ponto de
+#     partida; o AC-3 recomeça só pelos arcos que chegam nas variáveis podadas
+#   - afrouxar (relaxar domínio, tirar jogador): valores podados antes podem voltar, então os domínios da
+#     componente conexa afetada (arcos binários e grupos de C7) voltam ao original e só ela é propagada de novo
+#   - overall e C8 só mexem nas restrições globais, que são refeitas a cada resolver (custo O(n))
+# resolver primeiro tenta consertar a solução anterior (mantém os times de quem não foi afetado e completa o resto);
+# se não der, faz a busca completa preferindo os times da solução anterior, para mudar o mínimo possível.
+# Exemplo:
+#   solver = SolverIncremental(dados)
+#   solucao, stats = solver.resolver()
+#   solver.remover_jogador("J9")
+#   solver.mudar_overall("J7", 85)
+#   solucao, stats = solver.resolver() # stats["modo"]: "reparo", "busca" ou "inconsistente"
+
+# Jogadores citados por nome em C2, C3, C5 e C6 (a verificação final precisa deles)
+JOGADORES_FIXOS = ("J1", "J2", "J3", "J4", "J5")
+
+# Usa o gancho limitante do iter_solucoes só para ordenar: os times de uma solução de referência vêm primeiro
+class Preferencia:
+    def __init__(self, referencia):
+        self.referencia = referencia
+
+    def preparar(self, dominios):
+        pass
+
+    def encerrar(self, dominios):
+        pass
+
+    def podar(self):
+        return False
+
+    def ordenar(self, var, valores):
+        preferido = self.referencia.get(var)
+        return sorted(valores, key=lambda v: v != preferido)
+
+class SolverIncremental:
+    # dados: instância no formato JSON (é copiada; as edições não mexem no original)
+    # opcoes: repassadas para iter_solucoes na busca (heuristica, backjumping, nogoods...); propagacao,
+    #         propagar_globais e c7_global valem também para o modelo mantido aqui. A heurística padrão é dom_wdeg,
+    #         como no psr_otimizacao (com MRV puro a primeira solução de elencos grandes pode demorar)
+    def __init__(self, dados, propagacao="ac3", propagar_globais=True, c7_global=True, **opcoes):
+        com_ac3.exigir_dois_times(dados)
+        self.dados = copy.deepcopy(dados)
+        self.propagacao = propagacao
+        self.propagar_globais = propagar_globais
+        self.c7_global = c7_global
+        self.opcoes = dict(opcoes)
+        self.opcoes.setdefault("heuristica", "dom_wdeg")
+        self.solucao = None # Última solução encontrada
+        self.stats_ac = {"revisoes": 0, "checagens": 0}
+        valores = sorted({t for times in self.dados["jogadores"].values() for t in times} | {"T1", "T2"})
+        self.lista_ordenada = sorted(self.dados["jogadores"])
+        self.binario_ok = True # False se o último ponto fixo esvaziou algum domínio
+        self.ac = com_ac3.DominiosBitset({v: self.dados["jogadores"][v] for v in self.lista_ordenada}, valores)
+        self.reconstruir()
+
+    # True se a C7 está ligada na instância (mesma regra de compilar_modelo)
+    def c7_ativa(self):
+        return com_ac3.c7_ativa(self.dados)
+
+    # Remonta todas as restrições binárias e refaz o ponto fixo do zero (construção e mudanças que afetam todos)
+    def reconstruir(self):
+        c7 = self.c7_ativa()
+        self.restricoes, self.vizinhos, self.entrantes = com_ac3.construir_restricoes_binarias(
+            self.lista_ordenada, self.dados["posicoes"], c7_pares=c7 and not self.c7_global)
+        self.tabelas = {r.nome: r for r in self.restricoes.values()} # Uma tabela por tipo, compartilhada pelos arcos
+        self.montar_c7()
+        self.afrouxar(self.lista_ordenada)
+
+    def montar_c7(self): # Agrupar por posição custa O(n); refeito quando o elenco muda
+        ativa = self.c7_ativa() and self.c7_global
+        self.c7 = com_ac3.RestricaoPosicao(self.lista_ordenada, self.dados["posicoes"]) if ativa else None
+
+    # Domínio original de var (com C5 já aplicada, como no pré-processamento)
+    def mascara_original(self, var):
+        mascara = self.ac.codificar(self.dados["jogadores"][var])
+        if var == "J5" and self.propagar_globais:
+            mascara &= ~self.ac.bit["T2"]
+        return mascara
+
+    # Componente conexa das variáveis dadas pelos arcos binários e pelos grupos de C7
+    def componente(self, variaveis):
+        visitados = set(v for v in variaveis if v in self.ac)
+        pilha = list(visitados)
+        while pilha:
+            var = pilha.pop()
+            ligados = list(self.vizinhos.get(var, ()))
+            if self.c7 is not None:
+                ligados += self.c7.companheiros(var)
+            for outro in ligados:
+                if outro not in visitados:
+                    visitados.add(outro)
+                    pilha.append(outro)
+        return visitados
+
+    # Ponto fixo depois de podar: o AC-3 começa pelos arcos que chegam nas variáveis dadas.
+    # Podar nunca conserta uma inconsistência: se o ponto fixo anterior já falhou (algum domínio vazio, talvez
+    # fora das variáveis dadas), continua inconsistente sem propagar nada
+    def apertar(self, variaveis):
+        arcos = {arco for var in variaveis for arco in self.entrantes.get(var, ())}
+        ok = self.binario_ok and all(self.ac.mascaras[v] for v in variaveis)
+        while ok: # C7 global e AC-3 se alternam, como no compilar_modelo
+            marca = self.ac.marca()
+            if self.c7 is not None:
+                ok = self.c7.propagar_inicial(self.ac)
+                arcos.update(arco for var, _ in self.ac.trilha[marca:] for arco in self.entrantes[var])
+            ok = ok and com_ac3.ac3(self.ac, self.restricoes, self.entrantes, self.propagacao, self.stats_ac, arcos)
+            arcos = set()
+            if self.c7 is None or self.ac.marca() == marca:
+                break
+        self.ac.trilha.clear() # Sem desfazer aqui: a trilha só cresceria
+        self.binario_ok = ok
+        return ok
+
+    # Ponto fixo depois de afrouxar: a componente das variáveis dadas volta aos domínios originais e é propagada
+    # de novo (as outras componentes não dependem dela nos arcos binários nem na C7)
+    def afrouxar(self, variaveis):
+        if not self.binario_ok: # O ponto fixo anterior parou no meio: recomeça de tudo
+            variaveis = self.lista_ordenada
+        componente = self.componente(variaveis)
+        for var in componente:
+            self.ac.mascaras[var] = self.mascara_original(var)
+        self.binario_ok = True # Só as variáveis da componente mudaram, e o resto continua no ponto fixo
+        return self.apertar(componente)
+
+    # --- Edições ---
+
+    # Os times das edições têm de estar entre os valores dos domínios (fixados na construção)
+    def conferir_times(self, times):
+        desconhecidos = [t for t in times if t not in self.ac.bit]
+        if desconhecidos:
+            raise ValueError(f"Times desconhecidos: {desconhecidos} (válidos: {list(self.ac.valores)})")
+
+    def adicionar_jogador(self, nome, times, overall, posicao):
+        if nome in self.ac:
+            raise ValueError(f"Jogador já existe: {nome}")
+        self.conferir_times(times)
+        self.dados["jogadores"][nome] = list(times)
+        self.dados["overais"][nome] = str(overall)
+        self.dados["posicoes"][nome] = posicao
+        insort(self.lista_ordenada, nome)
+        self.ac.mascaras[nome] = self.mascara_original(nome)
+        self.vizinhos[nome] = set()
+        self.entrantes[nome] = []
+        # Mesmos arcos (e na mesma ordem) que construir_restricoes_binarias criaria para o jogador
+        pares = {"J1": ("J2", "C2", operator.ne), "J2": ("J1", "C2", operator.ne),
+                 "J3": ("J4", "C3", operator.eq), "J4": ("J3", "C3", operator.eq)}
+        if nome in pares and pares[nome][0] in self.ac:
+            outro, tipo, relacao = pares[nome]
+            self.ligar(nome, outro, tipo, relacao)
+        if self.c7_ativa() and not self.c7_global:
+            for outro in self.lista_ordenada:
+                if outro != nome and self.dados["posicoes"].get(outro) == posicao:
+                    self.ligar(nome, outro, "C7", operator.ne)
+        self.montar_c7()
+        self.apertar([nome] + list(self.vizinhos[nome]) + (self.c7.companheiros(nome) if self.c7 else []))
+
+    def remover_jogador(self, nome):
+        if nome in JOGADORES_FIXOS:
+            raise ValueError(f"{nome} é citado pelas restrições C2/C3/C5/C6 e não pode sair")
+        if nome not in self.ac:
+            raise KeyError(nome)
+        ligados = set(self.vizinhos[nome]) | set(self.c7.companheiros(nome) if self.c7 else ())
+        for outro in self.vizinhos.pop(nome):
+            del self.restricoes[(nome, outro)], self.restricoes[(outro, nome)]
+            self.vizinhos[outro].discard(nome)
+            self.entrantes[outro].remove((nome, outro))
+        del self.entrantes[nome]
+        self.lista_ordenada.remove(nome)
+        del self.ac.mascaras[nome]
+        for chave in ("jogadores", "overais", "posicoes"):
+            del self.dados[chave][nome]
+        self.montar_c7()
+        self.afrouxar(ligados)
+
+    # Tira do domínio de nome os times fora de `times` (nova restrição unária, como a C5)
+    def restringir_dominio(self, nome, times):
+        self.conferir_times(times)
+        self.dados["jogadores"][nome] = [t for t in self.dados["jogadores"][nome] if t in times]
+        self.ac.restringir(nome, self.ac.codificar(times))
+        self.apertar([nome])
+
+    # Devolve ao domínio de nome os times dados
+    def relaxar_dominio(self, nome, times):
+        self.conferir_times(times)
+        atuais = self.dados["jogadores"][nome]
+        self.dados["jogadores"][nome] = atuais + [t for t in times if t not in atuais]
+        self.afrouxar([nome])
+
+    def mudar_overall(self, nome, overall): # Só C8 e as globais usam os overais
+        if nome not in self.ac:
+            raise KeyError(nome)
+        self.dados["overais"][nome] = str(overall)
+
+    def definir_c7(self, ativa):
+        if ativa == self.c7_ativa():
+            return
+        if ativa:
+            self.dados["restricoes"]["C7"] = "Jogadores na mesma posicao nao podem estar no mesmo time (opcional)"
+        else:
+            del self.dados["restricoes"]["C7"]
+        self.reconstruir()
+
+    # limite: média máxima por time (None desliga a C8)
+    def definir_c8(self, limite):
+        if limite is None:
+            self.dados.pop("limite", None)
+            self.dados["restricoes"].pop("C8", None)
+        else:
+            self.dados["limite"] = {"numero": str(limite)}
+            self.dados["restricoes"]["C8"] = "Media de overais por time nao pode ultrapassar limite (opcional)"
+
+    # Arcos x -> y e y -> x com a tabela do tipo dado (a mesma de todos os arcos desse tipo)
+    def ligar(self, x, y, tipo, relacao):
+        tabela = self.tabelas.setdefault(tipo, com_ac3.TabelaRestricao(tipo, relacao))
+        for a, b in ((x, y), (y, x)):
+            if (a, b) not in self.restricoes:
+                self.entrantes[b].append((a, b))
+            self.restricoes[(a, b)] = tabela
+            self.vizinhos[a].add(b)
+
+    # --- Resolução ---
+
+    # Modelo compilado com o ponto fixo atual e as restrições globais propagadas sobre ele
+    def modelo(self):
+        inicio = time.time()
+        dominios = com_ac3.DominiosBitset({}, self.ac.valores)
+        dominios.mascaras = {v: self.ac.mascaras[v] for v in self.lista_ordenada}
+        ok = self.binario_ok
+        if ok and self.propagar_globais:
+            globais = com_ac3.criar_globais(self.dados, dominios, self.c7)
+            ok = globais.propagar(self.restricoes, self.vizinhos)
+        n = len(self.lista_ordenada) or 1
+        stats_pre = {"time_pre": time.time() - inicio,
+                     "revisoes": self.stats_ac["revisoes"],
+                     "checagens": self.stats_ac["checagens"],
+                     "tam_medio_inicial": sum(len(self.dados["jogadores"][v]) for v in self.lista_ordenada) / n,
+                     "tam_medio_final": sum(dominios.tamanho(v) for v in self.lista_ordenada) / n}
+        return com_ac3.ModeloCompilado(list(self.lista_ordenada), self.restricoes, self.vizinhos, self.entrantes, self.c7,
+                                       self.propagar_globais, dominios.como_listas(), dominios.valores, ok, stats_pre)
+
+    # Tentativa de conserto sem busca: cada jogador fica no time da solução anterior se ele ainda estiver no seu
+    # domínio; quem é novo ou perdeu o time vai para o time possível com menos jogadores
+    def consertar(self, modelo):
+        tentativa = {}
+        pendentes = []
+        for var in modelo.lista_ordenada:
+            antigo = self.solucao.get(var)
+            if antigo is not None and antigo in modelo.dominios[var]:
+                tentativa[var] = antigo
+            else:
+                pendentes.append(var)
+        for var in pendentes:
+            if not modelo.dominios[var]:
+                return tentativa, False
+            tamanhos = {t: 0 for t in modelo.dominios[var]}
+            for t in tentativa.values():
+                if t in tamanhos:
+                    tamanhos[t] += 1
+            tentativa[var] = min(modelo.dominios[var], key=lambda t: tamanhos[t])
+        return tentativa, com_ac3.verificacao_final(tentativa, self.dados)
+
+    # Resolve a instância atual
+    # tempo_maximo: orçamento da busca (se o conserto não bastar)
+    # Retorna (solução ou None, stats). stats["modo"]: "reparo" (solução anterior consertada sem busca), "busca" ou
+    #         "inconsistente" (a propagação já provou que não há solução); stats["alterados"]: jogadores que
+    #         mudaram de time em relação à solução anterior
+    def resolver(self, tempo_maximo=None):
+        inicio = time.time()
+        modelo = self.modelo()
+        stats = {"time_propagacao": modelo.stats_pre["time_pre"], "nodes": 0}
+        solucao = None
+        if not modelo.consistente:
+            stats["modo"] = "inconsistente"
+        else:
+            referencia = {}
+            if self.solucao is not None:
+                referencia, valida = self.consertar(modelo)
+                if valida:
+                    solucao = referencia
+                    stats["modo"] = "reparo"
+            if solucao is None:
+                stats["modo"] = "busca"
+                opcoes = dict(self.opcoes, max_solucoes=1, tempo_maximo=tempo_maximo, modelo=modelo,
+                              limitante=Preferencia(referencia))
+                for solucao in com_ac3.iter_solucoes(self.dados, stats=stats, **opcoes):
+                    pass
+                stats["time_propagacao"] = modelo.stats_pre["time_pre"]
+        anterior = self.solucao or {}
+        stats["alterados"] = sum(1 for j, t in (solucao or {}).items() if j in anterior and anterior[j] != t)
+        stats["time"] = time.time() - inicio
+        if solucao is not None:
+            self.solucao = dict(solucao)
+        return solucao, stats
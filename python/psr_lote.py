@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
+import psr_componentes
+import psr_otimizacao
+import psr_python_trab_com_ac3 as com_ac3
+
+# Resolve muitas instâncias de uma vez: arquivos, diretórios (todos os *.json) ou a entrada padrão ("-", um JSON
+# ou várias instâncias em JSONL), num pool de processos. Cada instância vira uma linha JSON na saída, escrita
+# assim que fica pronta (na ordem em que terminam; o campo "instancia" diz de qual entrada é a linha).
+# O modelo pré-processado (restrições, vizinhos, domínios depois de C5/C7/AC-3/globais) vai para um cache em
+# disco com pickle, indexado pelo hash do conteúdo da instância e das opções do pré-processamento; instâncias
+# repetidas pulam a leitura do JSON e o pré-processamento.
+# Uso: python psr_lote.py [opções] entrada [entrada ...]
+#   python psr_lote.py instancias/ --contar --trabalhadores 8 --saida resultados.jsonl
+#   cat lote.jsonl | python psr_lote.py - --max-solucoes 1 -v 2
+
+# Muda quando o formato do ModeloCompilado muda, invalidando o cache antigo
+VERSAO_CACHE = 4
+
+# Níveis de verbosidade da saída
+#   0: instância, quantidade de soluções e status
+#   1: + estatísticas da busca (padrão)
+#   2: + lista de soluções
+VERBOSIDADES = (0, 1, 2)
+
+# Opções de iter_solucoes que mudam o modelo compilado (entram na chave do cache)
+OPCOES_MODELO = ("propagacao", "propagar_globais", "c7_global", "consistencia")
+
+# Chave do cache: hash do conteúdo bruto da instância e das opções do pré-processamento
+def chave_cache(conteudo, opcoes):
+    h = hashlib.sha256()
+    h.update(f"v{VERSAO_CACHE}|".encode())
+    h.update(json.dumps({k: opcoes.get(k) for k in OPCOES_MODELO}, sort_keys=True).encode())
+    h.update(b"|")
+    h.update(conteudo)
+    return h.hexdigest()
+
+# Lê (dados, modelo) do cache, ou None se não houver (ou se o arquivo estiver corrompido/velho)
+def ler_cache(diretorio, chave):
+    caminho = os.path.join(diretorio, chave[:2], chave + ".pkl")
+    try:
+        with open(caminho, "rb") as arquivo:
+            return pickle.load(arquivo)
+    except FileNotFoundError:
+        return None
+    except Exception: # Entrada quebrada: recompila e sobrescreve
+        return None
+
+# Grava no cache de forma atômica (arquivo temporário + rename), seguro com vários processos
+def gravar_cache(diretorio, chave, dados, modelo):
+    pasta = os.path.join(diretorio, chave[:2])
+    os.makedirs(pasta, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as arquivo:
+            pickle.dump((dados, modelo), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, os.path.join(pasta, chave + ".pkl"))
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+# Resolve uma instância (roda no processo trabalhador)
+# tarefa: (nome, conteúdo em bytes, opções de iter_solucoes, diretório do cache ou None, verbosidade)
+# Retorna o dicionário que vira a linha de saída
+def resolver_instancia(tarefa):
+    nome, conteudo, opcoes, diretorio_cache, verbosidade = tarefa
+    resultado = {"instancia": nome}
+    try:
+        entrada = None
+        chave = None
+        if diretorio_cache is not None:
+            chave = chave_cache(conteudo, opcoes)
+            entrada = ler_cache(diretorio_cache, chave)
+        resultado["cache"] = entrada is not None
+        if entrada is None:
+            dados = json.loads(conteudo)
+            modelo = com_ac3.compilar_modelo(dados, **{k: opcoes[k] for k in OPCOES_MODELO if k in opcoes})
+            if chave is not None:
+                gravar_cache(diretorio_cache, chave, dados, modelo)
+        else:
+            dados, modelo = entrada
+
+        opcoes_busca = {k: v for k, v in opcoes.items() if k not in OPCOES_MODELO and k not in ("componentes", "objetivo")}
+        stats = {}
+        solucoes = []
+        if opcoes.get("componentes"): # Contagem por componentes (psr_componentes), sem busca
+            stats = psr_componentes.contar_por_componentes(dados, modelo=modelo)[1]
+            stats.update({"interrompido": None, "fronteira": []})
+        elif opcoes.get("objetivo"): # Melhor divisão por branch-and-bound (psr_otimizacao)
+            for k in ("apenas_contar", "max_solucoes", "simetria"):
+                opcoes_busca.pop(k)
+            melhor, stats = psr_otimizacao.otimizar(dados, opcoes["objetivo"], modelo=modelo, **opcoes_busca)
+            resultado["valor"] = stats["valor"]
+            resultado["otimo"] = stats["otimo"]
+            resultado["solucao"] = melhor
+            resultado["solucoes"] = int(melhor is not None) # Só a melhor divisão é devolvida
+            resultado["melhorias"] = len(stats["melhorias"]) # Incumbentes achadas (stats["solutions"] da busca)
+        else:
+            for item in com_ac3.iter_solucoes(dados, stats=stats, modelo=modelo, **opcoes_busca):
+                if verbosidade >= 2 and not opcoes_busca.get("apenas_contar"):
+                    solucoes.append(item)
+        if not resultado["cache"]: # Compilado aqui: o pré-processamento entra no tempo
+            stats["time_pre"] = modelo.stats_pre["time_pre"]
+            stats["time"] += stats["time_pre"]
+        if "solucoes" not in resultado:
+            resultado["solucoes"] = stats["solutions"]
+        resultado["completo"] = stats["interrompido"] in (None, "solucoes")
+        if verbosidade >= 1:
+            stats["fronteira"] = len(stats["fronteira"]) # Só o tamanho: a lista pode ser enorme
+            resultado["stats"] = stats
+        if verbosidade >= 2:
+            resultado["lista_solucoes"] = solucoes
+    except Exception as erro:
+        resultado["erro"] = f"{type(erro).__name__}: {erro}"
+    return resultado
+
+# Expande as entradas em tarefas (nome, conteúdo em bytes)
+def ler_entradas(caminhos):
+    for caminho in caminhos:
+        if caminho == "-":
+            texto = sys.stdin.buffer.read()
+            try:
+                json.loads(texto) # Um único documento JSON
+                yield "stdin", texto
+            except ValueError: # Senão, JSONL: uma instância por linha
+                for i, linha in enumerate(texto.splitlines(), start=1):
+                    if linha.strip():
+                        yield f"stdin:{i}", linha
+        elif os.path.isdir(caminho):
+            for nome in sorted(os.listdir(caminho)):
+                if nome.endswith(".json"):
+                    completo = os.path.join(caminho, nome)
+                    with open(completo, "rb") as arquivo:
+                        yield completo, arquivo.read()
+        else:
+            with open(caminho, "rb") as arquivo:
+                yield caminho, arquivo.read()
+
+# Resolve as tarefas no pool e devolve cada resultado assim que fica pronto. As tarefas são lidas da entrada
+# aos poucos: no máximo janela delas (conteúdo já lido) ficam em andamento ou na fila do pool ao mesmo tempo
+def resolver_em_fluxo(pool, tarefas, janela):
+    pendentes = set()
+    for tarefa in tarefas:
+        if len(pendentes) >= janela:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield futuro.result()
+        pendentes.add(pool.submit(resolver_instancia, tarefa))
+    while pendentes:
+        prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+        for futuro in prontos:
+            yield futuro.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve instâncias do PSR de divisão de times em lote (saída JSONL)")
+    parser.add_argument("entradas", nargs="+", help="arquivos .json, diretórios ou - (entrada padrão)")
+    parser.add_argument("--saida", default=None, help="arquivo JSONL de saída (padrão: saída padrão)")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="processos no pool (padrão: os.cpu_count())")
+    parser.add_argument("--cache", default=".cache_psr", help="diretório do cache de modelos compilados")
+    parser.add_argument("--sem-cache", action="store_true", help="não lê nem grava o cache")
+    parser.add_argument("-v", "--verbosidade", type=int, choices=VERBOSIDADES, default=1)
+    parser.add_argument("--contar", action="store_true", help="só conta as soluções")
+    parser.add_argument("--max-solucoes", type=int, default=None)
+    parser.add_argument("--tempo-maximo", type=float, default=None, help="segundos por instância")
+    parser.add_argument("--max-nos", type=int, default=None, help="nós por instância")
+    parser.add_argument("--propagacao", choices=com_ac3.MOTORES_PROPAGACAO, default="ac3")
+    parser.add_argument("--heuristica", choices=sorted(com_ac3.HEURISTICAS_VARIAVEIS), default="mrv")
+    parser.add_argument("--c7-pares", action="store_true", help="C7 em arcos par a par em vez da restrição global")
+    parser.add_argument("--sem-globais", action="store_true", help="não propaga C1/C4/C5/C6/C8 durante a busca")
+    parser.add_argument("--consistencia", action="append", type=com_ac3.ler_nivel, default=None,
+                        help="nível extra do pré-processamento: unaria, rpc ou sac[:tempo[:iteracoes]]; repetível")
+    parser.add_argument("--sem-simetria", action="store_true",
+                        help="gera também as soluções espelhadas (times intercambiáveis de dados['times'])")
+    parser.add_argument("--backjumping", action="store_true")
+    parser.add_argument("--nogoods", type=int, default=0, help="capacidade do armazém de nogoods (com --backjumping)")
+    parser.add_argument("--componentes", action="store_true",
+                        help="conta por componentes do grafo de restrições (implica --contar)")
+    parser.add_argument("--objetivo", action="append", type=psr_otimizacao.ler_termo, default=None,
+                        help="nome[=peso]: devolve a melhor divisão (branch-and-bound) em vez de enumerar; repetível")
+    args = parser.parse_args(argv)
+
+    opcoes = {
+        "propagacao": args.propagacao,
+        "propagar_globais": not args.sem_globais,
+        "c7_global": not args.c7_pares,
+        "consistencia": args.consistencia or [],
+        "apenas_contar": args.contar or args.componentes,
+        "max_solucoes": args.max_solucoes,
+        "tempo_maximo": args.tempo_maximo,
+        "max_nos": args.max_nos,
+        "heuristica": args.heuristica,
+        "simetria": not args.sem_simetria,
+        "backjumping": args.backjumping,
+        "nogoods": args.nogoods,
+        "componentes": args.componentes,
+        "objetivo": dict(args.objetivo) if args.objetivo else None,
+    }
+    diretorio_cache = None if args.sem_cache else args.cache
+    tarefas = ((nome, conteudo, opcoes, diretorio_cache, args.verbosidade) for nome, conteudo in ler_entradas(args.entradas))
+    trabalhadores = args.trabalhadores or os.cpu_count() or 1
+
+    saida = open(args.saida, "w") if args.saida else sys.stdout
+    falhas = 0
+    try:
+        with ProcessPoolExecutor(max_workers=trabalhadores) if trabalhadores > 1 else nullcontext() as pool:
+            if pool is not None:
+                resultados = resolver_em_fluxo(pool, tarefas, 2 * trabalhadores)
+            else:
+                resultados = map(resolver_instancia, tarefas)
+            for resultado in resultados:
+                falhas += "erro" in resultado
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                saida.flush()
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
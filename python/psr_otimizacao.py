@@ -0,0 +1,303 @@
+import argparse
+import json
+import math
+import sys
+import time
+
+import psr_python_trab_com_ac3 as com_ac3
+
+# Modo de otimização: em vez de enumerar todas as divisões e escolher depois, procura a melhor segundo um objetivo
+# (a minimizar) com branch-and-bound sobre a mesma busca do iter_solucoes (MRV/LCV, forward checking, globais).
+# Cada objetivo mantém, via dominios.observadores, os dados dos jogadores fixos e indecisos, e calcula em cada nó um
+# limite inferior admissível (nunca maior que o valor de qualquer solução abaixo do nó). Se o limite não fica abaixo
+# da melhor solução já encontrada (a incumbente), o nó é descartado. Cada solução entregue pela busca melhora a
+# anterior, e as melhorias ficam registradas com o instante em que apareceram; com tempo_maximo a busca devolve a
+# melhor encontrada até o prazo.
+# Uso: python psr_otimizacao.py instancia.json [--objetivo diferenca_medias] [--objetivo posicoes_descobertas=0.5 ...]
+#      [--tempo-maximo 10]
+
+# Base dos objetivos. As subclasses implementam contabilizar (contribuição de var com a máscara dada, sinal 1 ou -1),
+# limite (limite inferior com os domínios atuais, math.inf se nenhuma solução cabe) e valor (valor de uma solução)
+class Objetivo:
+    def __init__(self, dados):
+        self.dados = dados
+        self.dominios = None
+
+    # Liga o objetivo aos domínios da busca e monta os contadores
+    def preparar(self, dominios):
+        self.dominios = dominios
+        self.bits = tuple(dominios.bit.get(t, 0) for t in ("T1", "T2"))
+        self.ambos = self.bits[0] | self.bits[1]
+        self.zerar()
+        for var in dominios:
+            self.contabilizar(var, dominios.mascaras[var], 1)
+        dominios.observadores.append(self.ao_mudar)
+
+    def encerrar(self, dominios):
+        if self.ao_mudar in dominios.observadores:
+            dominios.observadores.remove(self.ao_mudar)
+
+    def zerar(self):
+        pass
+
+    def ao_mudar(self, var, antiga, nova):
+        self.contabilizar(var, antiga, -1)
+        self.contabilizar(var, nova, 1)
+
+    # Limite se o domínio de var fosse a máscara dada (sem mexer nos domínios; usado para ordenar os valores)
+    def limite_se(self, var, mascara):
+        antiga = self.dominios.mascaras[var]
+        self.ao_mudar(var, antiga, mascara)
+        try:
+            return self.limite()
+        finally:
+            self.ao_mudar(var, mascara, antiga)
+
+    # Time de var pela máscara: 0 (T1), 1 (T2), None se ainda pode ir para os dois (ou domínio vazio)
+    def time_fixo(self, mascara):
+        for i, b in enumerate(self.bits):
+            if b and mascara == b:
+                return i
+        return None
+
+# Diferença entre as médias de overall dos dois times.
+# Limite: para cada tamanho possível do T1 (C1/C4), os indecisos que faltam no T1 somam entre os k menores e os k
+# maiores overais livres; a diferença é crescente nessa soma, então o menor módulo no intervalo é 0 (se o sinal
+# troca) ou o de uma das pontas. Os overais livres ficam num histograma, então o limite custa O(overais distintos)
+class DiferencaMedias(Objetivo):
+    medias = True
+
+    def __init__(self, dados):
+        super().__init__(dados)
+        self.overais = {j: int(dados["overais"][j]) for j in dados["jogadores"]}
+        self.distintos = sorted(set(self.overais.values()))
+        n = len(self.overais)
+        self.n = n
+        self.min_t1 = max(n // 2, 2) # Mesmo intervalo de RestricoesGlobais (C1 e C4)
+        self.max_t1 = min((n + 1) // 2, n - 2)
+
+    def zerar(self):
+        self.soma = [0, 0]
+        self.conta = [0, 0]
+        self.livres = dict.fromkeys(self.distintos, 0) # Overall -> indecisos com esse overall
+        self.n_livres = 0
+        self.soma_livres = 0
+
+    def contabilizar(self, var, mascara, sinal):
+        r = self.overais[var]
+        i = self.time_fixo(mascara)
+        if i is not None:
+            self.soma[i] += sinal * r
+            self.conta[i] += sinal
+        elif mascara == self.ambos:
+            self.livres[r] += sinal
+            self.n_livres += sinal
+            self.soma_livres += sinal * r
+
+    # Soma dos k menores overais livres
+    def menores(self, k):
+        total = 0
+        for r in self.distintos:
+            if k <= 0:
+                break
+            c = min(self.livres[r], k)
+            total += c * r
+            k -= c
+        return total
+
+    def diferenca(self, soma1, n1, soma2, n2):
+        return soma1 / n1 - soma2 / n2 if self.medias else soma1 - soma2
+
+    def limite(self):
+        melhor = math.inf
+        for n1 in range(self.min_t1, self.max_t1 + 1):
+            k = n1 - self.conta[0] # Indecisos que ainda vão para o T1
+            if k < 0 or k > self.n_livres:
+                continue
+            n2 = self.n - n1
+            baixo = self.menores(k)
+            alto = self.soma_livres - self.menores(self.n_livres - k)
+            a = self.diferenca(self.soma[0] + baixo, n1, self.soma[1] + self.soma_livres - baixo, n2)
+            b = self.diferenca(self.soma[0] + alto, n1, self.soma[1] + self.soma_livres - alto, n2)
+            melhor = min(melhor, 0 if a <= 0 <= b else min(abs(a), abs(b)))
+        return melhor
+
+    def valor(self, solucao):
+        soma = {"T1": 0, "T2": 0}
+        conta = {"T1": 0, "T2": 0}
+        for j, t in solucao.items():
+            soma[t] += self.overais[j]
+            conta[t] += 1
+        return abs(self.diferenca(soma["T1"], conta["T1"], soma["T2"], conta["T2"]))
+
+# Diferença entre as somas de overall dos dois times (mesmo limite da DiferencaMedias)
+class DiferencaSomas(DiferencaMedias):
+    medias = False
+
+# Posições sem jogador em cada time: para cada time, quantas posições do elenco não aparecem nele (0 = os dois
+# times cobrem todas as posições). Limite: numa posição, cada indeciso ainda pode cobrir um dos times que faltam
+class PosicoesDescobertas(Objetivo):
+    def __init__(self, dados):
+        super().__init__(dados)
+        self.posicoes = {j: dados["posicoes"][j] for j in dados["jogadores"]}
+
+    def zerar(self):
+        distintas = set(self.posicoes.values())
+        self.fixos = {p: [0, 0] for p in distintas} # Posição -> jogadores fixos em cada time
+        self.livres = dict.fromkeys(distintas, 0) # Posição -> indecisos
+        self.total = 2 * len(distintas) # Soma das contribuições de todas as posições
+
+    def descobertas(self, p):
+        fixos = self.fixos[p]
+        return 2 - min(2, (fixos[0] > 0) + (fixos[1] > 0) + self.livres[p])
+
+    def contabilizar(self, var, mascara, sinal):
+        p = self.posicoes[var]
+        i = self.time_fixo(mascara)
+        if i is None and mascara != self.ambos:
+            return
+        self.total -= self.descobertas(p)
+        if i is not None:
+            self.fixos[p][i] += sinal
+        else:
+            self.livres[p] += sinal
+        self.total += self.descobertas(p)
+
+    def limite(self):
+        return self.total
+
+    def valor(self, solucao):
+        cobertas = {(self.posicoes[j], t) for j, t in solucao.items()}
+        return 2 * len(set(self.posicoes.values())) - len(cobertas)
+
+# Soma ponderada de objetivos. Pesos negativos deixariam o limite inadmissível (e pesos zero não contam)
+class SomaPonderada(Objetivo):
+    # termos: lista de (peso, Objetivo)
+    def __init__(self, dados, termos):
+        super().__init__(dados)
+        for peso, _ in termos:
+            if peso < 0:
+                raise ValueError(f"Peso negativo na soma ponderada: {peso}")
+        self.termos = [(peso, objetivo) for peso, objetivo in termos if peso > 0]
+
+    def preparar(self, dominios):
+        self.dominios = dominios
+        for _, objetivo in self.termos:
+            objetivo.preparar(dominios)
+
+    def encerrar(self, dominios):
+        for _, objetivo in self.termos:
+            objetivo.encerrar(dominios)
+
+    def ao_mudar(self, var, antiga, nova):
+        for _, objetivo in self.termos:
+            objetivo.ao_mudar(var, antiga, nova)
+
+    def limite(self):
+        return sum(peso * objetivo.limite() for peso, objetivo in self.termos)
+
+    def valor(self, solucao):
+        return sum(peso * objetivo.valor(solucao) for peso, objetivo in self.termos)
+
+# Objetivos disponíveis por nome. Novos objetivos entram aqui
+OBJETIVOS = {
+    "diferenca_medias": DiferencaMedias,
+    "diferenca_somas": DiferencaSomas,
+    "posicoes_descobertas": PosicoesDescobertas,
+}
+
+# Monta o objetivo a partir de um nome, de um dicionário {nome: peso} (soma ponderada) ou de um Objetivo pronto
+def criar_objetivo(especificacao, dados):
+    if isinstance(especificacao, Objetivo):
+        return especificacao
+    if isinstance(especificacao, str):
+        especificacao = {especificacao: 1}
+    termos = []
+    for nome, peso in especificacao.items():
+        if nome not in OBJETIVOS:
+            raise ValueError(f"Objetivo desconhecido: {nome}")
+        termos.append((float(peso), OBJETIVOS[nome](dados)))
+    if len(termos) == 1 and termos[0][0] == 1:
+        return termos[0][1]
+    return SomaPonderada(dados, termos)
+
+# Limitante do iter_solucoes: guarda a incumbente e descarta os nós cujo limite não fica abaixo dela
+class BranchAndBound:
+    def __init__(self, objetivo):
+        self.objetivo = objetivo
+        self.melhor = math.inf # Valor da incumbente
+
+    def preparar(self, dominios):
+        self.objetivo.preparar(dominios)
+        self.bits = dominios.bit
+
+    def encerrar(self, dominios):
+        self.objetivo.encerrar(dominios)
+
+    def podar(self):
+        return self.objetivo.limite() >= self.melhor
+
+    # Valores com menor limite primeiro (ordenação estável: empates ficam na ordem do LCV)
+    def ordenar(self, var, valores):
+        return sorted(valores, key=lambda v: self.objetivo.limite_se(var, self.bits[v]))
+
+# Procura a divisão de menor valor do objetivo
+# objetivo: nome em OBJETIVOS, dicionário {nome: peso} ou Objetivo
+# tempo_maximo: prazo em segundos; se acabar, devolve a melhor solução achada até ali
+# ao_melhorar: função(melhoria, solucao) chamada a cada nova incumbente
+# opcoes: repassadas para iter_solucoes (propagacao, heuristica, backjumping, max_nos, modelo...). A heurística
+#        padrão aqui é dom_wdeg: com MRV puro a primeira solução de elencos grandes pode demorar muito a aparecer
+# Retorna: (melhor solução ou None, stats). Além das estatísticas da busca, stats tem "valor" (da melhor solução),
+#          "melhorias" (lista de {"tempo": segundos desde o início, "valor", "nos"}) e "otimo" (True se a busca
+#          terminou, ou seja, a solução é ótima ou não há solução)
+def otimizar(dados, objetivo="diferenca_medias", tempo_maximo=None, ao_melhorar=None, **opcoes):
+    com_ac3.exigir_dois_times(dados)
+    inicio = time.perf_counter()
+    opcoes.setdefault("heuristica", "dom_wdeg")
+    opcoes.setdefault("simetria", False) # Quebra de simetria só é segura com objetivo que não muda ao trocar os times
+    bb = BranchAndBound(criar_objetivo(objetivo, dados))
+    stats = {}
+    melhor = None
+    melhorias = []
+    for solucao in com_ac3.iter_solucoes(dados, stats=stats, tempo_maximo=tempo_maximo, limitante=bb, **opcoes):
+        melhor = solucao
+        bb.melhor = bb.objetivo.valor(solucao)
+        melhoria = {"tempo": time.perf_counter() - inicio, "valor": bb.melhor, "nos": stats["nodes"]}
+        melhorias.append(melhoria)
+        if ao_melhorar is not None:
+            ao_melhorar(melhoria, solucao)
+    stats["valor"] = bb.melhor if melhor is not None else None
+    stats["melhorias"] = melhorias
+    stats["otimo"] = stats["interrompido"] is None
+    return melhor, stats
+
+# "nome" ou "nome=peso" -> (nome, peso)
+def ler_termo(texto):
+    nome, _, peso = texto.partition("=")
+    return nome, float(peso) if peso else 1.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Melhor divisão de times por branch-and-bound")
+    parser.add_argument("instancia", help="arquivo JSON da instância")
+    parser.add_argument("--objetivo", action="append", type=ler_termo, default=None,
+                        help=f"nome[=peso], repetível para soma ponderada ({', '.join(OBJETIVOS)})")
+    parser.add_argument("--tempo-maximo", type=float, default=None, help="prazo em segundos")
+    parser.add_argument("--heuristica", choices=sorted(com_ac3.HEURISTICAS_VARIAVEIS), default="dom_wdeg")
+    args = parser.parse_args(argv)
+
+    with open(args.instancia) as arquivo:
+        dados = json.load(arquivo)
+    objetivo = dict(args.objetivo) if args.objetivo else "diferenca_medias"
+    mostrar = lambda m, _: print(f"{m['tempo']:>10.4f} s {m['nos']:>10} nós  valor {m['valor']:.6f}")
+    solucao, stats = otimizar(dados, objetivo, args.tempo_maximo, mostrar, heuristica=args.heuristica)
+    if solucao is None:
+        print("Sem solução" + ("" if stats["otimo"] else " dentro do prazo"))
+        return 1
+    print(f"\nValor: {stats['valor']:.6f} ({'ótimo' if stats['otimo'] else 'melhor até o prazo'}) | "
+          f"Nós: {stats['nodes']} | Podas pelo limite: {stats['podas_limite']} | Tempo: {stats['time']:.4f} s")
+    for j in sorted(solucao):
+        print(f"  {j}: {solucao[j]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
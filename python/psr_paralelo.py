@@ -0,0 +1,131 @@
+import copy
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import psr_python_trab_com_ac3 as com_ac3
+
+# Busca em paralelo num pool de processos (o GIL impede ganho com threads).
+# A árvore é dividida nos primeiros níveis escolhidos por MRV/LCV em subproblemas (atribuições parciais).
+# Cada tarefa roda iter_solucoes com um orçamento de nós; se o orçamento acaba, a tarefa devolve a fronteira
+# do que não explorou (stats["fronteira"]) e esses ramos voltam para a fila. Assim subárvores desbalanceadas
+# são redivididas dinamicamente, sem perder nem repetir soluções.
+# Com times intercambiáveis (classes_simetria), divisão e tarefas buscam sem quebra de simetria: fixar o prefixo
+# muda as classes da sub-instância, e a ordem em que cada tarefa atribui as variáveis não é a da raiz. Cada tarefa
+# guarda só as soluções canônicas (SimetriaTimes.canonizar com as classes da instância inteira), uma por família
+# de soluções espelhadas, as mesmas da busca sequencial; solucoes_simetricas soma todas.
+
+# Métricas somadas entre as tarefas
+CHAVES_SOMADAS = ("nodes", "retrocessos", "revisoes", "checagens")
+
+# Cópia de dados com as variáveis do prefixo fixadas (domínio unitário)
+def fixar_prefixo(dados, prefixo):
+    sub = copy.copy(dados)
+    sub["jogadores"] = dict(dados["jogadores"])
+    for var, valor in prefixo.items():
+        sub["jogadores"][var] = [valor]
+    return sub
+
+# Divide a busca em pelo menos min_subproblemas prefixos, aprofundando o corte um nível por vez.
+# Retorna (prefixos, stats da divisão). Os prefixos de tamanho n já são soluções candidatas e são resolvidos como os outros.
+def dividir(dados, min_subproblemas, **opcoes):
+    n = len(dados["jogadores"])
+    prefixos, stats = [{}], {"nodes": 0, "retrocessos": 0, "revisoes": 0, "checagens": 0}
+    for profundidade in range(1, n + 1):
+        stats_corte = {}
+        prefixos = list(com_ac3.iter_solucoes(dados, stats=stats_corte, profundidade_corte=profundidade, **opcoes))
+        for chave in CHAVES_SOMADAS:
+            stats[chave] += stats_corte[chave]
+        if len(prefixos) >= min_subproblemas or profundidade == n:
+            break
+    return prefixos, stats
+
+# Dados da instância, enviados uma vez para cada processo pelo initializer do pool
+_dados_trabalhador = None
+
+def _iniciar_trabalhador(dados):
+    global _dados_trabalhador
+    _dados_trabalhador = dados
+
+# Resolve um subproblema dentro do processo trabalhador
+# Retorna (soluções ou None se apenas_contar, stats com a fronteira não explorada)
+# A fronteira da busca só tem as variáveis que já estavam na pilha: o prefixo inteiro entra em cada ramo, senão
+# as variáveis do prefixo ainda não atribuídas se perdem e o ramo fica mais largo que a própria tarefa.
+# As variáveis do prefixo têm um valor só, então não gastam o orçamento (ver max_nos em iter_solucoes) e cada
+# ramo estende o prefixo com pelo menos uma escolha; se não estender, a redivisão não termina: falha aqui.
+# classes: classes de times intercambiáveis da instância inteira (vazio = sem quebra de simetria)
+def _resolver_subproblema(prefixo, max_nos, apenas_contar, max_solucoes, opcoes, classes=()):
+    stats = {}
+    sub = fixar_prefixo(_dados_trabalhador, prefixo)
+    if not classes:
+        resultado = list(com_ac3.iter_solucoes(sub, max_solucoes=max_solucoes, apenas_contar=apenas_contar, max_nos=max_nos,
+                                               stats=stats, **opcoes))
+    else: # Busca todas as soluções e fica com as canônicas
+        simetrias = com_ac3.SimetriaTimes(classes, sorted(sub["jogadores"]))
+        resultado = []
+        canonicas = 0
+        solucoes = com_ac3.iter_solucoes(sub, max_nos=max_nos, stats=stats, **opcoes)
+        for solucao in solucoes:
+            if simetrias.canonizar(solucao) == solucao:
+                canonicas += 1
+                if not apenas_contar:
+                    resultado.append(solucao)
+                if max_solucoes is not None and canonicas >= max_solucoes:
+                    break
+        solucoes.close() # Fecha a busca para completar stats
+        stats["solucoes_simetricas"] = stats["solutions"]
+        stats["solutions"] = canonicas
+    stats["fronteira"] = [dict(prefixo, **ramo) for ramo in stats["fronteira"]]
+    if any(len(ramo) <= len(prefixo) for ramo in stats["fronteira"]):
+        raise RuntimeError(f"Redivisão sem progresso: a fronteira não estende o prefixo {prefixo}")
+    return (None if apenas_contar else resultado), stats
+
+# Solver paralelo
+# trabalhadores: processos no pool (padrão: os.cpu_count())
+# subproblemas_por_trabalhador: quantos prefixos criar por processo na divisão inicial
+# nos_por_tarefa: orçamento de nós de cada tarefa antes de redividir o que sobrou (None = sem redivisão)
+# apenas_contar: só conta as soluções; max_solucoes: para depois de k soluções
+# opcoes: repassadas para iter_solucoes (propagacao, propagar_globais, simetria)
+# Retorna: (lista de soluções ou quantidade, se apenas_contar, e dicionário de estatísticas agregadas)
+def resolver_paralelo(dados, trabalhadores=None, subproblemas_por_trabalhador=4, nos_por_tarefa=20000,
+                      apenas_contar=False, max_solucoes=None, simetria=True, **opcoes):
+    inicio = time.time()
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    lista_ordenada = sorted(dados["jogadores"])
+    classes = com_ac3.classes_simetria(dados, dados["jogadores"], lista_ordenada) if simetria else []
+    opcoes["simetria"] = False # A simetria, se houver, é quebrada pelas soluções canônicas das tarefas
+    prefixos, stats = dividir(dados, trabalhadores * subproblemas_por_trabalhador, **opcoes)
+    tempo_divisao = time.time() - inicio
+    stats.update({"solutions": 0, "solucoes_simetricas": 0, "tarefas": 0, "redivisoes": 0, "trabalhadores": trabalhadores})
+    solucoes = []
+
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador, initargs=(dados,)) as pool:
+        pendentes = {pool.submit(_resolver_subproblema, p, nos_por_tarefa, apenas_contar, max_solucoes, opcoes, classes)
+                     for p in prefixos}
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                resultado, stats_tarefa = futuro.result()
+                stats["tarefas"] += 1
+                for chave in CHAVES_SOMADAS:
+                    stats[chave] += stats_tarefa[chave]
+                stats["solutions"] += stats_tarefa["solutions"]
+                stats["solucoes_simetricas"] += stats_tarefa["solucoes_simetricas"]
+                if resultado is not None:
+                    solucoes.extend(resultado)
+                if stats_tarefa["fronteira"]: # Tarefa estourou o orçamento: o que sobrou vira novas tarefas
+                    stats["redivisoes"] += 1
+                    for p in stats_tarefa["fronteira"]:
+                        pendentes.add(pool.submit(_resolver_subproblema, p, nos_por_tarefa, apenas_contar, max_solucoes, opcoes,
+                                                  classes))
+            if max_solucoes is not None and stats["solutions"] >= max_solucoes:
+                for futuro in pendentes:
+                    futuro.cancel()
+                break
+
+    if max_solucoes is not None and stats["solutions"] > max_solucoes: # Tarefas paralelas podem passar do limite
+        stats["solutions"] = max_solucoes
+        del solucoes[max_solucoes:]
+    stats["time_split"] = tempo_divisao
+    stats["time"] = time.time() - inicio
+    return (stats["solutions"] if apenas_contar else solucoes), stats
@@ -1,84 +1,507 @@
+import heapq
 import json
+import operator
+import sys
 import time
-from collections import deque
+from collections import OrderedDict, deque
+
+import psr_enumeracao # psr_enumeracao também importa este módulo: aqui só é usado dentro das funções
+from psr_solucoes import ArmazemSolucoes
+
+# Restrição binária em forma extensional: a relação é avaliada uma vez por par de valores e vira uma tabela
+# de compatibilidade indexada pelos bits do DominiosBitset (ver DominiosBitset.tabela). Cada linha/coluna da
+# tabela é uma máscara, então revisão, contagem do LCV e forward checking fazem um AND por arco em vez de
+# chamar uma função por par de valores. Uma mesma tabela é compartilhada por todos os arcos do seu tipo.
+# Continua chamável como as lambdas, então quem usa restricoes[(x, y)](a, b) não muda.
+# As relações embutidas são funções do módulo operator (e não lambdas) para que o modelo compilado possa ir
+# para o cache em disco com pickle (ver compilar_modelo).
+class TabelaRestricao:
+    def __init__(self, nome, relacao):
+        self.nome = nome # Tipo da restrição (ex.: "C2")
+        self.relacao = relacao # relacao(a, b) -> True se os valores são compatíveis
+
+    def __call__(self, a, b):
+        return self.relacao(a, b)
+
+    # linhas[i]: máscara dos b compatíveis com a = valores[i]; colunas[j]: máscara dos a compatíveis com b = valores[j]
+    def compilar(self, valores):
+        linhas = []
+        colunas = []
+        for a in valores:
+            linhas.append(sum(1 << j for j, b in enumerate(valores) if self.relacao(a, b)))
+            colunas.append(sum(1 << i for i, b in enumerate(valores) if self.relacao(b, a)))
+        return linhas, colunas
+
+# Índice de jogadores por posição, montado uma vez: {posicao: [jogadores na ordem de lista_ordenada]}
+def indexar_posicoes(lista_ordenada, posicoes):
+    grupos = {}
+    for j in lista_ordenada:
+        grupos.setdefault(posicoes.get(j), []).append(j)
+    return grupos
 
 # Construir restrições binárias (C2, C3, C7)
-def construir_restricoes_binarias(lista_ordenada, posicoes):
+# Os tipos embutidos viram TabelaRestricao; restrições do usuário podem continuar como lambdas no mesmo dicionário
+# c7_pares: se False, não cria os arcos de C7 (a busca usa RestricaoPosicao, uma restrição global por posição)
+def construir_restricoes_binarias(lista_ordenada, posicoes, c7_pares=True):
     restricoes = {}
     vizinhos = {v: set() for v in lista_ordenada} # Dicionário que mapeia cada variável para o conjunto de outras variáveis que ela possui restrições.
+    entrantes = {v: [] for v in lista_ordenada} # Índice de arcos que chegam em cada variável: entrantes[xi] = [(xk, xi), ...]
     def add(x, y, fn): # Auxiliar para adicionar restrições
+        if (x, y) not in restricoes:
+            entrantes[y].append((x, y))
         restricoes[(x, y)] = fn
         vizinhos[x].add(y)
 
     # C2: J1 e J2 não podem estar no mesmo time.
     if "J1" in lista_ordenada and "J2" in lista_ordenada:
-        add("J1", "J2", lambda a, b: a != b)
-        add("J2", "J1", lambda a, b: a != b)
+        restricao_c2 = TabelaRestricao("C2", operator.ne)
+        add("J1", "J2", restricao_c2)
+        add("J2", "J1", restricao_c2)
 
     # C3: J3 e J4 devem estar no mesmo time
     if "J3" in lista_ordenada and "J4" in lista_ordenada:
-        add("J3", "J4", lambda a, b: a == b)
-        add("J4", "J3", lambda a, b: a == b)
+        restricao_c3 = TabelaRestricao("C3", operator.eq)
+        add("J3", "J4", restricao_c3)
+        add("J4", "J3", restricao_c3)
 
     # C7: Jogadores na mesma posição não podem estar no mesmo time
-    def restricao_c7(a, b): # Função genérica para a restrição de posição
-        return a != b
+    if c7_pares:
+        restricao_c7 = TabelaRestricao("C7", operator.ne) # Tabela única para todos os pares de mesma posição
+        for grupo in indexar_posicoes(lista_ordenada, posicoes).values(): # Só pares dentro do mesmo grupo, sem varrer todos os pares
+            for i in range(len(grupo)):
+                for j in range(i+1, len(grupo)):
+                    add(grupo[i], grupo[j], restricao_c7)
+                    add(grupo[j], grupo[i], restricao_c7)
+    return restricoes, vizinhos, entrantes # Retorna o dicionário de restrições, o de vizinhos e o índice de arcos entrantes
+
+# Monta o índice de arcos entrantes a partir de um dicionário de restrições qualquer (ex.: restrições do usuário)
+def indice_entrantes(restricoes):
+    entrantes = {}
+    for (xk, xi) in restricoes:
+        entrantes.setdefault(xi, []).append((xk, xi))
+    return entrantes
+
+# C7 como restrição global: um grupo por posição (índice montado uma vez a partir de dados["posicoes"]),
+# em vez de dois arcos para cada par de jogadores da mesma posição. Dentro de um grupo todos ficam em times
+# diferentes; com T times, um grupo com mais de T jogadores é impossível (casa dos pombos) e isso é detectado
+# no pré-processamento, antes de qualquer busca.
+class RestricaoPosicao:
+    nome = "C7"
+
+    def __init__(self, lista_ordenada, posicoes):
+        self.grupos = [g for g in indexar_posicoes(lista_ordenada, posicoes).values() if len(g) > 1] # Grupos que restringem algo
+        self.grupo_de = {j: grupo for grupo in self.grupos for j in grupo} # Jogador -> seu grupo
+
+    def companheiros(self, var): # Outros jogadores da mesma posição
+        return [j for j in self.grupo_de.get(var, ()) if j != var]
+
+    # Casa dos pombos: os jogadores do grupo precisam de pelo menos len(grupo) times diferentes disponíveis
+    def cabe(self, dominios, grupo):
+        uniao = 0
+        for j in grupo:
+            uniao |= dominios.mascaras[j]
+        return uniao.bit_count() >= len(grupo)
+
+    # Forward checking da C7: depois de var = valor, tira valor dos companheiros de posição
+    # Retorna False se algum domínio ficar vazio ou o grupo não couber mais nos times
+    def propagar(self, dominios, var, valor):
+        grupo = self.grupo_de.get(var)
+        if grupo is None:
+            return True
+        fora = ~dominios.bit[valor]
+        for outro in grupo:
+            if outro != var and not dominios.restringir(outro, fora):
+                dominios.conflito = (var, outro)
+                return False
+        if len(grupo) > 2 and not self.cabe(dominios, grupo):
+            dominios.conflito = tuple(grupo)
+            return False
+        return True
+
+    # Pré-processamento: casa dos pombos em todos os grupos e poda a partir dos jogadores já fixos, até estabilizar
+    def propagar_inicial(self, dominios):
+        for grupo in self.grupos:
+            if not self.cabe(dominios, grupo):
+                return False
+        pendentes = [j for j in self.grupo_de if dominios.tamanho(j) == 1]
+        while pendentes:
+            j = pendentes.pop()
+            mascara = dominios.mascaras[j]
+            for outro in self.grupo_de[j]:
+                if outro != j and dominios.mascaras[outro] & mascara:
+                    if not dominios.restringir(outro, ~mascara):
+                        return False
+                    if dominios.tamanho(outro) == 1:
+                        pendentes.append(outro)
+        return True
+
+# Domínios como máscaras de bits (um bit por valor) com trilha para desfazer podas.
+# Em vez de copiar o dicionário {var: lista} a cada valor testado, a busca grava na trilha só as
+# máscaras que mudaram e, no retrocesso, volta até a marca anterior sem copiar nada.
+class DominiosBitset:
+    # valores: ordem dos bits (padrão: todos os valores que aparecem nos domínios, ordenados)
+    def __init__(self, dominios, valores=None):
+        self.valores = list(valores) if valores is not None else sorted({val for vals in dominios.values() for val in vals}) # Valores possíveis (ex.: T1, T2)
+        self.indice = {val: i for i, val in enumerate(self.valores)} # Valor -> posição do bit
+        self.bit = {val: 1 << i for i, val in enumerate(self.valores)} # Valor -> bit correspondente
+        self.tabelas = {} # TabelaRestricao -> (linhas, colunas) compiladas para self.valores
+        self.mascaras = {var: self.codificar(vals) for var, vals in dominios.items()}
+        self.trilha = [] # Pilha de (var, máscara antiga) para desfazer as podas
+        self.observadores = [] # Callbacks obs(var, antiga, nova) chamados a cada mudança de máscara (inclusive ao desfazer)
+        self.conflito = None # Variáveis da restrição que causou a última falha de propagação (quando conhecida)
+
+    def codificar(self, valores): # Lista de valores -> máscara
+        mascara = 0
+        for val in valores:
+            mascara |= self.bit[val]
+        return mascara
+
+    def decodificar(self, mascara): # Máscara -> lista de valores (na ordem de self.valores)
+        return [val for val in self.valores if mascara & self.bit[val]]
+
+    # Acesso como dicionário {var: [valores]} para manter compatibilidade com quem lê os domínios
+    def __getitem__(self, var):
+        return self.decodificar(self.mascaras[var])
+
+    def __iter__(self):
+        return iter(self.mascaras)
+
+    def __len__(self):
+        return len(self.mascaras)
+
+    def __contains__(self, var):
+        return var in self.mascaras
+
+    def tamanho(self, var):
+        return self.mascaras[var].bit_count()
 
-    for i in range(len(lista_ordenada)):
-        for j in range(i+1, len(lista_ordenada)):
-            vi = lista_ordenada[i]; vj = lista_ordenada[j]
-            if posicoes.get(vi) == posicoes.get(vj):
-                add(vi, vj, restricao_c7)
-                add(vj, vi, restricao_c7)
-    return restricoes, vizinhos # Retorna o dicionário de restrições e o dicionário de vizinhos
+    def contem(self, var, valor):
+        return bool(self.mascaras[var] & self.bit[valor])
+
+    # Interseção do domínio de var com a máscara. Grava na trilha só se houve mudança.
+    # Retorna a nova máscara (0 significa domínio vazio)
+    def restringir(self, var, mascara):
+        antiga = self.mascaras[var]
+        nova = antiga & mascara
+        if nova != antiga:
+            self.trilha.append((var, antiga))
+            self.mascaras[var] = nova
+            for obs in self.observadores:
+                obs(var, antiga, nova)
+        return nova
+
+    def remover(self, var, valor):
+        return self.restringir(var, ~self.bit[valor])
+
+    # Tabela de compatibilidade (linhas, colunas) da restrição, compilada uma vez para os valores deste domínio
+    def tabela(self, restricao):
+        compilada = self.tabelas.get(restricao)
+        if compilada is None:
+            compilada = self.tabelas[restricao] = restricao.compilar(self.valores)
+        return compilada
+
+    def marca(self): # Posição atual da trilha (ponto de retorno)
+        return len(self.trilha)
+
+    def desfazer(self, marca): # Restaura as máscaras gravadas depois da marca
+        trilha = self.trilha
+        mascaras = self.mascaras
+        observadores = self.observadores
+        while len(trilha) > marca:
+            var, antiga = trilha.pop()
+            atual = mascaras[var]
+            mascaras[var] = antiga
+            for obs in observadores:
+                obs(var, atual, antiga)
+
+    def como_listas(self): # Cópia no formato antigo {var: [valores]}
+        return {var: self.decodificar(m) for var, m in self.mascaras.items()}
+
+    # Se todos os domínios são unitários, devolve a atribuição {var: valor}; senão None
+    def atribuicao(self):
+        arquivo = {}
+        for var, m in self.mascaras.items():
+            if m.bit_count() != 1:
+                return None
+            arquivo[var] = self.valores[m.bit_length() - 1]
+        return arquivo
 
 # AC-3: consistência de arco (pré-processamento)
-# dominios: dicionário {var: [valores possíveis]}
+# dominios: DominiosBitset com os valores possíveis de cada variável
 # restricoes: dicionário {(var1, var2): função que retorna True se valores são compatíveis} (ou seja, se existe restrição entre var1 e var2)
-def revisao(dominios, xi, xj, restricoes): #
+# stats: se informado, acumula stats["revisoes"] e stats["checagens"] (chamadas da função de restrição)
+def revisao(dominios, xi, xj, restricoes, stats=None): #
     if (xi, xj) not in restricoes:
         return False
     cfn = restricoes[(xi, xj)] 
-    removido = False 
-    novo = [] 
+    suportados = 0 # Máscara dos valores de xi que ainda têm suporte em xj
+    checagens = 0
+    if isinstance(cfn, TabelaRestricao): # Caminho rápido: vi tem suporte se sua linha da tabela cruza o domínio de xj
+        linhas = dominios.tabela(cfn)[0]
+        mascara_xj = dominios.mascaras[xj]
+        antiga = restantes = dominios.mascaras[xi]
+        while restantes: # Percorre os bits ligados do domínio de xi
+            bit = restantes & -restantes
+            restantes ^= bit
+            checagens += 1
+            if linhas[bit.bit_length() - 1] & mascara_xj:
+                suportados |= bit
+        if stats is not None:
+            stats["revisoes"] += 1
+            stats["checagens"] += checagens
+        if suportados == antiga:
+            return False
+        dominios.restringir(xi, suportados)
+        return True
+    valores_xj = dominios[xj]
     for vi in dominios[xi]:
         # Existe vj em dominios[xj] que satisfaça cfn(vi, vj)?
-        if any(cfn(vi, vj) for vj in dominios[xj]): # Se existe, mantém vi
-            novo.append(vi)  
-        else:
-            removido = True
-    if removido:
-        dominios[xi] = novo
-    return removido
+        for vj in valores_xj:
+            checagens += 1
+            if cfn(vi, vj): # Se existe, mantém vi
+                suportados |= dominios.bit[vi]
+                break
+    if stats is not None:
+        stats["revisoes"] += 1
+        stats["checagens"] += checagens
+    antiga = dominios.mascaras[xi]
+    dominios.restringir(xi, suportados)
+    return dominios.mascaras[xi] != antiga
+
+# Revisão com suportes residuais (AC-3rm): residuos[(xi, xj, vi)] guarda o último vj que suportou vi.
+# Se esse vj ainda está no domínio de xj, vi continua suportado sem reescanear dominios[xj].
+def revisao_residual(dominios, xi, xj, restricoes, residuos, stats=None):
+    if (xi, xj) not in restricoes:
+        return False
+    cfn = restricoes[(xi, xj)]
+    if isinstance(cfn, TabelaRestricao): # A tabela já responde o suporte com um AND, resíduo não ajuda
+        return revisao(dominios, xi, xj, restricoes, stats)
+    mascara_xj = dominios.mascaras[xj]
+    suportados = 0
+    checagens = 0
+    for vi in dominios[xi]:
+        residuo = residuos.get((xi, xj, vi))
+        if residuo is not None and mascara_xj & dominios.bit[residuo]: # Suporte antigo ainda válido
+            suportados |= dominios.bit[vi]
+            continue
+        for vj in dominios[xj]:
+            checagens += 1
+            if cfn(vi, vj):
+                residuos[(xi, xj, vi)] = vj # Guarda o novo suporte para as próximas revisões
+                suportados |= dominios.bit[vi]
+                break
+    if stats is not None:
+        stats["revisoes"] += 1
+        stats["checagens"] += checagens
+    antiga = dominios.mascaras[xi]
+    dominios.restringir(xi, suportados)
+    return dominios.mascaras[xi] != antiga
+
+# Motores de propagação disponíveis para o pré-processamento
+MOTORES_PROPAGACAO = ("ac3", "ac3rm")
 
 # AC-3 principal
-def ac3(dominios, restricoes): 
+# entrantes: índice {xi: [(xk, xi), ...]} de construir_restricoes_binarias (montado aqui se não vier)
+# motor: "ac3" (revisão clássica) ou "ac3rm" (suportes residuais, ver revisao_residual)
+# stats: se informado, recebe os contadores "revisoes" e "checagens"
+# arcos: arcos iniciais da fila (padrão: todos). Depois de podar só algumas variáveis de um ponto fixo já
+#        calculado, basta começar pelos arcos que chegam nelas (ver psr_incremental.py)
+def ac3(dominios, restricoes, entrantes=None, motor="ac3", stats=None, arcos=None):
+    if motor not in MOTORES_PROPAGACAO:
+        raise ValueError(f"Motor de propagação desconhecido: {motor}")
+    if entrantes is None:
+        entrantes = indice_entrantes(restricoes)
+    if stats is not None:
+        stats.setdefault("revisoes", 0)
+        stats.setdefault("checagens", 0)
+    residuos = {} # Só usado no motor ac3rm
     # Deque (fila) de arcos (xi, xj)
-    # Inicia com todos os arcos
-    # Deque é mais eficiente que lista para pop(0)
-    fila = deque(restricoes.keys()) 
+    # Inicia com todos os arcos (ou só com os informados)
+    # Deque é mais eficiente que lista para pop(0); na_fila evita arcos duplicados na fila
+    fila = deque(restricoes.keys() if arcos is None else arcos)
+    na_fila = set(fila)
     while fila:
-        xi, xj = fila.popleft() # Popleft é uma função de deque que remove e retorna o primeiro elemento
+        arco = fila.popleft() # Popleft é uma função de deque que remove e retorna o primeiro elemento
+        na_fila.discard(arco)
+        xi, xj = arco
+        if motor == "ac3rm":
+            reduziu = revisao_residual(dominios, xi, xj, restricoes, residuos, stats)
+        else:
+            reduziu = revisao(dominios, xi, xj, restricoes, stats)
         # Se domínio de xi foi reduzido, re-adiciona arcos (xk, xi)
-        if revisao(dominios, xi, xj, restricoes):
-            if not dominios[xi]:
+        if reduziu:
+            if not dominios.mascaras[xi]:
                 return False
-            # Re-adiciona arcos (xk, xi)
-            for (xk, _xi) in list(restricoes.keys()):
-                if _xi == xi and xk != xj:
-                    fila.append((xk, xi)) # Adiciona arco (xk, xi) para re-verificação
+            # Re-adiciona arcos (xk, xi) direto do índice, sem varrer todas as restrições
+            for arco_k in entrantes.get(xi, ()):
+                if arco_k[0] != xj and arco_k not in na_fila:
+                    fila.append(arco_k) # Adiciona arco (xk, xi) para re-verificação
+                    na_fila.add(arco_k)
     return True
 
 # MRV: selecionar variável que possui o menor número de valores possíveis em seu domínio.
-# Arquivo: dict de atribuições já feitas, dominios: dict atual, podado ou inicial
+# Arquivo: dict de atribuições já feitas, dominios: DominiosBitset atual, podado ou inicial
 def selecionar_mrv(arquivo, dominios):
     vars_nao_atr = [v for v in dominios if v not in arquivo]
-    ordenados = sorted(vars_nao_atr, key=lambda v: len(dominios[v])) # Ordena vars_nao_atr por tamanho do domínio em ordem crescente
-    return ordenados[0] # Primeira variável, de menor domínio
+    return min(vars_nao_atr, key=dominios.tamanho) # Primeira variável de menor domínio (mesmo desempate do sorted estável)
+
+# Ordenação dinâmica de variáveis sem reordenar tudo a cada nó: um heap com as variáveis livres, atualizado
+# pelos observadores do DominiosBitset sempre que um domínio muda (forward checking, propagação ou desfazer).
+# Entradas antigas não são removidas do heap: cada variável tem uma versão e só a entrada da versão atual vale.
+# Selecionar custa O(log n) amortizado em vez do O(n log n) do sorted em selecionar_mrv.
+class OrdemMRV:
+    # lista_ordenada define o desempate (mesma escolha do selecionar_mrv: menor domínio, depois ordem alfabética)
+    def __init__(self, dominios, lista_ordenada, vizinhos=None, c7=None):
+        self.dominios = dominios
+        self.ordem = {v: i for i, v in enumerate(lista_ordenada)}
+        self.atribuidas = set()
+        self.versao = dict.fromkeys(lista_ordenada, 0)
+        self.heap = []
+        self.preparar(lista_ordenada, vizinhos, c7)
+        for v in lista_ordenada:
+            self.empurrar(v)
+        dominios.observadores.append(self.ao_mudar)
+
+    def preparar(self, lista_ordenada, vizinhos, c7): # Dados extras das subclasses
+        pass
+
+    def chave(self, var):
+        return (self.dominios.tamanho(var), self.ordem[var])
+
+    def empurrar(self, var):
+        self.versao[var] += 1
+        heapq.heappush(self.heap, (self.chave(var), self.versao[var], var))
+        if len(self.heap) > 4 * len(self.versao) + 64: # Muitas entradas velhas: reconstrói só com as válidas
+            self.heap = [(self.chave(v), self.versao[v], v) for v in self.versao if v not in self.atribuidas]
+            heapq.heapify(self.heap)
+
+    def ao_mudar(self, var, antiga, nova):
+        if var not in self.atribuidas and antiga.bit_count() != nova.bit_count():
+            self.empurrar(var)
+
+    # Próxima variável livre (None se todas estão atribuídas)
+    def selecionar(self):
+        heap = self.heap
+        while heap:
+            _, versao, var = heap[0]
+            if var in self.atribuidas or self.versao[var] != versao: # Entrada velha
+                heapq.heappop(heap)
+                continue
+            return var
+        return None
+
+    def atribuir(self, var):
+        self.atribuidas.add(var)
+
+    def desatribuir(self, var):
+        self.atribuidas.discard(var)
+        self.empurrar(var)
+
+    # Chamado quando a propagação falha; escopo são as variáveis da restrição culpada
+    def registrar_falha(self, escopo):
+        pass
+
+# MRV com desempate pelo grau: entre domínios do mesmo tamanho, a variável com mais restrições (vizinhos e companheiros de C7)
+class OrdemMRVGrau(OrdemMRV):
+    def preparar(self, lista_ordenada, vizinhos, c7):
+        self.grau = {v: (len(vizinhos[v]) if vizinhos is not None else 0) + (len(c7.companheiros(v)) if c7 is not None else 0)
+                     for v in lista_ordenada}
+
+    def chave(self, var):
+        return (self.dominios.tamanho(var), -self.grau[var], self.ordem[var])
+
+# dom/wdeg: tamanho do domínio dividido pela soma dos pesos das restrições da variável. Cada restrição começa
+# com peso 1 (mais 1 pelas restrições globais, que envolvem todos) e o peso cresce a cada vez que ela esvazia
+# um domínio, então a busca passa a atacar primeiro as variáveis das restrições que mais falham.
+class OrdemDomWdeg(OrdemMRVGrau):
+    def preparar(self, lista_ordenada, vizinhos, c7):
+        super().preparar(lista_ordenada, vizinhos, c7)
+        self.peso = {v: self.grau[v] + 1 for v in lista_ordenada}
+
+    def chave(self, var):
+        return (self.dominios.tamanho(var) / self.peso[var], self.ordem[var])
+
+    def registrar_falha(self, escopo):
+        for v in escopo:
+            self.peso[v] += 1
+            if v not in self.atribuidas:
+                self.empurrar(v)
+
+# Heurísticas de escolha de variável disponíveis na busca
+HEURISTICAS_VARIAVEIS = {"mrv": OrdemMRV, "mrv_grau": OrdemMRVGrau, "dom_wdeg": OrdemDomWdeg}
+
+# Explicações das podas para o backjumping dirigido por conflitos (CBJ).
+# Cada poda feita durante a busca guarda sua causa numa pilha por variável (desfeita junto com a trilha).
+# Causas e conjuntos de conflito usam profundidades da pilha de busca: [prefixo, {profundidades}] significa as
+# variáveis atribuídas nessas profundidades mais todas as de profundidade <= prefixo (as restrições globais,
+# como C1/C8, dependem de todas as já atribuídas).
+class Explicacoes:
+    def __init__(self, dominios):
+        self.causas = {v: [] for v in dominios}
+        self.causa_atual = (-1, ()) # Causa gravada nas podas que acontecerem a seguir
+        dominios.observadores.append(self.ao_mudar)
+
+    def ao_mudar(self, var, antiga, nova):
+        if nova & ~antiga: # Domínio cresceu: é o desfazer da última poda
+            self.causas[var].pop()
+        else:
+            self.causas[var].append(self.causa_atual)
+
+    # Junta no conjunto as causas das podas feitas nos domínios das variáveis do escopo
+    def juntar(self, conjunto, escopo):
+        for x in escopo:
+            for prefixo, profundidades in self.causas[x]:
+                if prefixo > conjunto[0]:
+                    conjunto[0] = prefixo
+                conjunto[1].update(profundidades)
+
+def maior_profundidade(conjunto): # Variável mais profunda do conjunto de conflito (-1 se vazio)
+    return max(conjunto[0], max(conjunto[1], default=-1))
+
+def remover_profundidade(conjunto, k): # Tira a profundidade k (a maior do conjunto) do conjunto de conflito
+    conjunto[1].discard(k)
+    if conjunto[0] >= k:
+        conjunto[0] = k - 1
+
+# Nogoods aprendidos no backjumping: conjuntos de literais (var, valor) que não podem valer todos juntos.
+# Armazenamento limitado, com descarte do menos usado recentemente (LRU), e índice por literal para que só os
+# nogoods que contêm a atribuição recém-feita sejam checados.
+class ArmazemNogoods:
+    def __init__(self, capacidade, tamanho_maximo=8):
+        self.capacidade = capacidade
+        self.tamanho_maximo = tamanho_maximo # Nogoods maiores que isso quase nunca disparam e não são guardados
+        self.nogoods = OrderedDict() # frozenset de literais -> None, do menos para o mais usado
+        self.por_literal = {} # (var, valor) -> nogoods que contêm o literal
+
+    def adicionar(self, literais):
+        nogood = frozenset(literais)
+        if not nogood or len(nogood) > self.tamanho_maximo:
+            return False
+        if nogood in self.nogoods:
+            self.nogoods.move_to_end(nogood)
+            return False
+        self.nogoods[nogood] = None
+        for literal in nogood:
+            self.por_literal.setdefault(literal, set()).add(nogood)
+        if len(self.nogoods) > self.capacidade:
+            velho, _ = self.nogoods.popitem(last=False)
+            for literal in velho:
+                indice = self.por_literal[literal]
+                indice.discard(velho)
+                if not indice:
+                    del self.por_literal[literal]
+        return True
+
+    def usar(self, nogood): # Marca como usado recentemente
+        self.nogoods.move_to_end(nogood)
+
+    def com_literal(self, var, valor):
+        return list(self.por_literal.get((var, valor), ()))
 
 # LCV: serve para ordenar valores pelo quanto "atrapalham" os vizinhos
-def ordenar_lcv(var, dominios, vizinhos, restricoes, arquivo):
-    valores = list(dominios[var])  # Copia valores possíveis da variável var
+# c7: RestricaoPosicao opcional; os companheiros de posição contam como vizinhos com restrição "times diferentes"
+def ordenar_lcv(var, dominios, vizinhos, restricoes, arquivo, c7=None):
+    valores = dominios[var]  # Valores possíveis da variável var (lista nova, decodificada da máscara)
     pontuacao = [] # Lista que irá as possibilidades de todos os vizinhos se usar este valor para var
     for val in valores:
         total = 0 # Quantos valores são possíveis
@@ -87,180 +510,1078 @@ def ordenar_lcv(var, dominios, vizinhos, restricoes, arquivo):
                 continue # Pula ele
             if (viz, var) in restricoes:
                 cfn = restricoes[(viz, var)]
-                comp = sum(1 for vnb in dominios[viz] if cfn(vnb, val)) # Conta quantos valores do domínio do vizinho viz ainda são compatíveis com val
+                if isinstance(cfn, TabelaRestricao): # Coluna de val na tabela AND domínio do vizinho
+                    comp = (dominios.mascaras[viz] & dominios.tabela(cfn)[1][dominios.indice[val]]).bit_count()
+                else:
+                    comp = sum(1 for vnb in dominios[viz] if cfn(vnb, val)) # Conta quantos valores do domínio do vizinho viz ainda são compatíveis com val
             else:
-                comp = len(dominios[viz])
+                comp = dominios.tamanho(viz)
             total += comp # Soma o número de valores possíveis no vizinho ao total
+        if c7 is not None:
+            fora = ~dominios.bit[val]
+            for comp_pos in c7.companheiros(var):
+                if comp_pos not in arquivo and comp_pos not in vizinhos[var]:
+                    total += (dominios.mascaras[comp_pos] & fora).bit_count() # Valores do companheiro diferentes de val
         pontuacao.append((val, total)) # Salva (valor, total) para esse val
     pontuacao.sort(key=lambda x: -x[1]) # Ordena a lista pontuacao pelo maior total primeiro
     return [v for v, _ in pontuacao]
 
-# Forward checking simples -> podar os domínios dos vizinhos após a atribuição de valor para variável no backstrack
-# dominios: dicionario com os dominios atuais antes da atribuição, var: variável que desejamos atribuir agora, valor: valor testado e restricoes: dicionario de restrições binárias que foram montadas na função construir_restricoes_binarias
-def forward_checking(dominios, var, valor, restricoes):
-    novos = {v: list(dominios[v])[:] for v in dominios} # Copia os domínios em um novo dicionário
-    novos[var] = [valor]
-    for n in list(novos):
+# Forward checking com trilha -> poda os domínios dos vizinhos no próprio DominiosBitset após a atribuição de valor para variável no backtrack
+# Não copia nada: as mudanças vão para a trilha e quem chamou desfaz com dominios.desfazer(marca)
+# vizinhos: se informado, só percorre os vizinhos de var em vez de todas as variáveis
+# c7: RestricaoPosicao opcional, propagada junto com as restrições binárias
+# Retorna False se algum domínio ficou vazio (falha), True caso contrário
+def forward_checking(dominios, var, valor, restricoes, vizinhos=None, c7=None):
+    if not dominios.restringir(var, dominios.bit[valor]):
+        dominios.conflito = (var,)
+        return False
+    candidatos = vizinhos[var] if vizinhos is not None else dominios
+    for n in candidatos:
         if n == var:
             continue
         if (n, var) in restricoes: # Se existe função que diz que para que n seja válido dado var
             r = restricoes[(n, var)]
-            permitidos = [vnb for vnb in novos[n] if r(vnb, valor)] # nova lista de valores permitidos para o vizinho n
-            if not permitidos:
-                return None # Falha
-            novos[n] = permitidos
-    return novos # Domínios já podados, que devem ser usados na recursão.
-
-# Verificação final (Todas as restrições C1...C8)
-def verificacao_final (arquivo, dados):
-    jogadores = list(dados["jogadores"].keys()) # Transforma em lista para melhor manipulaçõa
+            if isinstance(r, TabelaRestricao): # Valores de n compatíveis com valor = coluna da tabela
+                permitidos = dominios.tabela(r)[1][dominios.indice[valor]]
+            else:
+                permitidos = 0 # máscara dos valores permitidos para o vizinho n
+                for vnb in dominios[n]:
+                    if r(vnb, valor):
+                        permitidos |= dominios.bit[vnb]
+            if not dominios.restringir(n, permitidos):
+                dominios.conflito = (var, n) # Arco que esvaziou o domínio de n
+                return False # Falha
+    if c7 is not None and not c7.propagar(dominios, var, valor):
+        return False
+    return True # Domínios já podados, que devem ser usados na recursão.
 
-    t1 = [j for j, t in arquivo.items() if t == "T1"] # Todos os jogadores do T1
-    t2 = [j for j, t in arquivo.items() if t == "T2"] # Todos os jogadores do T2
+# C7 é opcional: só vale se estiver em dados["restricoes"]. Todos os motores (busca, enumeração, componentes, DP,
+# incremental, busca local) e a verificação final usam esta regra, para concordarem sobre o que é solução
+def c7_ativa(dados):
+    return "C7" in dados.get("restricoes", {})
 
-    contar_jogadores = {"T1": len(t1), "T2": len(t2)} # Conta quantos jogadores tem em cada time
+# Lê o limite de força média (C8) do JSON: aceita {"numero": "80"} ou só o número. None se não houver limite válido
+def ler_limite(dados):
+    if "limite" not in dados:
+        return None
+    if isinstance(dados['limite'], dict) and 'numero' in dados['limite']:
+        return float(dados['limite']['numero'])
+    try:
+        return float(dados['limite'])
+    except Exception:
+        return None
 
-    # C1: Balanceamento: |{j | Vj=T1}| = |{j | Vj=T2}| ± 1.
-    if abs(contar_jogadores["T1"] - contar_jogadores["T2"]) > 1:
-        return False
+# C5: J5 não pode ficar no T2 -> redução unária do domínio antes do AC-3
+# Retorna False se o domínio de J5 ficar vazio
+def reduzir_c5(dominios):
+    if "J5" in dominios and "T2" in dominios.bit:
+        return bool(dominios.remover("J5", "T2"))
+    return True
+
+# Times da instância e limites de cada um.
+# dados["times"] é opcional: quantidade de times (T1..Tk), lista de nomes ou {nome: limites}, com os limites
+# opcionais min_jogadores, max_jogadores, media_min e media_max (overall médio do time).
+# Sem "times" o modelo é o de sempre: T1 e T2, com C1 e C4 sempre valendo. Com "times", C1 (tamanhos iguais ± 1,
+# ou seja, entre n // k e ceil(n / k) jogadores por time) e C4 (mínimo 2 por time) valem se estiverem em
+# dados["restricoes"]. O limite da C8 vale para todos os times, junto com o media_max de cada um.
+class LimitesTimes:
+    def __init__(self, dados, n=None):
+        n = len(dados["jogadores"]) if n is None else n
+        especificacao = dados.get("times", ["T1", "T2"])
+        if isinstance(especificacao, int):
+            especificacao = [f"T{i}" for i in range(1, especificacao + 1)]
+        if isinstance(especificacao, dict):
+            limites = {t: dict(lim or {}) for t, lim in especificacao.items()}
+        else:
+            limites = {t: {} for t in especificacao}
+        if not limites:
+            raise ValueError("A instância precisa de pelo menos um time")
+        self.nomes = list(limites)
+        k = len(self.nomes)
+        restricoes = dados.get("restricoes", {})
+        c1 = "times" not in dados or "C1" in restricoes
+        c4 = "times" not in dados or "C4" in restricoes
+        limite = ler_limite(dados)
+        self.min_jogadores = [max(lim.get("min_jogadores", 0), 2 if c4 else 0, n // k if c1 else 0) for lim in limites.values()]
+        self.max_jogadores = [min(lim.get("max_jogadores", n), -(-n // k) if c1 else n) for lim in limites.values()]
+        self.media_min = [float(lim["media_min"]) if "media_min" in lim else None for lim in limites.values()]
+        self.media_max = []
+        for lim in limites.values():
+            medias = [m for m in (limite, lim.get("media_max")) if m is not None]
+            self.media_max.append(min(float(m) for m in medias) if medias else None)
+        # Os tamanhos somam n: cada time tem pelo menos n - (máximos dos outros) e no máximo n - (mínimos dos outros)
+        mudou = True
+        while mudou and self.viavel():
+            mudou = False
+            soma_min, soma_max = sum(self.min_jogadores), sum(self.max_jogadores)
+            for i in range(k):
+                minimo = max(self.min_jogadores[i], n - (soma_max - self.max_jogadores[i]))
+                maximo = min(self.max_jogadores[i], n - (soma_min - self.min_jogadores[i]))
+                if (minimo, maximo) != (self.min_jogadores[i], self.max_jogadores[i]):
+                    self.min_jogadores[i], self.max_jogadores[i] = minimo, maximo
+                    mudou = True
+                    break
+        # Modelo de sempre (T1/T2, só C1, C4 e C8): o único que os motores especializados tratam
+        self.padrao = "times" not in dados or (self.nomes == ["T1", "T2"] and not any(limites.values())
+                                               and c1 and c4)
+
+    def viavel(self):
+        return all(a <= b for a, b in zip(self.min_jogadores, self.max_jogadores))
+
+# Os motores especializados (componentes, DP, enumeração, busca local, otimização, incremental) só tratam o
+# modelo de dois times T1/T2
+def exigir_dois_times(dados):
+    if not LimitesTimes(dados).padrao:
+        raise ValueError("Este motor só trata o modelo de dois times T1/T2 sem limites por time; use iter_solucoes")
+
+# Restrições globais (C1, C4, C6 e C8, e os limites por time de LimitesTimes) propagadas durante a busca, e não
+# só na verificação final.
+# Mantém contagens e somas de overais por time atualizadas a cada mudança de máscara (via dominios.observadores),
+# assim checar se os limites ainda podem ser cumpridos custa O(1) por nó e por time; só varre as variáveis quando
+# há poda. Para cada time t guarda:
+#   pode[t]  -> quantas variáveis ainda têm t no domínio
+#   fixo[t]  -> quantas variáveis já estão fixas em t
+#   soma[t], conta[t] -> overais e quantidade dos fixos em t mais os indecisos abaixo do limite (C8),
+#                        ou seja, a menor soma de (overall - limite) que o time t ainda pode atingir
+# O media_min por time só é conferido na verificação final.
+TOLERANCIA_C8 = 1e-9
+
+class RestricoesGlobais:
+    def __init__(self, dados, dominios, c7=None):
+        self.dominios = dominios
+        self.c7 = c7 # RestricaoPosicao usada no forward checking das variáveis fixadas aqui
+        n = len(dominios)
+        self.limites_times = LimitesTimes(dados, n)
+        self.times = tuple(self.limites_times.nomes)
+        self.bits = tuple(dominios.bit.get(t, 0) for t in self.times)
+        self.indice_bit = {b: i for i, b in enumerate(self.bits) if b} # Bit do domínio -> índice do time
+        # C1 (tamanhos iguais ± 1), C4 (mínimo 2 por time) e os limites do JSON viram um intervalo por time
+        self.min_jogadores = self.limites_times.min_jogadores
+        self.max_jogadores = self.limites_times.max_jogadores
+        self.limite = ler_limite(dados) # C8
+        self.media_max = self.limites_times.media_max # C8 e media_max de cada time
+        self.overais = {j: int(dados["overais"][j]) for j in dominios}
+        self.maior_overall = max(self.overais.values(), default=0)
+        # C6 só vale se J1, J3 e J4 existem (e se há T1)
+        self.c6 = all(j in dominios for j in ("J1", "J3", "J4")) and "T1" in dominios.bit
+        k = len(self.times)
+        self.pode = [0] * k
+        self.fixo = [0] * k
+        self.soma = [0] * k
+        self.conta = [0] * k
+        for var in dominios:
+            self.contabilizar(var, dominios.mascaras[var], 1)
+        dominios.observadores.append(self.ao_mudar)
+
+    # Soma (sinal=1) ou retira (sinal=-1) a contribuição de var com a máscara dada
+    def contabilizar(self, var, mascara, sinal):
+        r = self.overais[var]
+        restantes = mascara
+        while restantes: # Percorre só os times do domínio
+            b = restantes & -restantes
+            restantes ^= b
+            i = self.indice_bit.get(b)
+            if i is None:
+                continue
+            self.pode[i] += sinal
+            if mascara == b:
+                self.fixo[i] += sinal
+                self.soma[i] += sinal * r
+                self.conta[i] += sinal
+            elif self.media_max[i] is not None and r < self.media_max[i]: # Indeciso que só pode baixar a média de t
+                self.soma[i] += sinal * r
+                self.conta[i] += sinal
+
+    def ao_mudar(self, var, antiga, nova):
+        self.contabilizar(var, antiga, -1)
+        self.contabilizar(var, nova, 1)
+
+    # Propaga C1/C4, C8 e C6 até não haver mais poda. Variáveis fixadas aqui passam pelo forward checking
+    # das restrições binárias (C2, C3, C7). Retorna False se alguma restrição não pode mais ser cumprida.
+    def propagar(self, restricoes, vizinhos):
+        dominios = self.dominios
+        while True:
+            fixados = [] # Variáveis que ficaram com um só valor nesta rodada
+            if not self.propagar_c1_c4(fixados) or not self.propagar_c8(fixados) or not self.propagar_c6(fixados):
+                return False
+            if not fixados:
+                return True
+            for var in fixados:
+                valor = dominios.valores[dominios.mascaras[var].bit_length() - 1]
+                if not forward_checking(dominios, var, valor, restricoes, vizinhos, self.c7):
+                    return False
+
+    # Tira o time de índice i do domínio dos indecisos que ainda podem ir para ele
+    def tirar_time(self, i, fixados):
+        dominios = self.dominios
+        b = self.bits[i]
+        for var in dominios:
+            mascara = dominios.mascaras[var]
+            if mascara & b and mascara != b:
+                nova = dominios.restringir(var, ~b)
+                if not nova & (nova - 1):
+                    fixados.append(var)
+
+    # Fixa no time de índice i todos os indecisos que ainda podem ir para ele
+    def fixar_time(self, i, fixados):
+        dominios = self.dominios
+        b = self.bits[i]
+        for var in dominios:
+            mascara = dominios.mascaras[var]
+            if mascara & b and mascara != b:
+                dominios.restringir(var, b)
+                fixados.append(var)
+
+    def propagar_c1_c4(self, fixados):
+        for i in range(len(self.times)):
+            if self.fixo[i] > self.max_jogadores[i] or self.pode[i] < self.min_jogadores[i]:
+                return False
+            if self.pode[i] > self.fixo[i]: # Ainda há indecisos que podem ir para o time
+                if self.fixo[i] == self.max_jogadores[i]: # Time já está cheio: sai do domínio dos indecisos
+                    self.tirar_time(i, fixados)
+                elif self.pode[i] == self.min_jogadores[i]: # Time precisa de todos os indecisos que podem ir para ele
+                    self.fixar_time(i, fixados)
+        return True
+
+    def propagar_c8(self, fixados):
+        dominios = self.dominios
+        for i, b in enumerate(self.bits):
+            limite = self.media_max[i]
+            if limite is None or not b:
+                continue
+            excesso = self.soma[i] - limite * self.conta[i] # Menor excesso que o time ainda pode ter
+            if excesso > TOLERANCIA_C8:
+                return False
+            if excesso + self.maior_overall - limite <= TOLERANCIA_C8:
+                continue # Nenhum jogador sozinho consegue estourar o limite
+            for var in dominios:
+                mascara = dominios.mascaras[var]
+                if mascara & b and mascara != b:
+                    r = self.overais[var]
+                    if r >= limite and excesso + r - limite > TOLERANCIA_C8: # Colocar var em t estoura a média
+                        nova = dominios.restringir(var, ~b)
+                        if not nova & (nova - 1):
+                            fixados.append(var)
+        return True
+
+    # C6: se V3 = V4 = T1 então V1 = T2
+    def propagar_c6(self, fixados):
+        if not self.c6:
+            return True
+        dominios = self.dominios
+        t1 = dominios.bit["T1"]
+        t2 = dominios.bit.get("T2", 0)
+        m1, m3, m4 = (dominios.mascaras[j] for j in ("J1", "J3", "J4"))
+        if m3 == t1 and m4 == t1: # J1 tem de ir para o T2
+            if m1 != t2:
+                if not dominios.restringir("J1", t2):
+                    return False
+                fixados.append("J1")
+            return True
+        if m1 & t2: # J1 ainda pode ir para o T2: nada a podar
+            return True
+        if m3 == t1:
+            alvo = "J4"
+        elif m4 == t1:
+            alvo = "J3"
+        else:
+            return True
+        if dominios.mascaras[alvo] & t1:
+            nova = dominios.restringir(alvo, ~t1)
+            if not nova:
+                return False
+            if not nova & (nova - 1):
+                fixados.append(alvo)
+        return True
+
+# Quebra de simetria de valores. Times intercambiáveis (mesmos limites, fora da C5/C6 e presentes ou ausentes
+# juntos no domínio inicial de cada jogador) formam classes; trocar dois times da mesma classe numa solução dá
+# outra solução. Na busca, entre os times ainda sem nenhum jogador atribuído, só o de menor índice de cada
+# classe é testado, então cada família de soluções espelhadas é visitada uma vez só (em vez de até k! vezes).
+# As soluções saem canônicas: em cada classe, os times são renumerados pela ordem em que aparecem em lista_ordenada.
+# classes: listas de times (na ordem dos índices), calculadas por classes_simetria
+class SimetriaTimes:
+    def __init__(self, classes, lista_ordenada):
+        self.classes = classes
+        self.lista_ordenada = lista_ordenada
+        self.classe_de = {t: c for c, classe in enumerate(classes) for t in classe}
+        self.usados = {t: 0 for t in self.classe_de} # Jogadores atribuídos a cada time das classes
+
+    def atribuir(self, valor):
+        if valor in self.usados:
+            self.usados[valor] += 1
+
+    def desatribuir(self, valor):
+        if valor in self.usados:
+            self.usados[valor] -= 1
+
+    # Valores (na ordem dada) sem os times vazios repetidos: de cada classe fica só o de menor índice
+    def filtrar(self, valores):
+        escolhido = {} # Classe -> time vazio mantido
+        for v in valores:
+            c = self.classe_de.get(v)
+            if c is not None and not self.usados[v]:
+                atual = escolhido.get(c)
+                if atual is None or self.classes[c].index(v) < self.classes[c].index(atual):
+                    escolhido[c] = v
+        return [v for v in valores if v not in self.classe_de or self.usados[v] or escolhido[self.classe_de[v]] == v]
+
+    def canonizar(self, arquivo): # Cópia da solução com os times de cada classe renumerados pela primeira aparição
+        troca = {}
+        proximo = [0] * len(self.classes)
+        for var in self.lista_ordenada:
+            t = arquivo[var]
+            c = self.classe_de.get(t)
+            if c is not None and t not in troca:
+                troca[t] = self.classes[c][proximo[c]]
+                proximo[c] += 1
+        return {var: troca.get(t, t) for var, t in arquivo.items()}
+
+    # Quantas soluções (contando as espelhadas) a solução atual representa: em cada classe com c times e u usados,
+    # c! / (c - u)! jeitos de escolher os times
+    def multiplicidade(self):
+        total = 1
+        for classe in self.classes:
+            usados = sum(1 for t in classe if self.usados[t])
+            for i in range(usados):
+                total *= len(classe) - i
+        return total
+
+# Classes de times intercambiáveis (ver SimetriaTimes), só com as de dois ou mais times.
+# Só vale para instâncias com dados["times"]: no modelo de sempre T1 e T2 continuam sendo soluções distintas
+def classes_simetria(dados, dominios_iniciais, lista_ordenada, limites=None):
+    if "times" not in dados:
+        return []
+    if limites is None:
+        limites = LimitesTimes(dados, len(lista_ordenada))
+    especiais = set()
+    if "J5" in dominios_iniciais: # C5
+        especiais.add("T2")
+    if all(j in dominios_iniciais for j in ("J1", "J3", "J4")): # C6
+        especiais.update(("T1", "T2"))
+    grupos = {}
+    for i, t in enumerate(limites.nomes):
+        if t in especiais:
+            continue
+        assinatura = (limites.min_jogadores[i], limites.max_jogadores[i], limites.media_min[i], limites.media_max[i],
+                      frozenset(v for v in lista_ordenada if t in dominios_iniciais[v]))
+        grupos.setdefault(assinatura, []).append(t)
+    return [classe for classe in grupos.values() if len(classe) > 1]
+
+# Verificação final (Todas as restrições C1...C8, mais os limites por time)
+# limites: LimitesTimes da instância, se já calculado (a busca passa o do modelo em vez de recriá-lo a cada folha)
+def verificacao_final (arquivo, dados, limites=None):
+    if isinstance(arquivo, DominiosBitset): # Aceita também os domínios já reduzidos a um valor cada
+        arquivo = arquivo.atribuicao()
+        if arquivo is None:
+            return False
+    jogadores = list(dados["jogadores"].keys()) # Transforma em lista para melhor manipulaçõa
+    if limites is None:
+        limites = LimitesTimes(dados, len(jogadores))
+
+    contar_jogadores = {t: 0 for t in limites.nomes} # Conta quantos jogadores tem em cada time
+    for j in jogadores:
+        t = arquivo[j]
+        if t not in contar_jogadores:
+            return False
+        contar_jogadores[t] += 1
+
+    # C1: Balanceamento: |{j | Vj=T1}| = |{j | Vj=T2}| ± 1 (com k times: tamanhos iguais ± 1).
+    # C4: No mínimo 2 jogadores em cada time. Ambas, e os limites de tamanho do JSON, são o intervalo de cada time
+    for i, t in enumerate(limites.nomes):
+        if not limites.min_jogadores[i] <= contar_jogadores[t] <= limites.max_jogadores[i]:
+            return False
 
     # C2: J1 e J2 não podem ficar no mesmo time (V1 ≠ V2).
-    if arquivo['J1'] == arquivo['J2']:
+    if 'J1' in arquivo and 'J2' in arquivo and arquivo['J1'] == arquivo['J2']:
         return False
 
     # C3: J3 e J4 preferem juntos (V3 = V4).
-    if arquivo['J3'] != arquivo['J4']:
-        return False
-
-    # C4: No mínimo 2 jogadores em cada time
-    if contar_jogadores["T1"] < 2 or contar_jogadores["T2"] < 2:
+    if 'J3' in arquivo and 'J4' in arquivo and arquivo['J3'] != arquivo['J4']:
         return False
 
     # C5: J5 não pode ficar no T2 (V5 ≠ T2).
-    if arquivo['J5'] == "T2":
+    if arquivo.get('J5') == "T2":
         return False
 
     # C6: Se V3 = V4 = T1 então V1 = T2 (equilíbrio condicional).
-    if arquivo['J3'] == "T1" and arquivo['J4'] == "T1":
+    if arquivo.get('J3') == "T1" and arquivo.get('J4') == "T1" and 'J1' in arquivo:
         if arquivo['J1'] != "T2":
             return False
 
     # C7: Jogadores com mesma posição não podem concentrar-se no mesmo time (encode via instância).
-    if "C7" in dados['restricoes']:
+    if c7_ativa(dados):
         c7 = dados['posicoes']
-        for i in range(len(jogadores)):
-            for j in range(i+1, len(jogadores)):
-                a, b = jogadores[i], jogadores[j]
-                if c7[a] == c7[b] and arquivo[a] == arquivo[b]:
-                    return False
+        ocupados = set() # (posição, time) já usados: um segundo jogador no mesmo par viola C7
+        for j in jogadores:
+            chave = (c7[j], arquivo[j])
+            if chave in ocupados:
+                return False
+            ocupados.add(chave)
 
-    # C8: Limite de força média por time (encode como soma de ratings não ultrapassar limiar).
-    if "limite" in dados :
-        # Ajuste para formato que você usa no JSON (ex.: dados['limite']['numero'])
-        # Se o JSON tem apenas dados['limite'] como número, mude para float(dados['limite'])
-        limite = None
-        if isinstance(dados['limite'], dict) and 'numero' in dados['limite']:
-            limite = float(dados['limite']['numero'])
-        else:
-            try:
-                limite = float(dados['limite'])
-            except Exception:
-                limite = None
-        if limite is not None:
-            soma = {"T1": 0, "T2": 0}
-            conta_times = {"T1": 0, "T2": 0}
-            for j in jogadores:
-                t = arquivo[j]
-                soma[t] += int(dados["overais"][j])
-                conta_times[t] += 1 # Conta quantos jogadores tem em cada time
-            for t in ("T1", "T2"):
-                if conta_times[t] > 0 and (soma[t] / conta_times[t]) > limite: # Se o time tem jogadores e a média ultrapassa o limite
+    # C8: Limite de força média por time (encode como soma de ratings não ultrapassar limiar), e médias mínima e
+    # máxima de cada time
+    if any(m is not None for m in limites.media_max + limites.media_min):
+        soma = {t: 0 for t in limites.nomes}
+        for j in jogadores:
+            soma[arquivo[j]] += int(dados["overais"][j])
+        for i, t in enumerate(limites.nomes):
+            if contar_jogadores[t] == 0: # Time vazio não tem média
+                continue
+            media = soma[t] / contar_jogadores[t]
+            if limites.media_max[i] is not None and media > limites.media_max[i]: # A média ultrapassa o limite
+                return False
+            if limites.media_min[i] is not None and media < limites.media_min[i]:
+                return False
+
+    return True
+
+# Resultado do pré-processamento de uma instância: restrições, índices e domínios já reduzidos por C5, C7, AC-3
+# e restrições globais. Pode ser reaproveitado por várias buscas (iter_solucoes(..., modelo=...)) e guardado
+# em disco com pickle (cache do psr_lote.py), pulando a leitura e o pré-processamento de instâncias repetidas.
+class ModeloCompilado:
+    def __init__(self, lista_ordenada, restricoes, vizinhos, entrantes, c7, propagar_globais, dominios, valores,
+                 consistente, stats_pre, classes_times=(), limites_times=None):
+        self.lista_ordenada = lista_ordenada
+        self.restricoes = restricoes
+        self.vizinhos = vizinhos
+        self.entrantes = entrantes
+        self.c7 = c7 # RestricaoPosicao ou None (C7 em arcos par a par)
+        self.propagar_globais = propagar_globais
+        self.dominios = dominios # {var: [valores]} depois do pré-processamento
+        self.valores = valores # Ordem dos bits do DominiosBitset
+        self.consistente = consistente # False se o pré-processamento já provou que não há solução
+        self.stats_pre = stats_pre # time_pre, revisoes, checagens, tam_medio_inicial, tam_medio_final
+        self.classes_times = classes_times # Classes de times intercambiáveis (quebra de simetria, ver SimetriaTimes)
+        self.limites_times = limites_times # LimitesTimes da instância, usado na verificação final (None = recalcula)
+
+# Propagação do pré-processamento até o ponto fixo: AC-3 (começando pelos arcos dados, ou por todos) alternado
+# com a C7 global e as restrições globais. Retorna False se algum domínio esvaziar
+def propagar_pre(dominios, restricoes, entrantes, vizinhos, c7, globais, motor="ac3", stats=None, arcos=None):
+    while True:
+        if not ac3(dominios, restricoes, entrantes, motor, stats, arcos):
+            return False
+        marca = dominios.marca()
+        if c7 is not None and not c7.propagar_inicial(dominios):
+            return False
+        if globais is not None and not globais.propagar(restricoes, vizinhos):
+            return False
+        if dominios.marca() == marca:
+            return True
+        alterados = {var for var, _ in dominios.trilha[marca:]}
+        arcos = [arco for var in alterados for arco in entrantes.get(var, ())]
+
+# Orçamento de um nível de consistência: tempo em segundos e iterações (varreduras completas das variáveis).
+# Quando acaba, o nível para onde está; as podas feitas até ali continuam válidas
+class OrcamentoConsistencia:
+    def __init__(self, tempo_maximo, max_iteracoes, stats):
+        self.limite_relogio = (time.time() + tempo_maximo) if tempo_maximo is not None else None
+        self.max_iteracoes = max_iteracoes
+        self.stats = stats # Recebe "iteracoes" e "interrompido" ("tempo" ou "iteracoes")
+
+    def nova_iteracao(self):
+        if self.max_iteracoes is not None and self.stats["iteracoes"] >= self.max_iteracoes:
+            self.stats["interrompido"] = "iteracoes"
+            return False
+        if self.esgotado():
+            return False
+        self.stats["iteracoes"] += 1
+        return True
+
+    def esgotado(self):
+        if self.limite_relogio is not None and time.time() >= self.limite_relogio:
+            self.stats["interrompido"] = "tempo"
+            return True
+        return False
+
+# Níveis de consistência opcionais, rodados depois do AC-3 e das restrições globais no pré-processamento.
+# Cada um recebe (dominios, restricoes, vizinhos, entrantes, propagar, orcamento), em que propagar(arcos) leva de
+# volta ao ponto fixo de propagar_pre depois de uma poda, e retorna False se provar que não há solução.
+
+# Unário: C5 (J5 fora do T2) e as implicações da C6 com a C3 (V3 = V4): J1 no T1 tira o T1 de J3 e J4, e J3 ou
+# J4 no T1 tira o T1 de J1. Vale também sem propagar_globais, quando nada disso é feito no pré-processamento
+def consistencia_unaria(dominios, restricoes, vizinhos, entrantes, propagar, orcamento):
+    c6 = all(j in dominios for j in ("J1", "J3", "J4")) and "T1" in dominios.bit
+    while orcamento.nova_iteracao():
+        marca = dominios.marca()
+        if not reduzir_c5(dominios):
+            return False
+        if c6:
+            t1 = dominios.bit["T1"]
+            if dominios.mascaras["J1"] == t1:
+                if not dominios.restringir("J3", ~t1) or not dominios.restringir("J4", ~t1):
                     return False
+            if t1 in (dominios.mascaras["J3"], dominios.mascaras["J4"]) and not dominios.restringir("J1", ~t1):
+                return False
+        if dominios.marca() == marca:
+            return True
+        alterados = {var for var, _ in dominios.trilha[marca:]}
+        if not propagar([arco for var in alterados for arco in entrantes.get(var, ())]):
+            return False
+    return True
+
+# Máscara dos valores de y compatíveis com x = a
+def suporte(dominios, restricoes, x, a, y):
+    restricao = restricoes[(x, y)]
+    if isinstance(restricao, TabelaRestricao):
+        return dominios.tabela(restricao)[0][dominios.indice[a]] & dominios.mascaras[y]
+    return dominios.codificar([b for b in dominios[y] if restricao(a, b)])
 
+# Consistência de caminho restrita (RPC): além do AC, quando a = valor de xi tem um só suporte b em xj, o par
+# (a, b) precisa ter um suporte comum em cada xk vizinho dos dois (triângulos do grafo de vizinhos); senão a sai
+def consistencia_rpc(dominios, restricoes, vizinhos, entrantes, propagar, orcamento):
+    comuns = {} # (xi, xj) -> vizinhos comuns
+    mudou = True
+    while mudou and orcamento.nova_iteracao():
+        mudou = False
+        for xi in dominios:
+            if orcamento.esgotado():
+                return True
+            for a in dominios[xi]:
+                viavel = True
+                for xj in vizinhos[xi]:
+                    suportes = suporte(dominios, restricoes, xi, a, xj)
+                    if suportes & (suportes - 1): # Dois ou mais suportes: nada a testar
+                        continue
+                    if not suportes:
+                        viavel = False
+                        break
+                    b = dominios.valores[suportes.bit_length() - 1]
+                    if (xi, xj) not in comuns:
+                        comuns[(xi, xj)] = [xk for xk in vizinhos[xi] & vizinhos[xj] if xk != xi and xk != xj]
+                    if any(not suporte(dominios, restricoes, xi, a, xk) & suporte(dominios, restricoes, xj, b, xk)
+                           for xk in comuns[(xi, xj)]):
+                        viavel = False
+                        break
+                if not viavel:
+                    if not dominios.remover(xi, a) or not propagar(list(entrantes.get(xi, ()))):
+                        return False
+                    mudou = True
     return True
 
-# Solver com AC-3 (pré-processamento)
-# Usa MRV, LCV, AC-3 (pré), forward checking e checagens parciais
-# Entrada: dicionário 'arquivo' no formato JSON mostrado pelo usuário.
-# Retorna: lista de soluções e dicionário de estatísticas
-def backtracking_solver_com_ac3(dados):
+# Consistência de arco singleton (SAC-1): cada valor a de cada variável é testado fixando var = a e propagando
+# (AC-3, C7 e restrições globais); se a propagação falha, a sai do domínio. Repete até nenhuma remoção
+def consistencia_sac(dominios, restricoes, vizinhos, entrantes, propagar, orcamento):
+    mudou = True
+    while mudou and orcamento.nova_iteracao():
+        mudou = False
+        for var in dominios:
+            if dominios.tamanho(var) < 2: # Valor único: já está no ponto fixo
+                continue
+            for valor in dominios[var]:
+                if orcamento.esgotado():
+                    return True
+                marca = dominios.marca()
+                dominios.restringir(var, dominios.bit[valor])
+                ok = propagar(list(entrantes.get(var, ())))
+                dominios.desfazer(marca)
+                if not ok:
+                    orcamento.stats["singletons_falhos"] = orcamento.stats.get("singletons_falhos", 0) + 1
+                    if not dominios.remover(var, valor) or not propagar(list(entrantes.get(var, ()))):
+                        return False
+                    mudou = True
+    return True
+
+NIVEIS_CONSISTENCIA = {"unaria": consistencia_unaria, "rpc": consistencia_rpc, "sac": consistencia_sac}
+
+# Normaliza a opção consistencia: cada nível é o nome ou (nome, tempo_maximo, max_iteracoes)
+# Retorna: lista de (nome, tempo_maximo, max_iteracoes)
+def ler_consistencia(consistencia):
+    niveis = []
+    for nivel in consistencia or ():
+        if isinstance(nivel, str):
+            nivel = (nivel,)
+        nome, tempo_maximo, max_iteracoes = (tuple(nivel) + (None, None))[:3]
+        if nome not in NIVEIS_CONSISTENCIA:
+            raise ValueError(f"Nível de consistência desconhecido: {nome}")
+        niveis.append((nome, tempo_maximo, max_iteracoes))
+    return niveis
+
+# Lê um nível da linha de comando: "nome[:tempo_maximo[:max_iteracoes]]" (ex.: "sac:2.5:3", "rpc::1")
+def ler_nivel(texto):
+    partes = texto.split(":")
+    if len(partes) > 3:
+        raise ValueError(f"Nível de consistência inválido: {texto}")
+    partes += [""] * (3 - len(partes))
+    nome, tempo_maximo, max_iteracoes = partes
+    return (nome, float(tempo_maximo) if tempo_maximo else None, int(max_iteracoes) if max_iteracoes else None)
+
+# Pré-processamento (parte de iter_solucoes que não depende da busca)
+# propagacao, propagar_globais, c7_global: como em iter_solucoes
+# instrumentacao: se informada, cronometra as fases pre_c5, pre_c7, pre_ac3 e pre_globais (e pre_<nível>)
+# consistencia: níveis de consistência mais fortes rodados em seguida, na ordem dada (ver NIVEIS_CONSISTENCIA):
+#        cada um é o nome ("unaria", "rpc", "sac") ou (nome, tempo_maximo, max_iteracoes). O tempo, as revisões e
+#        a redução dos domínios de cada nível vão para stats_pre["consistencia"]
+# Retorna: ModeloCompilado
+def compilar_modelo(dados, propagacao="ac3", propagar_globais=True, c7_global=True, instrumentacao=None,
+                    consistencia=()):
     lista_ordenada = sorted(list(dados["jogadores"].keys()))
     dominios_iniciais = {v: list(dados["jogadores"][v])[:] for v in lista_ordenada}
-    restricoes, vizinhos = construir_restricoes_binarias(lista_ordenada, dados["posicoes"])
+    limites = LimitesTimes(dados, len(lista_ordenada))
+    nomes_times = None # Ordem dos bits: a dos times declarados em dados["times"] (senão os valores ordenados)
+    if "times" in dados:
+        nomes_times = limites.nomes
+        desconhecidos = {val for vals in dominios_iniciais.values() for val in vals} - set(nomes_times)
+        if desconhecidos:
+            raise ValueError(f"Times fora de dados['times'] nos domínios: {sorted(desconhecidos)}")
+    restricoes, vizinhos, entrantes = construir_restricoes_binarias(lista_ordenada, dados["posicoes"],
+                                                                    c7_pares=c7_ativa(dados) and not c7_global)
+    c7 = RestricaoPosicao(lista_ordenada, dados["posicoes"]) if c7_global and c7_ativa(dados) else None
     soma_tam_inicial = sum(len(dominios_iniciais[v]) for v in lista_ordenada)
     tam_medio_inicial = (soma_tam_inicial / len(lista_ordenada)) if lista_ordenada else 0.0
 
     # Aplica AC-3 nos domínios iniciais (pré-processamento)
-    dominios = {v: list(dominios_iniciais[v])[:] for v in dominios_iniciais}
+    dominios = DominiosBitset(dominios_iniciais, nomes_times) # Domínios em máscaras de bits
+    instr = instrumentacao
+    if instr is None:
+        fase = lambda nome, funcao: funcao # Sem instrumentação as fases chamam as funções direto
+    else:
+        fase = instr.envolver
+        instr.preparar(dominios, restricoes, vizinhos, c7)
     inicio_pre = time.time()
-    ac_ok = ac3(dominios, restricoes) # ac_ok será False se detectar inconsistência
+    stats_ac = {"revisoes": 0, "checagens": 0} # Contadores do AC-3
+    ac_ok = True
+    globais = None
+    if propagar_globais:
+        ac_ok = fase("pre_c5", reduzir_c5)(dominios)
+    while ac_ok: # C7 global e AC-3 se alternam até nenhum dos dois podar mais nada
+        marca_pre = dominios.marca()
+        if c7 is not None:
+            ac_ok = fase("pre_c7", c7.propagar_inicial)(dominios)
+        ac_ok = ac_ok and fase("pre_ac3", ac3)(dominios, restricoes, entrantes, propagacao, stats_ac) # ac_ok será False se detectar inconsistência
+        if c7 is None or dominios.marca() == marca_pre:
+            break
+    if ac_ok and propagar_globais:
+        globais = criar_globais(dados, dominios, c7, instr)
+        ac_ok = fase("pre_globais", globais.propagar)(restricoes, vizinhos) # Poda inicial das restrições globais
+    tam_medio = lambda: (sum(dominios.tamanho(v) for v in lista_ordenada) / len(lista_ordenada)) if lista_ordenada else 0.0
+    niveis = []
+    for nome, tempo_maximo, max_iteracoes in ler_consistencia(consistencia):
+        if not ac_ok:
+            break
+        stats_nivel = {"nivel": nome, "time": 0.0, "iteracoes": 0, "revisoes": 0, "checagens": 0, "interrompido": None,
+                       "tam_medio_antes": tam_medio()}
+        propagar = lambda arcos, stats_nivel=stats_nivel: propagar_pre(dominios, restricoes, entrantes, vizinhos, c7, globais,
+                                                                       propagacao, stats_nivel, arcos)
+        inicio_nivel = time.time()
+        ac_ok = fase("pre_" + nome, NIVEIS_CONSISTENCIA[nome])(dominios, restricoes, vizinhos, entrantes, propagar,
+                                                               OrcamentoConsistencia(tempo_maximo, max_iteracoes, stats_nivel))
+        stats_nivel["time"] = time.time() - inicio_nivel
+        stats_nivel["tam_medio_depois"] = tam_medio()
+        stats_nivel["consistente"] = ac_ok
+        niveis.append(stats_nivel)
     fim_pre = time.time()
-    tempo_pre = fim_pre - inicio_pre
+    if instr is not None:
+        instr.encerrar(dominios)
+    soma_final = sum(dominios.tamanho(v) for v in lista_ordenada)
+    tam_medio_final = (soma_final / len(lista_ordenada)) if lista_ordenada else 0.0
+    stats_pre = {"time_pre": fim_pre - inicio_pre,
+                 "revisoes": stats_ac["revisoes"],
+                 "checagens": stats_ac["checagens"],
+                 "tam_medio_inicial": tam_medio_inicial,
+                 "tam_medio_final": tam_medio_final,
+                 "consistencia": niveis}
+    return ModeloCompilado(lista_ordenada, restricoes, vizinhos, entrantes, c7, propagar_globais,
+                           dominios.como_listas(), dominios.valores, ac_ok, stats_pre,
+                           classes_simetria(dados, dominios_iniciais, lista_ordenada, limites), limites)
+
+# RestricoesGlobais sobre os domínios; com instrumentação, cada restrição global é cronometrada separadamente
+def criar_globais(dados, dominios, c7, instrumentacao=None):
+    globais = RestricoesGlobais(dados, dominios, c7)
+    if instrumentacao is not None:
+        globais.propagar_c1_c4 = instrumentacao.envolver("C1/C4", globais.propagar_c1_c4)
+        globais.propagar_c8 = instrumentacao.envolver("C8", globais.propagar_c8)
+        globais.propagar_c6 = instrumentacao.envolver("C6", globais.propagar_c6)
+    return globais
+
+# Solver com AC-3 (pré-processamento) em forma de gerador
+# Usa MRV, LCV, AC-3 (pré), forward checking e checagens parciais, e devolve cada solução assim que é encontrada
+# Entrada: dicionário 'dados' no formato JSON mostrado pelo usuário.
+# max_solucoes: para depois de k soluções (None = todas)
+# apenas_contar: não monta dicionários; cada item gerado é só o número de soluções encontradas até ali
+# tempo_maximo: orçamento em segundos de relógio; max_nos: orçamento de nós testados (atribuições forçadas, de
+#        variáveis com um valor só, não gastam orçamento: assim cada ramo da fronteira tem uma escolha a mais)
+# stats: dicionário preenchido com as estatísticas (nodes, retrocessos, tempos...). Fica completo quando o
+#        gerador termina ou é fechado; stats["interrompido"] diz se parou por "solucoes", "tempo" ou "nos".
+#        Se parou por tempo ou nós, stats["fronteira"] lista as atribuições parciais ainda não exploradas
+#        (cada uma é um subproblema; juntas com as soluções já geradas cobrem todo o espaço sem repetição)
+# profundidade_corte: se informado, gera as atribuições parciais com essa quantidade de variáveis (prefixos da
+#        árvore escolhidos por MRV/LCV, já podados) em vez de soluções, para dividir a busca em subproblemas
+# propagacao: motor do AC-3 ("ac3" ou "ac3rm", ver MOTORES_PROPAGACAO)
+# propagar_globais: se True, C5 vira redução unária antes do AC-3 e C1/C4/C6/C8 são propagadas a cada nó (RestricoesGlobais)
+# c7_global: se True, C7 é uma restrição global por posição (RestricaoPosicao); se False, vira arcos binários par a par
+# heuristica: escolha de variável ("mrv", "mrv_grau" ou "dom_wdeg", ver HEURISTICAS_VARIAVEIS)
+# backjumping: se True, guarda a explicação de cada poda e, quando uma variável fica sem valores, volta direto
+#        para a variável mais profunda responsável pelo conflito (CBJ) em vez do nível anterior
+# nogoods: capacidade do armazém de nogoods aprendidos no backjumping (0 = não aprende). Os nogoods são
+#        checados a cada atribuição e podam o domínio quando só falta um literal
+# instrumentacao: objeto Instrumentacao (instrumentacao.py) para tempos por fase, contadores de podas por tipo de
+#        restrição, callbacks de eventos e rastro JSONL; o resumo vai para stats["instrumentacao"]
+# modelo: ModeloCompilado da mesma instância (compilar_modelo); pula o pré-processamento, e propagacao,
+#        propagar_globais e c7_global passam a ser os do modelo
+# consistencia: níveis de consistência extras do pré-processamento (ver compilar_modelo); ignorado com modelo
+# limitante: objeto de branch-and-bound (psr_otimizacao.BranchAndBound). Depois da propagação de cada nó,
+#        limitante.podar() == True descarta o nó (o limite do objetivo não melhora a melhor solução), e
+#        limitante.ordenar(var, valores) reordena os valores de cada nível depois do LCV
+# enumeracao: se True, troca a busca pela enumeração exaustiva em blocos (psr_enumeracao); "auto" faz isso quando
+#        o modelo tem poucos jogadores livres (psr_enumeracao.cabe) e não há max_nos, profundidade_corte,
+#        limitante nem instrumentação. Com apenas_contar, cada item gerado é a contagem acumulada de um bloco.
+#        Padrão False: a busca (propagação, MRV/LCV) é o que os benchmarks e o main medem
+# simetria: se True e a instância tem times intercambiáveis (ver SimetriaTimes), gera uma solução canônica por
+#        família de soluções espelhadas; stats["solucoes_simetricas"] conta todas elas, inclusive as espelhadas
+def iter_solucoes(dados, max_solucoes=None, apenas_contar=False, tempo_maximo=None, max_nos=None, stats=None,
+                  propagacao="ac3", propagar_globais=True, profundidade_corte=None, c7_global=True, heuristica="mrv",
+                  backjumping=False, nogoods=0, instrumentacao=None, modelo=None, limitante=None, enumeracao=False,
+                  consistencia=(), simetria=True):
+    if stats is None:
+        stats = {}
+    if heuristica not in HEURISTICAS_VARIAVEIS:
+        raise ValueError(f"Heurística de variável desconhecida: {heuristica}")
+    inicio_total = time.time()
+    instr = instrumentacao
+    if modelo is None:
+        modelo = compilar_modelo(dados, propagacao, propagar_globais, c7_global, instr, consistencia)
+        time_pre = modelo.stats_pre["time_pre"]
+    else:
+        time_pre = 0.0 # Pré-processamento já feito (modelo reaproveitado ou vindo do cache)
+    lista_ordenada, restricoes, vizinhos, c7 = modelo.lista_ordenada, modelo.restricoes, modelo.vizinhos, modelo.c7
+    ac_ok = modelo.consistente
+    limites = modelo.limites_times or LimitesTimes(dados, len(lista_ordenada)) # Um só para todas as folhas
+    dominios = DominiosBitset(modelo.dominios, modelo.valores) # Domínios em máscaras de bits, podados/desfeitos pela trilha
+    if instr is None:
+        fase = lambda nome, funcao: funcao # Sem instrumentação as fases chamam as funções direto
+    else:
+        fase = instr.envolver
+        instr.preparar(dominios, restricoes, vizinhos, c7)
+    # O modelo já está no ponto fixo das restrições globais: só recria os contadores sobre os domínios da busca
+    globais = criar_globais(dados, dominios, c7, instr) if ac_ok and modelo.propagar_globais else None
+
+    # Dicionário de resposta para apresentação das estatísticas (atualizado ao longo da busca)
+    stats.update({"time": 0.0,
+                  "time_pre": time_pre,
+                  "time_search": 0.0,
+                  "nodes": 0,
+                  "retrocessos": 0,
+                  "solutions": 0,
+                  "revisoes": modelo.stats_pre["revisoes"],
+                  "checagens": modelo.stats_pre["checagens"],
+                  "tam_medio_inicial": modelo.stats_pre["tam_medio_inicial"],
+                  "tam_medio_final": modelo.stats_pre["tam_medio_final"],
+                  "consistencia": modelo.stats_pre.get("consistencia", []), # Níveis extras do pré-processamento
+                  "interrompido": None,
+                  "fronteira": [],
+                  "saltos": 0, # Retrocessos que pularam níveis (backjumping)
+                  "niveis_pulados": 0,
+                  "nogoods_aprendidos": 0,
+                  "nogoods_podas": 0, # Falhas ou podas causadas por nogoods aprendidos
+                  "podas_limite": 0, # Nós descartados pelo limite do objetivo (branch-and-bound)
+                  "podas_simetria": 0, # Valores não testados por serem times vazios espelhados
+                  "solucoes_simetricas": 0 # Soluções contando as espelhadas (igual a solutions sem simetria)
+                  })
 
-    # se AC-3 detectar inconsistência, retornamos estatísticas vazias (sem buscar)
+    # se AC-3 detectar inconsistência, não há busca
     if not ac_ok:
-        return [], {"time": tempo_pre, 
-                    "time_search": 0.0, 
-                    "nodes": 0, 
-                    "retrocessos": 0, 
-                    "solutions": 0,
-                    "tam_medio_inicial": tam_medio_inicial,
-                    "tam_medio_final": tam_medio_final
-                    }
-
-    nos_encontrados = 0 # Nós testados
-    retrocessos = 0 # Retrocessos
-    solucoes = [] # Soluções completas encontradas
+        stats["time"] = time.time() - inicio_total
+        if instr is not None:
+            instr.encerrar(dominios)
+            stats["instrumentacao"] = instr.relatorio()
+        return
 
-    inicio_busca = time.time()
+    classes = modelo.classes_times if simetria else ()
+    if enumeracao == "auto":
+        enumeracao = (max_nos is None and profundidade_corte is None and limitante is None and instr is None
+                      and not classes and psr_enumeracao.cabe(dados, modelo))
+    if enumeracao: # Instância pequena: testa todas as atribuições dos livres em vez de buscar
+        inicio_busca = time.time()
+        try:
+            yield from psr_enumeracao.enumerar(dados, modelo, stats, max_solucoes, apenas_contar, tempo_maximo)
+        finally:
+            fim_busca = time.time()
+            stats["time_search"] = fim_busca - inicio_busca
+            stats["time"] = fim_busca - inicio_total
+            stats["solucoes_simetricas"] = stats["solutions"]
+        return
 
-    # Busca recursiva. Se as variáveis já tem valor, então chama verificacao_final, se passa vai como solução, senão vai como retrocesso. Se ainda faltam variáveis chama a próxima com MRV e ordena os valores possíveis com LCV
-    # Aqui podemos dizer que todas as variáveis foram atribuídas
-    def busca(arquivo, dominios_correntes): # dominios_correntes contém os domínios atuais (após forward checking)
-        nonlocal nos_encontrados, retrocessos, solucoes
-        if len(arquivo) == len(lista_ordenada): 
-            if verificacao_final(arquivo, dados) == True: # Já verificado pelas restrições
-                solucoes.append(dict(arquivo)) # Salva um cópia dict de arquivo em solucoes
-            else: # Verificação final deu False (atribuição inválida)
-                retrocessos += 1
-            return False
+    ordem = HEURISTICAS_VARIAVEIS[heuristica](dominios, lista_ordenada, vizinhos, c7) # Escolha incremental da próxima variável
+    explicacoes = Explicacoes(dominios) if backjumping else None
+    simetrias = SimetriaTimes(classes, lista_ordenada) if classes else None
+    armazem = ArmazemNogoods(nogoods) if backjumping and nogoods else None
+    if limitante is not None:
+        limitante.preparar(dominios)
+    parar = False # Vira True quando algum orçamento (soluções, tempo ou nós) acaba
+    limite_relogio = (time.time() + tempo_maximo) if tempo_maximo is not None else None
+    # Caminho atual da busca. Cada nível é [var, valores ordenados por LCV, índice do valor em teste, marca da trilha antes do valor,
+    # conjunto de conflito acumulado (backjumping), True se já houve solução abaixo deste nível]
+    pilha = []
+    profundidade = {} # Variável atribuída -> nível da pilha (backjumping)
 
-        var = selecionar_mrv(arquivo, dominios_correntes) # Seleciona a próxima variável livre usando a heurística MRV (menor domínio primeiro). Retorna a variável a atribuir
-        valores = ordenar_lcv(var, dominios_correntes, vizinhos, restricoes, arquivo) # Ordena os valores possíveis para var usando LCV — valores que menos restringem os vizinhos vêm primeiro
-        for v in valores:
-            nos_encontrados += 1
-            pruned = forward_checking(dominios_correntes, var, v, restricoes) # Conj. de domínios atualizados, depois da poda
-            if pruned is None:
-                retrocessos += 1
-                continue
+    # Orçamento de tempo/nós acabou: guarda em stats["fronteira"] os ramos que ficaram sem explorar
+    def interromper(motivo):
+        nonlocal parar
+        parar = True
+        stats["interrompido"] = motivo
+        prefixo = {}
+        for k, (var, valores, i) in enumerate(nivel[:3] for nivel in pilha):
+            inicio_restantes = i if k == len(pilha) - 1 else i + 1 # No último nível o valor i ainda não foi testado
+            for v in valores[inicio_restantes:]:
+                stats["fronteira"].append(dict(prefixo, **{var: v}))
+            prefixo[var] = valores[i]
 
-            arquivo[var] = v
-            busca(arquivo, pruned)
-            # Desfaz backstrack
-            del arquivo[var]
+    # Checa os nogoods que contêm var = valor (já em arquivo). Se algum vale inteiro, falha; se só falta um literal
+    # de uma variável livre, tira aquele valor do domínio dela. Retorna False em caso de falha
+    def aplicar_nogoods(arquivo, var, valor):
+        for nogood in armazem.com_literal(var, valor):
+            faltando = [(x, a) for x, a in nogood if arquivo.get(x) != a]
+            if not faltando:
+                armazem.usar(nogood)
+                stats["nogoods_podas"] += 1
+                dominios.conflito = tuple(x for x, _ in nogood)
+                return False
+            if len(faltando) == 1:
+                x, a = faltando[0]
+                if x not in arquivo and dominios.contem(x, a):
+                    armazem.usar(nogood)
+                    stats["nogoods_podas"] += 1
+                    explicacoes.causa_atual = (-1, tuple(profundidade[y] for y, _ in nogood if y != x))
+                    if not dominios.remover(x, a):
+                        dominios.conflito = (x,)
+                        return False
+        return True
 
-        return False
+    # Todos os valores do nível k falharam: decide para qual nível voltar (CBJ) e aprende o nogood.
+    # Retorna o nível de destino (-1 encerra a busca)
+    def nivel_de_retorno(k):
+        nivel = pilha[k]
+        conjunto = nivel[4]
+        explicacoes.juntar(conjunto, (nivel[0],)) # Podas no domínio da própria variável também explicam a falha
+        remover_profundidade(conjunto, k)
+        if nivel[5]: # Houve solução abaixo: volta cronologicamente
+            return k - 1
+        destino = maior_profundidade(conjunto)
+        if armazem is not None:
+            niveis = set(conjunto[1]) | set(range(conjunto[0] + 1))
+            if len(niveis) <= armazem.tamanho_maximo and armazem.adicionar(
+                    (pilha[d][0], pilha[d][1][pilha[d][2]]) for d in niveis):
+                stats["nogoods_aprendidos"] += 1
+        if destino < k - 1:
+            stats["saltos"] += 1
+            stats["niveis_pulados"] += k - 1 - destino
+        if destino >= 0:
+            remover_profundidade(conjunto, destino)
+            alvo = pilha[destino][4]
+            alvo[0] = max(alvo[0], conjunto[0])
+            alvo[1].update(conjunto[1])
+        return destino
 
-    busca({}, dominios)
-    soma_final = sum(len(dominios[v]) for v in lista_ordenada)
-    tam_medio_final = (soma_final / len(lista_ordenada)) if lista_ordenada else 0.0
-    fim_busca = time.time()
-    tempo_busca = fim_busca - inicio_busca
-    tempo_total = time.time() - inicio_pre + tempo_busca  # inclui pré-processamento na conta total
-
-    # Dicionário de resposta para apresentação das estatísticas
-    stats = {"time": tempo_total, 
-             "time_pre": tempo_pre, 
-             "time_search": tempo_busca,
-             "nodes": nos_encontrados, 
-             "retrocessos": retrocessos,
-             "solutions": len(solucoes),
-             "tam_medio_inicial": tam_medio_inicial,
-             "tam_medio_final": tam_medio_final
-             }
-    
+    # Fases da busca (cronometradas se houver instrumentação)
+    selecionar = fase("selecao", ordem.selecionar)
+    lcv = fase("lcv", ordenar_lcv)
+    fc = fase("forward_checking", forward_checking)
+    propagar_no = fase("globais", globais.propagar) if globais is not None else None
+    verificar = fase("verificacao_final", verificacao_final)
+    aplicar_nogoods = fase("nogoods", aplicar_nogoods)
+
+    # Busca em profundidade com pilha explícita (sem recursão, aguenta elencos com milhares de jogadores).
+    # Se as variáveis já tem valor, então chama verificacao_final, se passa vai como solução, senão vai como retrocesso. Se ainda faltam variáveis chama a próxima com MRV e ordena os valores possíveis com LCV
+    # dominios contém os domínios atuais (após forward checking); a trilha desfaz as podas no retorno
+    def busca():
+        nonlocal parar
+        arquivo = {}
+        n = len(lista_ordenada)
+        descer = True # Acabamos de atribuir um valor: abre o próximo nível (ou trata a folha)
+        forcados = 0 # Nós de níveis com um valor só (não gastam o orçamento max_nos)
+        try:
+            while True:
+                if descer:
+                    descer = False
+                    if profundidade_corte is not None and len(arquivo) == profundidade_corte < n:
+                        for nivel in pilha:
+                            nivel[5] = True
+                        yield dict(arquivo) # Prefixo (subproblema) em vez de solução
+                    elif len(arquivo) == n: # Aqui podemos dizer que todas as variáveis foram atribuídas
+                        if verificar(arquivo, dados, limites) == True: # Já verificado pelas restrições
+                            for nivel in pilha:
+                                nivel[5] = True
+                            stats["solutions"] += 1
+                            if instr is not None:
+                                instr.solucao(len(pilha), stats["solutions"])
+                            if max_solucoes is not None and stats["solutions"] >= max_solucoes:
+                                parar = True
+                                stats["interrompido"] = "solucoes"
+                            if simetrias is None:
+                                stats["solucoes_simetricas"] += 1
+                                yield stats["solutions"] if apenas_contar else dict(arquivo) # Entrega uma cópia dict de arquivo (ou só a contagem)
+                            else:
+                                stats["solucoes_simetricas"] += simetrias.multiplicidade()
+                                yield stats["solutions"] if apenas_contar else simetrias.canonizar(arquivo)
+                            if parar:
+                                return
+                        else: # Verificação final deu False (atribuição inválida)
+                            stats["retrocessos"] += 1
+                            if pilha: # A verificação envolve todas as variáveis: sem salto possível
+                                pilha[-1][4][0] = len(pilha) - 2
+                    else:
+                        var = selecionar() # Seleciona a próxima variável livre pela heurística (MRV: menor domínio primeiro). Retorna a variável a atribuir
+                        valores = lcv(var, dominios, vizinhos, restricoes, arquivo, c7) # Ordena os valores possíveis para var usando LCV — valores que menos restringem os vizinhos vêm primeiro
+                        if limitante is not None:
+                            valores = limitante.ordenar(var, valores)
+                        conflito = [-1, set()]
+                        if simetrias is not None:
+                            filtrados = simetrias.filtrar(valores)
+                            if len(filtrados) < len(valores):
+                                stats["podas_simetria"] += len(valores) - len(filtrados)
+                                valores = filtrados
+                                conflito[0] = len(pilha) - 1 # Os valores cortados dependem de todos os times já usados
+                        pilha.append([var, valores, -1, dominios.marca(), conflito, False])
+
+                if not pilha:
+                    return
+                nivel = pilha[-1]
+                var, valores = nivel[0], nivel[1]
+                k = len(pilha) - 1
+                if nivel[2] >= 0: # Desfaz backtrack do valor anterior deste nível
+                    anterior = arquivo.pop(var, None)
+                    if anterior is not None:
+                        ordem.desatribuir(var)
+                        profundidade.pop(var, None)
+                        if simetrias is not None:
+                            simetrias.desatribuir(anterior)
+                    dominios.desfazer(nivel[3])
+                nivel[2] += 1
+                if nivel[2] == len(valores): # Acabaram os valores: volta para o nível de cima
+                    if explicacoes is None:
+                        pilha.pop()
+                        if instr is not None:
+                            instr.retornou(k, k - 1)
+                        continue
+                    destino = nivel_de_retorno(k)
+                    if instr is not None:
+                        instr.retornou(k, destino)
+                    while len(pilha) > destino + 1: # Desempilha até o nível responsável pelo conflito
+                        acima = pilha.pop()
+                        anterior = arquivo.pop(acima[0], None)
+                        if anterior is not None:
+                            ordem.desatribuir(acima[0])
+                            profundidade.pop(acima[0], None)
+                            if simetrias is not None:
+                                simetrias.desatribuir(anterior)
+                    dominios.desfazer(acima[3])
+                    continue
+                if max_nos is not None and len(valores) > 1 and stats["nodes"] - forcados >= max_nos:
+                    interromper("nos")
+                    return
+                if limite_relogio is not None and time.time() >= limite_relogio:
+                    interromper("tempo")
+                    return
+                stats["nodes"] += 1
+                if len(valores) == 1:
+                    forcados += 1
+                v = valores[nivel[2]]
+                if instr is not None:
+                    instr.no(k, var, v)
+                dominios.conflito = None
+                if explicacoes is None:
+                    ok = fc(dominios, var, v, restricoes, vizinhos, c7) and (propagar_no is None or propagar_no(restricoes, vizinhos)) # Poda os domínios no próprio store
+                else:
+                    explicacoes.causa_atual = (-1, (k,)) # Podas do forward checking dependem só de var
+                    ok = fc(dominios, var, v, restricoes, vizinhos, c7)
+                    if ok and propagar_no is not None:
+                        explicacoes.causa_atual = (k, ()) # Restrições globais dependem de todas as atribuídas
+                        ok = propagar_no(restricoes, vizinhos)
+                    if ok and armazem is not None:
+                        arquivo[var] = v
+                        profundidade[var] = k
+                        ok = aplicar_nogoods(arquivo, var, v)
+                        del arquivo[var]
+                        del profundidade[var]
+                    if not ok: # Acumula no conjunto de conflito do nível as variáveis que explicam a falha
+                        if dominios.conflito is None:
+                            nivel[4][0] = max(nivel[4][0], k - 1)
+                        else:
+                            explicacoes.juntar(nivel[4], dominios.conflito)
+                            remover_profundidade(nivel[4], k)
+                if ok and limitante is not None and limitante.podar():
+                    stats["podas_limite"] += 1
+                    dominios.conflito = None
+                    ok = False
+                    if explicacoes is not None: # O limite depende de todas as variáveis atribuídas
+                        nivel[4][0] = max(nivel[4][0], k - 1)
+                if instr is not None:
+                    if ok:
+                        instr.propagou(k, var, v)
+                    else:
+                        instr.falhou(k, var, v, dominios.conflito)
+                if not ok:
+                    ordem.registrar_falha(dominios.conflito or (var,))
+                    dominios.desfazer(nivel[3])
+                    stats["retrocessos"] += 1
+                    continue
+                arquivo[var] = v
+                profundidade[var] = k
+                ordem.atribuir(var)
+                if simetrias is not None:
+                    simetrias.atribuir(v)
+                descer = True
+        finally:
+            # Desfaz todas as podas da busca (também se quem consome o gerador parar no meio)
+            if pilha:
+                for nivel in pilha:
+                    anterior = arquivo.pop(nivel[0], None)
+                    if anterior is not None:
+                        ordem.desatribuir(nivel[0])
+                        if simetrias is not None:
+                            simetrias.desatribuir(anterior)
+                dominios.desfazer(pilha[0][3])
+                pilha.clear()
+            dominios.observadores.remove(ordem.ao_mudar)
+            if explicacoes is not None:
+                dominios.observadores.remove(explicacoes.ao_mudar)
+            if limitante is not None:
+                limitante.encerrar(dominios)
+            if instr is not None:
+                instr.encerrar(dominios)
+
+    inicio_busca = time.time()
+    try:
+        yield from busca()
+    finally:
+        fim_busca = time.time()
+        stats["time_search"] = fim_busca - inicio_busca
+        stats["time"] = fim_busca - inicio_total # inclui pré-processamento na conta total
+        if instr is not None:
+            stats["instrumentacao"] = instr.relatorio()
+
+# Conta as soluções sem montar nenhuma atribuição. Aceita as mesmas opções de iter_solucoes
+# Retorna: (quantidade de soluções, dicionário de estatísticas)
+def contar_solucoes(dados, **opcoes):
+    stats = {}
+    for _ in iter_solucoes(dados, apenas_contar=True, stats=stats, **opcoes):
+        pass
+    return stats["solutions"], stats
+
+# Solver com AC-3 (pré-processamento)
+# Usa MRV, LCV, AC-3 (pré), forward checking e checagens parciais
+# Entrada: dicionário 'arquivo' no formato JSON mostrado pelo usuário.
+# Retorna: lista de soluções e dicionário de estatísticas
+# opcoes: repassadas para iter_solucoes (propagacao, propagar_globais, c7_global...)
+def backtracking_solver_com_ac3(dados, **opcoes):
+    stats = {}
+    solucoes = list(iter_solucoes(dados, stats=stats, **opcoes)) # Soluções completas encontradas
     return solucoes, stats
 
+# Como backtracking_solver_com_ac3, mas guarda as soluções num ArmazemSolucoes (psr_solucoes): um bit por
+# jogador em vez de um dict, indo para disco (mmap) se passar do limite de memória
+# armazem: armazém a preencher (padrão: um novo, com os jogadores de lista_ordenada e os times dos domínios)
+# Retorna: (armazém, dicionário de estatísticas)
+def armazenar_solucoes(dados, armazem=None, **opcoes):
+    if armazem is None:
+        valores = sorted({val for times in dados["jogadores"].values() for val in times} | set(LimitesTimes(dados).nomes))
+        armazem = ArmazemSolucoes(sorted(dados["jogadores"]), valores)
+    stats = {}
+    for solucao in iter_solucoes(dados, stats=stats, **opcoes):
+        armazem.adicionar(solucao)
+    return armazem, stats
+
 def main(caminho):
     with open(caminho, "r") as arquivo:
         # JSON carregado com jogadores, posições, etc
@@ -292,7 +1613,7 @@ def main(caminho):
 
     # Primeiro: rodar COM AC-3 (pré) para comparação
     print("Rodando solver COM AC-3 (pré-processamento), MRV e LCV...\n")
-    solucoes_ac3, stats_ac3 = backtracking_solver_com_ac3(dados)
+    solucoes_ac3, stats_ac3 = armazenar_solucoes(dados) # Soluções compactadas, decodificadas uma a uma ao imprimir
     print("=== Resultados COM AC-3 (pré) ===")
     if "time_pre" in stats_ac3:
         tp = stats_ac3["time_pre"]
@@ -302,12 +1623,20 @@ def main(caminho):
           f"{stats_ac3['tam_medio_inicial']:.2f} -> {stats_ac3['tam_medio_final']:.2f}")
     tp = stats_ac3.get("time_pre", 0.0)
     print(f"Tempo total: {stats_ac3.get('time', 0.0):.8f} s | Pré-processamento: {tp:.8f} s | Busca: {stats_ac3.get('time_search', 0.0):.8f} s")
+    print(f"Revisões de arco: {stats_ac3.get('revisoes', 0)} | Checagens de restrição: {stats_ac3.get('checagens', 0)}")
     print(f"Nós testados: {stats_ac3.get('nodes', 0)} | Retrocessos: {stats_ac3.get('retrocessos', 0)}")
-    print(f"Soluções encontradas: {stats_ac3.get('solutions', 0)}\n")
+    if stats_ac3.get("solucoes_simetricas", 0) != stats_ac3.get("solutions", 0): # Times intercambiáveis
+        print(f"Soluções encontradas: {stats_ac3.get('solutions', 0)} "
+              f"({stats_ac3['solucoes_simetricas']} contando as com times espelhados)\n")
+    else:
+        print(f"Soluções encontradas: {stats_ac3.get('solutions', 0)}\n")
     for i, s in enumerate(solucoes_ac3, start=1):
         print(f"--- Solução {i} (COM AC-3) ---")
         for j in sorted(s.keys()):
             print(f"  {j}: {s[j]}")
         print("")
+    solucoes_ac3.fechar()
 
-main("dificil.json")
\ No newline at end of file
+if __name__ == "__main__":
+    # Uma instância com saída detalhada; para muitas instâncias use psr_lote.py
+    main(sys.argv[1] if len(sys.argv) > 1 else "dificil.json")
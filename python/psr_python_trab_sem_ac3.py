@@ -1,8 +1,10 @@
 import json
+import sys
 import time
 
 # Construir restrições binárias (C2, C3, C7)
-def construir_restricoes_binarias(lista_ordenada, posicoes):
+# c7: se False, não cria os arcos de C7 (instância sem "C7" nas restrições, como na verificação final)
+def construir_restricoes_binarias(lista_ordenada, posicoes, c7=True):
     restricoes = {}
     vizinhos = {v: set() for v in lista_ordenada} # Dicionário que mapeia cada variável para o conjunto de outras variáveis que ela possui restrições.
     def add(x, y, fn): # Auxiliar para adicionar restrições
@@ -23,7 +25,7 @@ def construir_restricoes_binarias(lista_ordenada, posicoes):
     def restricao_c7(a, b): # Função genérica para a restrição de posição
         return a != b
 
-    for i in range(len(lista_ordenada)):
+    for i in range(len(lista_ordenada) if c7 else 0):
         for j in range(i+1, len(lista_ordenada)):
             vi = lista_ordenada[i]; vj = lista_ordenada[j]
             if posicoes.get(vi) == posicoes.get(vj):
@@ -118,7 +120,8 @@ def verificacao_final (arquivo, dados):
 
     # C8: Limite de força média por time (encode como soma de ratings não ultrapassar limiar).
     if "limite" in dados :
-        limite = float(dados["limite"].items('numero')[0]) # Pega o valor do limite
+        limite = dados["limite"]
+        limite = float(limite["numero"] if isinstance(limite, dict) else limite) # Pega o valor do limite ({"numero": "80"} ou só o número)
         soma = {"T1": 0, "T2": 0}
         conta_times = {"T1": 0, "T2": 0}
         for j in jogadores:
@@ -131,63 +134,93 @@ def verificacao_final (arquivo, dados):
 
     return True
 
-# Backtracking (sem AC-3 pré). 
-# Mede tempo total e tempo de busca.
-# Retorna uma lista de dicionários solucoes (ex: { "J1": "T1", "J2": "T2", ... }) e stats com as métricas
-def backtracking_solver_sem_ac3(dados):
+# Backtracking (sem AC-3 pré) em forma de gerador: devolve cada solução assim que é encontrada
+# max_solucoes: para depois de k soluções (None = todas)
+# apenas_contar: não monta dicionários; cada item gerado é só o número de soluções encontradas até ali
+# tempo_maximo: orçamento em segundos de relógio; max_nos: orçamento de nós testados
+# stats: dicionário preenchido com as métricas. Fica completo quando o gerador termina ou é fechado;
+#        stats["interrompido"] diz se parou por "solucoes", "tempo" ou "nos"
+def iter_solucoes(dados, max_solucoes=None, apenas_contar=False, tempo_maximo=None, max_nos=None, stats=None):
+    if stats is None:
+        stats = {}
     inicio_total = time.time()
     lista_ordenada = sorted(list(dados["jogadores"].keys())) # {'J1','J2','J3',...}
     dominios_iniciais = {v: list(dados["jogadores"][v])[:] for v in lista_ordenada}
-    restricoes, vizinhos = construir_restricoes_binarias(lista_ordenada, dados["posicoes"])
-
-    
-    nos_encontrados = 0 # Testes feitos
-    retrocessos = 0 # Retrocessos
-    solucoes = [] # Soluções completas encontradas
-
-    inicio_busca = time.time()
+    restricoes, vizinhos = construir_restricoes_binarias(lista_ordenada, dados["posicoes"], "C7" in dados["restricoes"])
+
+    stats.update({"time": 0.0,
+                  "time_search": 0.0,
+                  "nodes": 0, # Testes feitos
+                  "retrocessos": 0, # Retrocessos
+                  "solutions": 0, # Soluções completas encontradas
+                  "interrompido": None
+                  })
+    parar = False # Vira True quando algum orçamento (soluções, tempo ou nós) acaba
+    limite_relogio = (time.time() + tempo_maximo) if tempo_maximo is not None else None
 
     # Busca recursiva. Se as variáveis já tem valor, então chama verificacao_final, se passa vai como solução, senão vai como retrocesso. Se ainda faltam variáveis chama a próxima com MRV e ordena os valores possíveis com LCV
     # Aqui podemos dizer que todas as variáveis foram atribuídas
     def busca(arquivo, dominios_correntes): # dominios_correntes contém os domínios atuais (após forward checking)
-        nonlocal nos_encontrados, retrocessos, solucoes
+        nonlocal parar
         if len(arquivo) == len(lista_ordenada) :
             if verificacao_final(arquivo, dados) == True: # Já verificado pelas restrições
-                solucoes.append(dict(arquivo)) # Salva um cópia dict de arquivo em solucoes
+                stats["solutions"] += 1
+                if max_solucoes is not None and stats["solutions"] >= max_solucoes:
+                    parar = True
+                    stats["interrompido"] = "solucoes"
+                yield stats["solutions"] if apenas_contar else dict(arquivo) # Entrega uma cópia dict de arquivo (ou só a contagem)
             else: # Verificação final deu False (atribuição inválida)
-                retrocessos += 1
-            return False
+                stats["retrocessos"] += 1
+            return
 
         var = selecionar_mrv(arquivo, dominios_correntes) # Seleciona a próxima variável livre usando a heurística MRV (menor domínio primeiro). Retorna a variável a atribuir
         valores = ordenar_lcv(var, dominios_correntes, vizinhos, restricoes, arquivo) # Ordena os valores possíveis para var usando LCV — valores que menos restringem os vizinhos vêm primeiro
         for v in valores:
-            nos_encontrados += 1
+            if parar:
+                return
+            if max_nos is not None and stats["nodes"] >= max_nos:
+                parar = True
+                stats["interrompido"] = "nos"
+                return
+            if limite_relogio is not None and time.time() >= limite_relogio:
+                parar = True
+                stats["interrompido"] = "tempo"
+                return
+            stats["nodes"] += 1
             pruned = forward_checking(dominios_correntes, var, v, restricoes) # Conj. de domínios atualizados, depois da poda
             if pruned is None:
-                retrocessos += 1
+                stats["retrocessos"] += 1
                 continue
 
             arquivo[var] = v
-            busca(arquivo, pruned)
-            # Desfaz backstrack
-            del arquivo[var]
+            try:
+                yield from busca(arquivo, pruned)
+            finally:
+                # Desfaz backstrack
+                del arquivo[var]
 
-        return False
+    inicio_busca = time.time()
+    try:
+        yield from busca({}, dominios_iniciais)
+    finally:
+        fim_busca = time.time()
+        stats["time_search"] = fim_busca - inicio_busca
+        stats["time"] = fim_busca - inicio_total
+
+# Conta as soluções sem montar nenhuma atribuição. Aceita as mesmas opções de iter_solucoes
+# Retorna: (quantidade de soluções, dicionário de estatísticas)
+def contar_solucoes(dados, **opcoes):
+    stats = {}
+    for _ in iter_solucoes(dados, apenas_contar=True, stats=stats, **opcoes):
+        pass
+    return stats["solutions"], stats
 
-    busca({}, dominios_iniciais)
-    fim_busca = time.time()
-    fim_total = time.time()
-    tempo_exex_busca = fim_busca - inicio_busca
-    tempo_exex_total = fim_total - inicio_total
-
-    # Dicionário de resposta para apresentação das estatísticas
-    stats = {"time": tempo_exex_total, 
-             "time_search": tempo_exex_busca,
-             "nodes": nos_encontrados, 
-             "retrocessos": retrocessos, 
-             "solutions": len(solucoes)
-             }
-    
+# Backtracking (sem AC-3 pré). 
+# Mede tempo total e tempo de busca.
+# Retorna uma lista de dicionários solucoes (ex: { "J1": "T1", "J2": "T2", ... }) e stats com as métricas
+def backtracking_solver_sem_ac3(dados):
+    stats = {}
+    solucoes = list(iter_solucoes(dados, stats=stats)) # Soluções completas encontradas
     return solucoes, stats
 
 def main(caminho):
@@ -231,4 +264,5 @@ def main(caminho):
     if not solucoes:
         print("Nenhuma solução válida encontrada.")
 
-main("dificil.json")
\ No newline at end of file
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "dificil.json")
@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import tempfile
+
+# Armazém compacto de soluções. Cada solução {jogador: time} vira um registro de tamanho fixo: b bits por jogador
+# (b = bits para numerar os valores: 1 para T1/T2, 2 para até 4 times, ...), na ordem de lista_ordenada, num
+# bytearray. Um dict de mil jogadores ocupa dezenas de KB; o registro ocupa 125 bytes.
+#   - Passando de limite_memoria bytes, os registros vão para um arquivo temporário (apagado ao fechar) e a
+#     memória vira só um buffer de escrita; a leitura do que está em disco é feita por mmap.
+#   - Acesso aleatório: armazem[i] decodifica só o registro i; iterar decodifica um por vez (nada de lista).
+#   - deduplicar=True ignora soluções repetidas (útil ao juntar soluções de várias fontes ou amostras
+#     aleatórias): guarda só o hash de cada registro e compara os bytes quando o hash coincide.
+#   - exportar escreve as soluções em JSONL ou CSV direto do armazém, uma por vez.
+# Comporta-se como uma sequência de dicts (len, índice, fatias, iteração), então pode substituir a lista de
+# soluções de backtracking_solver_com_ac3 (ver armazenar_solucoes em psr_python_trab_com_ac3).
+
+LIMITE_MEMORIA = 64 * 1024 * 1024 # Bytes de registros em memória antes de ir para o disco
+BLOCO_ESCRITA = 1024 * 1024 # Tamanho do buffer de escrita depois que o armazém foi para o disco
+
+class ArmazemSolucoes:
+    # variaveis: ordem dos jogadores no registro (lista_ordenada)
+    # valores: valores possíveis (times), na ordem dos códigos
+    # diretorio: onde criar o arquivo temporário (padrão: o do sistema)
+    def __init__(self, variaveis, valores=("T1", "T2"), limite_memoria=LIMITE_MEMORIA, deduplicar=False, diretorio=None):
+        self.variaveis = list(variaveis)
+        self.valores = list(valores)
+        self.bits = max(1, (len(self.valores) - 1).bit_length()) # Bits por jogador
+        self.largura = len(self.variaveis) * self.bits # Bits por registro
+        self.tamanho = max(1, (self.largura + 7) // 8) # Bytes por registro
+        # Código de cada valor como cadeia de bits: codificar monta o número inteiro com um int(cadeia, 2), em C
+        self.para_bits = {val: format(i, f"0{self.bits}b") for i, val in enumerate(self.valores)}
+        self.de_bits = {cadeia: val for val, cadeia in self.para_bits.items()}
+        self.inversa = self.variaveis[::-1] # O primeiro jogador fica nos bits menos significativos
+        self.limite_memoria = limite_memoria
+        self.diretorio = diretorio
+        self.memoria = bytearray() # Registros ainda não escritos no arquivo
+        self.arquivo = None # Arquivo temporário (depois de passar do limite)
+        self.mapa = None # mmap do arquivo, refeito quando o arquivo cresce
+        self.em_disco = 0 # Registros no arquivo (os primeiros em_disco)
+        self.quantidade = 0
+        self.vistos = {} if deduplicar else None # hash do registro -> índice (ou lista de índices, se colidir)
+        self.duplicadas = 0
+
+    def codificar(self, arquivo): # {var: valor} -> registro em bytes
+        para_bits = self.para_bits
+        cadeia = "".join([para_bits[arquivo[var]] for var in self.inversa])
+        return int(cadeia or "0", 2).to_bytes(self.tamanho, "little")
+
+    def decodificar(self, registro): # Registro em bytes -> {var: valor} (na ordem de self.variaveis)
+        if not self.variaveis:
+            return {}
+        cadeia = format(int.from_bytes(registro, "little"), f"0{self.largura}b")
+        if self.bits == 1:
+            return dict(zip(self.variaveis, map(self.de_bits.__getitem__, reversed(cadeia))))
+        b = self.bits
+        pedacos = [cadeia[j:j + b] for j in range(self.largura - b, -1, -b)]
+        return dict(zip(self.variaveis, map(self.de_bits.__getitem__, pedacos)))
+
+    # Guarda a solução. Retorna o índice dela, ou None se deduplicar e ela já estava no armazém
+    def adicionar(self, arquivo):
+        registro = self.codificar(arquivo)
+        if self.vistos is not None:
+            if self.indice_registro(registro) is not None:
+                self.duplicadas += 1
+                return None
+            h = hash(registro)
+            anteriores = self.vistos.get(h)
+            if anteriores is None:
+                self.vistos[h] = self.quantidade
+            elif isinstance(anteriores, list):
+                anteriores.append(self.quantidade)
+            else:
+                self.vistos[h] = [anteriores, self.quantidade]
+        self.memoria += registro
+        self.quantidade += 1
+        if len(self.memoria) >= (BLOCO_ESCRITA if self.arquivo is not None else self.limite_memoria):
+            self.despejar()
+        return self.quantidade - 1
+
+    def estender(self, solucoes): # Retorna quantas soluções entraram (sem contar as repetidas)
+        return sum(self.adicionar(s) is not None for s in solucoes)
+
+    # Escreve no arquivo os registros que estão em memória (cria o arquivo na primeira vez)
+    def despejar(self):
+        if self.arquivo is None:
+            self.arquivo = tempfile.TemporaryFile(prefix="psr_solucoes_", dir=self.diretorio)
+        self.arquivo.seek(0, os.SEEK_END)
+        self.arquivo.write(self.memoria)
+        self.em_disco += len(self.memoria) // self.tamanho
+        self.memoria = bytearray()
+
+    def mapear(self): # Refaz o mmap para cobrir o arquivo inteiro
+        self.arquivo.flush()
+        if self.mapa is not None:
+            self.mapa.close()
+        self.mapa = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def registro(self, i): # Registro (bytes) da solução i, sem decodificar
+        if i < 0:
+            i += self.quantidade
+        if not 0 <= i < self.quantidade:
+            raise IndexError("índice de solução fora do armazém")
+        if i >= self.em_disco:
+            inicio = (i - self.em_disco) * self.tamanho
+            return bytes(self.memoria[inicio:inicio + self.tamanho])
+        inicio = i * self.tamanho
+        if self.mapa is None or len(self.mapa) < inicio + self.tamanho:
+            self.mapear()
+        return self.mapa[inicio:inicio + self.tamanho]
+
+    # Índice do registro no armazém (None se não está). Com deduplicar usa os hashes; senão percorre tudo
+    def indice_registro(self, registro):
+        if self.vistos is not None:
+            candidatos = self.vistos.get(hash(registro))
+            if candidatos is None:
+                return None
+            if not isinstance(candidatos, list):
+                candidatos = (candidatos,)
+            return next((i for i in candidatos if self.registro(i) == registro), None)
+        return next((i for i in range(self.quantidade) if self.registro(i) == registro), None)
+
+    def indice(self, arquivo):
+        return self.indice_registro(self.codificar(arquivo))
+
+    def registros(self): # Registros em ordem, sem decodificar
+        for i in range(self.quantidade):
+            yield self.registro(i)
+
+    # Acesso como lista de dicts
+    def __len__(self):
+        return self.quantidade
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.decodificar(self.registro(j)) for j in range(*i.indices(self.quantidade))]
+        return self.decodificar(self.registro(i))
+
+    def __iter__(self):
+        return map(self.decodificar, self.registros())
+
+    def __contains__(self, arquivo):
+        return self.indice(arquivo) is not None
+
+    def bytes_usados(self): # (bytes em memória, bytes em disco) dos registros
+        return len(self.memoria), self.em_disco * self.tamanho
+
+    # Escreve as soluções em destino (caminho ou arquivo aberto), uma por vez. Retorna quantas escreveu
+    # formato: "jsonl" (um objeto {jogador: time} por linha) ou "csv" (cabeçalho com os jogadores, uma linha por solução)
+    def exportar(self, destino, formato="jsonl"):
+        if formato not in ("jsonl", "csv"):
+            raise ValueError(f"Formato de exportação desconhecido: {formato}")
+        if isinstance(destino, (str, os.PathLike)):
+            with open(destino, "w", encoding="utf-8") as saida:
+                return self.exportar(saida, formato)
+        if formato == "csv":
+            destino.write(",".join(self.variaveis) + "\n")
+        for solucao in self:
+            if formato == "jsonl":
+                destino.write(json.dumps(solucao, ensure_ascii=False) + "\n")
+            else:
+                destino.write(",".join(solucao.values()) + "\n")
+        return self.quantidade
+
+    def fechar(self): # Libera o mmap e apaga o arquivo temporário
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
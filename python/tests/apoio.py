@@ -0,0 +1,51 @@
+import itertools
+import random
+
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+# Apoio dos testes diferenciais: instâncias pequenas sorteadas e um oráculo por força bruta (todas as atribuições
+# dos domínios do JSON passam por verificacao_final), contra o qual cada motor é comparado.
+
+# Instâncias pequenas com semente: variam tamanho, posições repetidas, domínios restritos, C7 e C8
+def instancias(quantidade, n_min=5, n_max=10, semente=0, **opcoes):
+    for i in range(quantidade):
+        rnd = random.Random(semente + i)
+        parametros = {"densidade_posicoes": rnd.choice([0, 0.5, 1]), "fracao_restritos": rnd.choice([0, 0.2]),
+                      "folga_limite": rnd.choice([None, 0.5, 2]), "c7": rnd.random() < 0.8}
+        parametros.update(opcoes)
+        yield gerar_instancia(rnd.randint(n_min, n_max), semente + i, **parametros)
+
+def chave(solucao): # Solução como tupla ordenada (comparável e usável em conjuntos)
+    return tuple(sorted(solucao.items()))
+
+# Todas as soluções por força bruta, como conjunto de chaves
+def bruto(dados):
+    jogadores = sorted(dados["jogadores"])
+    solucoes = set()
+    for times in itertools.product(*(dados["jogadores"][j] for j in jogadores)):
+        solucao = dict(zip(jogadores, times))
+        if com_ac3.verificacao_final(solucao, dados):
+            solucoes.add(chave(solucao))
+    return solucoes
+
+# Instâncias com k times. Metade troca J1..J5 por P1..P5 (sem C2/C3/C5/C6 todos os times ficam intercambiáveis);
+# algumas tiram C1/C4 ou dão limites próprios aos times (que separam as classes de simetria)
+def instancias_times(quantidade, semente):
+    for s in range(semente, semente + quantidade):
+        rnd = random.Random(s)
+        k = rnd.choice([3, 4])
+        dados = gerar_instancia(rnd.randint(5, 9 if k == 3 else 7), s, densidade_posicoes=rnd.choice([0, 0.5, 1]),
+                                por_posicao=rnd.choice([2, 3]), fracao_restritos=rnd.choice([0, 0.2]),
+                                folga_limite=rnd.choice([None, 2, 5]), times=k)
+        if rnd.random() < 0.5:
+            nome = {j: "P" + j[1:] for j in dados["jogadores"]}
+            for campo in ("jogadores", "overais", "posicoes"):
+                dados[campo] = {nome[j]: v for j, v in dados[campo].items()}
+        if rnd.random() < 0.3:
+            dados["restricoes"] = {c: v for c, v in dados["restricoes"].items() if c not in ("C1", "C4")}
+        if rnd.random() < 0.3:
+            dados["times"] = {t: ({"min_jogadores": 1, "max_jogadores": 4} if rnd.random() < 0.5 else {}) for t in dados["times"]}
+            if rnd.random() < 0.5:
+                dados["times"]["T3"] = dict(dados["times"]["T3"], media_min=72)
+        yield dados
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do solver ficam soltos em python/ e se importam pelo nome: roda os testes com esse diretório no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
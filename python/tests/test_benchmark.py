@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+import benchmark_suite
+from gerador_instancias import gerar_instancia, gerar_suite
+
+# A mesma semente gera a mesma instância, sem depender do estado global do random; sementes diferentes mudam a
+# instância
+@pytest.mark.parametrize("opcoes", [{}, {"densidade_posicoes": 1, "por_posicao": 3}, {"fracao_restritos": 0.3},
+                                    {"folga_limite": 1.0}, {"times": 4, "c7": False}])
+def test_gerador_deterministico(opcoes):
+    for semente in range(5):
+        primeira = gerar_instancia(14, semente, **opcoes)
+        random.seed(semente + 100)
+        assert gerar_instancia(14, semente, **opcoes) == primeira
+    assert gerar_instancia(14, 0, **opcoes) != gerar_instancia(14, 1, **opcoes)
+    assert gerar_suite((8, 12), (0, 1)) == gerar_suite((8, 12), (0, 1))
+
+# Registro de resultado como os de benchmark_suite.medir, só com os campos que comparar lê
+def registro(solucoes=10, nos=100, tempo=1.0, erro=None):
+    return {"solucoes": solucoes, "nos": nos, "tempo_mediana": tempo, "erro": erro}
+
+def test_comparar_acusa_regressoes():
+    base = {("a", "ac3"): registro(), ("b", "ac3"): registro(), ("c", "ac3"): registro(), ("d", "ac3"): registro(),
+            ("e", "ac3"): registro(), ("f", "ac3"): registro(), ("g", "ac3"): registro()}
+    novo = {("a", "ac3"): registro(solucoes=9), # Contagem mudou
+            ("b", "ac3"): registro(nos=101), # Mais nós
+            ("c", "ac3"): registro(tempo=1.2), # Tempo acima da tolerância
+            ("d", "ac3"): registro(erro="ValueError: x"), # Passou a falhar
+            ("e", "ac3"): registro(tempo=1.05, nos=90), # Dentro da tolerância e com menos nós: não é regressão
+            ("f", "ac3"): registro(tempo=0.5),
+            ("h", "ac3"): registro(erro="ValueError: x")} # Só no novo: não é comparada
+    regressoes = benchmark_suite.comparar(base, novo, tolerancia=0.10)
+    assert [(instancia, motivo.split()[0]) for instancia, _, motivo in regressoes] == \
+           [("a", "soluções"), ("b", "nós"), ("c", "tempo"), ("d", "passou")]
+    assert regressoes[3][2] == "passou a falhar: ValueError: x"
+    assert benchmark_suite.comparar(base, novo, tolerancia=0.25)[2][0] == "d" # Com tolerância maior o tempo passa
+    # Erro que já existia na base não é regressão, nem compara os outros campos
+    assert benchmark_suite.comparar({("a", "ac3"): registro(erro="E")}, {("a", "ac3"): registro(solucoes=0, erro="E")}) == []
@@ -0,0 +1,20 @@
+import pytest
+
+import psr_python_trab_com_ac3 as com_ac3
+
+from apoio import bruto, chave, instancias
+
+OPCOES = [{}, {"propagacao": "ac3rm"}, {"propagar_globais": False}, {"c7_global": False},
+          {"heuristica": "mrv_grau"}, {"heuristica": "dom_wdeg"}, {"backjumping": True},
+          {"backjumping": True, "nogoods": 0}, {"backjumping": True, "nogoods": 20, "heuristica": "dom_wdeg"}]
+
+# Cada combinação de propagação, ordem de variáveis e retrocesso acha as soluções da força bruta, sem repetir;
+# com a simetria dos dois times, solucoes_simetricas da contagem recupera o total
+@pytest.mark.parametrize("opcoes", OPCOES)
+def test_igual_a_forca_bruta(opcoes):
+    for dados in instancias(40, n_max=10, semente=2500):
+        esperado = bruto(dados)
+        solucoes = [chave(s) for s in com_ac3.iter_solucoes(dados, simetria=False, **opcoes)]
+        assert len(solucoes) == len(esperado) and set(solucoes) == esperado
+        _, stats = com_ac3.contar_solucoes(dados, **opcoes)
+        assert stats["solucoes_simetricas"] == len(esperado)
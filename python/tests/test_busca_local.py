@@ -0,0 +1,33 @@
+import psr_busca_local
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias
+
+# A busca local só diz "valida" para atribuições que a força bruta (e os motores exatos) aceitam, e em elencos
+# pequenos com solução acha uma
+def test_concorda_com_forca_bruta():
+    for dados in instancias(60, n_max=10, semente=500):
+        esperado = bruto(dados)
+        solucao, stats = psr_busca_local.busca_local(dados, tempo_maximo=None, max_flips=3000)
+        if solucao is None:
+            assert not esperado
+            continue
+        assert stats["valida"] == (chave(solucao) in esperado)
+        if esperado:
+            assert stats["valida"]
+
+def test_c7_desligada():
+    dados = gerar_instancia(10, 1, c7=False, densidade_posicoes=1.0)
+    solucao, stats = psr_busca_local.busca_local(dados, tempo_maximo=None, max_flips=3000)
+    assert stats["valida"] and chave(solucao) in bruto(dados)
+
+# Com C8 apertada, as violações informadas são as da melhor atribuição contadas do zero (sem o resíduo da soma
+# das variações da C8): zero exatamente quando a atribuição é válida
+def test_violacoes_contadas_do_zero():
+    for semente in range(30):
+        dados = gerar_instancia(24, semente, folga_limite=0.3)
+        solucao, stats = psr_busca_local.busca_local(dados, tempo_maximo=None, max_flips=4000, semente=semente)
+        assert stats["valida"] == (stats["violacoes"] == 0)
+        estado = psr_busca_local.EstadoBuscaLocal(dados, None)
+        times = [("T1", "T2").index(solucao[j]) for j in estado.jogadores]
+        assert estado.recontar(times) == stats["violacoes"]
@@ -0,0 +1,27 @@
+import time
+
+import psr_componentes
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, instancias
+
+def test_contagem_igual_a_forca_bruta():
+    for dados in instancias(60, n_max=11, semente=700):
+        assert psr_componentes.contar_por_componentes(dados)[0] == len(bruto(dados))
+
+# Elencos médios (fora do alcance da força bruta) contra a busca, com e sem C8
+def test_contagem_igual_a_busca():
+    for semente in range(4):
+        for folga in (None, 0.3, 1.0):
+            dados = gerar_instancia(18, semente, folga_limite=folga, fracao_restritos=0.1)
+            assert psr_componentes.contar_por_componentes(dados)[0] == com_ac3.contar_solucoes(dados)[0]
+
+# Com C8 e centenas de jogadores livres a tabela de (k, peso) é a maior possível: a convolução tem de caber em
+# poucos segundos (antes do corte único das janelas levava minutos)
+def test_tempo_com_c8():
+    dados = gerar_instancia(500, 0, folga_limite=1.0)
+    inicio = time.time()
+    quantidade, stats = psr_componentes.contar_por_componentes(dados)
+    assert time.time() - inicio < 10
+    assert quantidade == stats["solutions"] > 0
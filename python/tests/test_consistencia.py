@@ -0,0 +1,33 @@
+import pytest
+
+import psr_python_trab_com_ac3 as com_ac3
+
+from apoio import bruto, chave, instancias
+
+NIVEIS = [["unaria"], ["rpc"], ["sac"], ["unaria", "rpc", "sac"], [("sac", None, 1)]]
+
+# Os níveis extras só tiram valores que não aparecem em nenhuma solução, e a busca depois deles acha as mesmas
+# soluções da força bruta
+@pytest.mark.parametrize("consistencia", NIVEIS)
+@pytest.mark.parametrize("propagacao", ["ac3", "ac3rm"])
+def test_poda_correta(consistencia, propagacao):
+    for dados in instancias(40, n_max=10, semente=2000):
+        esperado = bruto(dados)
+        modelo = com_ac3.compilar_modelo(dados, propagacao=propagacao, consistencia=consistencia)
+        if not modelo.consistente:
+            assert not esperado
+            continue
+        for solucao in esperado:
+            assert all(time in modelo.dominios[j] for j, time in solucao)
+        solucoes = [chave(s) for s in com_ac3.iter_solucoes(dados, modelo=modelo, simetria=False)]
+        assert len(solucoes) == len(esperado) and set(solucoes) == esperado
+
+# SAC nunca deixa domínios maiores que só o AC-3
+def test_sac_mais_forte_que_ac3():
+    for dados in instancias(40, n_max=10, semente=2000):
+        ac3 = com_ac3.compilar_modelo(dados)
+        sac = com_ac3.compilar_modelo(dados, consistencia=["sac"])
+        if not ac3.consistente:
+            assert not sac.consistente
+        elif sac.consistente:
+            assert all(set(sac.dominios[j]) <= set(ac3.dominios[j]) for j in ac3.lista_ordenada)
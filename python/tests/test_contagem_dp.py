@@ -0,0 +1,27 @@
+import collections
+
+import psr_componentes
+import psr_contagem_dp
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias
+
+def test_contagem_igual_a_forca_bruta():
+    for dados in instancias(60, n_max=11, semente=900):
+        assert psr_contagem_dp.contar_dp(dados)[0] == len(bruto(dados))
+
+# A DP e a contagem por componentes usam a mesma convolução, mas com camadas diferentes (binomiais aqui)
+def test_contagem_igual_a_componentes():
+    for semente in range(3):
+        for folga in (None, 0.5, 1.0):
+            dados = gerar_instancia(200, semente, folga_limite=folga, fracao_restritos=0.1)
+            assert psr_contagem_dp.contar_dp(dados)[0] == psr_componentes.contar_por_componentes(dados)[0]
+
+# Toda amostra é solução e, em elencos com poucas soluções, todas aparecem
+def test_amostras_validas():
+    for dados in instancias(30, n_max=9, semente=950):
+        esperado = bruto(dados)
+        amostras, stats = psr_contagem_dp.amostrar_dp(dados, 40 * len(esperado), semente=1)
+        assert stats["solutions"] == len(esperado)
+        contagem = collections.Counter(chave(s) for s in amostras)
+        assert set(contagem) == esperado
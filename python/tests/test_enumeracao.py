@@ -0,0 +1,41 @@
+import pytest
+
+import psr_enumeracao
+import psr_python_trab_com_ac3 as com_ac3
+
+from apoio import bruto, chave, instancias
+
+CAMINHOS = [False] + ([True] if psr_enumeracao.np is not None else []) # Verificação em Python puro e com NumPy
+
+# O oráculo (enumeração do JSON sem propagação) confere a busca e vice-versa
+@pytest.mark.parametrize("usar_numpy", CAMINHOS)
+def test_oraculo_igual_a_busca(usar_numpy):
+    for dados in instancias(60, n_max=12, semente=100, c7=True):
+        solucoes, stats = psr_enumeracao.oraculo(dados, usar_numpy=usar_numpy)
+        busca = {chave(s) for s in com_ac3.iter_solucoes(dados)}
+        assert {chave(s) for s in solucoes} == busca
+        assert stats["solutions"] == len(busca)
+
+def test_oraculo_igual_a_forca_bruta():
+    for dados in instancias(40, n_max=9, semente=200, c7=True):
+        solucoes, _ = psr_enumeracao.oraculo(dados)
+        assert {chave(s) for s in solucoes} == bruto(dados)
+
+# enumeracao=True troca a busca pela enumeração sobre o modelo compilado (com os domínios já podados)
+@pytest.mark.parametrize("usar_numpy", CAMINHOS)
+def test_enumeracao_no_iter_solucoes(usar_numpy, monkeypatch):
+    if not usar_numpy:
+        monkeypatch.setattr(psr_enumeracao, "np", None)
+    for dados in instancias(40, n_max=14, semente=300, c7=True):
+        busca = {chave(s) for s in com_ac3.iter_solucoes(dados)}
+        stats = {}
+        enumeradas = [chave(s) for s in com_ac3.iter_solucoes(dados, enumeracao=True, stats=stats)]
+        assert len(enumeradas) == len(set(enumeradas)) and set(enumeradas) == busca
+        assert stats["nodes"] == 0 and stats["solutions"] == len(busca)
+        assert com_ac3.contar_solucoes(dados, enumeracao=True)[0] == len(busca)
+
+def test_busca_e_o_padrao():
+    dados = next(instancias(1, n_min=8, n_max=8, semente=5))
+    stats = {}
+    list(com_ac3.iter_solucoes(dados, stats=stats))
+    assert stats["nodes"] > 0
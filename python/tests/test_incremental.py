@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+import psr_incremental
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias
+
+# Depois de cada edição, a solução do solver incremental tem de ser uma das soluções da força bruta sobre os
+# dados editados (e None só quando não há nenhuma)
+def conferir(solver):
+    solucao, stats = solver.resolver()
+    esperado = bruto(solver.dados)
+    if solucao is None:
+        assert not esperado, stats["modo"]
+    else:
+        assert chave(solucao) in esperado, stats["modo"]
+
+@pytest.mark.parametrize("c7_global", [True, False])
+def test_edicoes_aleatorias(c7_global):
+    for i, dados in enumerate(instancias(12, n_max=9, semente=400)):
+        rnd = random.Random(i)
+        solver = psr_incremental.SolverIncremental(dados, c7_global=c7_global)
+        conferir(solver)
+        for k in range(8):
+            edicao = rnd.choice(["entrar", "sair", "restringir", "relaxar", "overall", "c7", "c8"])
+            livres = [j for j in solver.lista_ordenada if j not in psr_incremental.JOGADORES_FIXOS]
+            if edicao == "entrar":
+                solver.adicionar_jogador(f"N{k}", rnd.choice([["T1"], ["T2"], ["T1", "T2"]]), rnd.randint(60, 90),
+                                         rnd.choice(list(solver.dados["posicoes"].values()) + ["nova"]))
+            elif edicao == "sair" and livres:
+                solver.remover_jogador(rnd.choice(livres))
+            elif edicao == "restringir":
+                solver.restringir_dominio(rnd.choice(solver.lista_ordenada), [rnd.choice(["T1", "T2"])])
+            elif edicao == "relaxar":
+                solver.relaxar_dominio(rnd.choice(solver.lista_ordenada), ["T1", "T2"])
+            elif edicao == "overall":
+                solver.mudar_overall(rnd.choice(solver.lista_ordenada), rnd.randint(60, 90))
+            elif edicao == "c7":
+                solver.definir_c7(not solver.c7_ativa())
+            elif edicao == "c8":
+                solver.definir_c8(rnd.choice([None, 72, 76, 80]))
+            conferir(solver)
+
+# Sem "C7" nas restrições as posições repetidas não restringem nada, em todos os motores
+def test_c7_desligada_igual_a_busca():
+    dados = gerar_instancia(10, 1, c7=False, densidade_posicoes=1.0)
+    solucoes = {chave(s) for s in com_ac3.iter_solucoes(dados)}
+    assert solucoes == bruto(dados)
+    solucao, _ = psr_incremental.SolverIncremental(dados).resolver()
+    assert chave(solucao) in solucoes
+
+# Um domínio esvaziado continua provando a inconsistência depois de podas em outros jogadores, até ser relaxado
+def test_dominio_vazio_continua_inconsistente():
+    solver = psr_incremental.SolverIncremental(gerar_instancia(10, 1))
+    solver.restringir_dominio("J1", [])
+    solver.restringir_dominio("J8", ["T1"])
+    solver.adicionar_jogador("N1", ["T2"], 70, "nova")
+    solucao, stats = solver.resolver()
+    assert solucao is None and stats["modo"] == "inconsistente"
+    solver.relaxar_dominio("J1", ["T1", "T2"])
+    conferir(solver)
+    assert solver.resolver()[1]["modo"] != "inconsistente"
+
+def test_time_desconhecido():
+    solver = psr_incremental.SolverIncremental(gerar_instancia(10, 1))
+    for editar in (lambda: solver.restringir_dominio("J6", ["T1", "T9"]), lambda: solver.relaxar_dominio("J6", ["T9"]),
+                   lambda: solver.adicionar_jogador("N1", ["T9"], 70, "nova")):
+        with pytest.raises(ValueError, match="T9"):
+            editar()
+    assert "N1" not in solver.dados["jogadores"] and solver.dados["jogadores"]["J6"] == ["T1", "T2"]
+    conferir(solver)
@@ -0,0 +1,43 @@
+import pytest
+
+import instrumentacao
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import instancias
+
+OPCOES = [{}, {"backjumping": True, "nogoods": 20}, {"c7_global": False}, {"consistencia": ["sac"]}]
+
+# Reproduzir o rastro gravado refaz o mesmo resumo (contadores e podas por origem) da execução ao vivo
+@pytest.mark.parametrize("opcoes", OPCOES)
+def test_rastro_ida_e_volta(tmp_path, opcoes):
+    casos = list(instancias(15, n_max=10, semente=2700)) + [gerar_instancia(40, 1, folga_limite=0.5, por_posicao=3)]
+    for i, dados in enumerate(casos):
+        caminho = tmp_path / f"rastro{i}.jsonl"
+        with open(caminho, "w") as rastro:
+            ao_vivo = instrumentacao.Instrumentacao(rastro)
+            quantidade, stats = com_ac3.contar_solucoes(dados, instrumentacao=ao_vivo, max_nos=3000, **opcoes)
+        reproduzida = instrumentacao.Instrumentacao()
+        reproduzida.reproduzir(instrumentacao.ler_rastro(caminho))
+        assert reproduzida.resumo() == ao_vivo.resumo()
+        assert ao_vivo.resumo() == {k: stats["instrumentacao"][k] for k in ("contadores", "podas")}
+        contadores = ao_vivo.contadores
+        assert contadores["nos"] == stats["nodes"] and contadores["solucoes"] == quantidade
+        assert sum(ao_vivo.podas.values()) >= contadores["podas_busca"]
+
+# Os callbacks recebem os mesmos eventos, ao vivo e na reprodução
+def test_callbacks():
+    dados = gerar_instancia(12, 3, folga_limite=1.0)
+    vistos = {"ao_vivo": [], "reproduzida": []}
+    ao_vivo = instrumentacao.Instrumentacao()
+    for evento in instrumentacao.EVENTOS:
+        ao_vivo.registrar(evento, vistos["ao_vivo"].append)
+    com_ac3.contar_solucoes(dados, instrumentacao=ao_vivo)
+    reproduzida = instrumentacao.Instrumentacao()
+    for evento in instrumentacao.EVENTOS:
+        reproduzida.registrar(evento, vistos["reproduzida"].append)
+    reproduzida.reproduzir(vistos["ao_vivo"][:])
+    assert vistos["reproduzida"] == vistos["ao_vivo"]
+    assert reproduzida.resumo() == ao_vivo.resumo()
+    with pytest.raises(ValueError):
+        ao_vivo.registrar("desconhecido", print)
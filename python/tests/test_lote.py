@@ -0,0 +1,47 @@
+import json
+
+import psr_lote
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+# Roda a CLI do lote numa instância e devolve a linha de saída
+def rodar(tmp_path, dados, *argumentos):
+    entrada = tmp_path / "instancia.json"
+    saida = tmp_path / "saida.jsonl"
+    entrada.write_text(json.dumps(dados))
+    psr_lote.main([str(entrada), "--sem-cache", "--trabalhadores", "1", "--saida", str(saida), *argumentos])
+    return json.loads(saida.read_text())
+
+def test_contagem(tmp_path):
+    dados = gerar_instancia(12, 2)
+    resultado = rodar(tmp_path, dados, "--contar")
+    assert resultado["solucoes"] == com_ac3.contar_solucoes(dados)[0]
+    assert resultado["completo"]
+
+# Com objetivo a saída é uma divisão só: "solucoes" diz se ela existe e as incumbentes ficam em "melhorias"
+def test_objetivo(tmp_path):
+    resultado = rodar(tmp_path, gerar_instancia(12, 2), "--objetivo", "diferenca_medias")
+    assert resultado["otimo"] and resultado["solucao"] is not None
+    assert resultado["solucoes"] == 1
+    assert resultado["melhorias"] == len(resultado["stats"]["melhorias"]) >= 1
+
+def test_objetivo_sem_solucao(tmp_path):
+    dados = gerar_instancia(12, 2, limite=10)
+    resultado = rodar(tmp_path, dados, "--objetivo", "diferenca_medias")
+    assert resultado["otimo"] and resultado["solucao"] is None
+    assert resultado["solucoes"] == resultado["melhorias"] == 0
+
+# Com vários processos cada instância sai uma vez, com a mesma contagem da busca sequencial, mesmo com mais
+# instâncias que a janela de tarefas em andamento
+def test_varias_instancias_em_paralelo(tmp_path):
+    esperado = {}
+    for semente in range(7):
+        dados = gerar_instancia(10, semente)
+        caminho = tmp_path / f"i{semente}.json"
+        caminho.write_text(json.dumps(dados))
+        esperado[str(caminho)] = com_ac3.contar_solucoes(dados)[0]
+    saida = tmp_path / "saida.jsonl"
+    psr_lote.main([str(tmp_path), "--sem-cache", "--trabalhadores", "2", "--contar", "--saida", str(saida)])
+    resultados = [json.loads(linha) for linha in saida.read_text().splitlines()]
+    assert len(resultados) == len(esperado)
+    assert {r["instancia"]: r["solucoes"] for r in resultados} == esperado
@@ -0,0 +1,25 @@
+import math
+
+import pytest
+
+import psr_otimizacao
+
+from apoio import bruto, instancias
+
+# O ótimo do branch-and-bound é o menor valor entre todas as soluções da força bruta, e a solução devolvida é uma
+# delas com esse valor
+@pytest.mark.parametrize("objetivo", ["diferenca_medias", "diferenca_somas", "posicoes_descobertas",
+                                      {"diferenca_medias": 1, "posicoes_descobertas": 0.5}])
+def test_otimo_igual_a_forca_bruta(objetivo):
+    for dados in instancias(30, n_max=10, semente=1300):
+        esperado = bruto(dados)
+        melhor, stats = psr_otimizacao.otimizar(dados, objetivo)
+        assert stats["otimo"]
+        if not esperado:
+            assert melhor is None and stats["valor"] is None
+            continue
+        avaliar = psr_otimizacao.criar_objetivo(objetivo, dados).valor
+        assert tuple(sorted(melhor.items())) in esperado
+        assert math.isclose(stats["valor"], min(avaliar(dict(s)) for s in esperado), abs_tol=1e-9)
+        valores = [m["valor"] for m in stats["melhorias"]]
+        assert valores == sorted(valores, reverse=True) and len(set(valores)) == len(valores)
@@ -0,0 +1,47 @@
+import pytest
+
+import psr_paralelo
+import psr_python_trab_com_ac3 as com_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias, instancias_times
+
+# Orçamentos minúsculos forçam a redivisão da fronteira em quase todo nó: as tarefas têm de terminar e a união
+# das soluções tem de ser a da força bruta, sem perder nem repetir ramos
+@pytest.mark.parametrize("nos_por_tarefa", [0, 1, 4, 50])
+def test_redivisao_com_orcamento_pequeno(nos_por_tarefa):
+    for dados in [gerar_instancia(10, 3)] + list(instancias(4, n_max=9, semente=30, c7=True)):
+        esperado = bruto(dados)
+        solucoes, stats = psr_paralelo.resolver_paralelo(dados, trabalhadores=2, subproblemas_por_trabalhador=1,
+                                                         nos_por_tarefa=nos_por_tarefa)
+        assert len(solucoes) == len(esperado) == stats["solutions"]
+        assert {chave(s) for s in solucoes} == esperado
+
+def test_fronteira_estende_o_prefixo():
+    dados = gerar_instancia(10, 3)
+    psr_paralelo._iniciar_trabalhador(dados)
+    prefixos, _ = psr_paralelo.dividir(dados, 4)
+    for prefixo in prefixos:
+        _, stats = psr_paralelo._resolver_subproblema(prefixo, 1, True, None, {})
+        for ramo in stats["fronteira"]:
+            assert len(ramo) > len(prefixo) and all(ramo[var] == valor for var, valor in prefixo.items())
+
+def test_contagem_igual_a_sequencial():
+    dados = gerar_instancia(12, 1, densidade_posicoes=0)
+    quantidade, _ = psr_paralelo.resolver_paralelo(dados, trabalhadores=2, nos_por_tarefa=3, apenas_contar=True)
+    assert quantidade == com_ac3.contar_solucoes(dados)[0]
+
+# Com times intercambiáveis o paralelo devolve os mesmos representantes da busca sequencial (um por família de
+# soluções espelhadas), e solucoes_simetricas soma o total, com e sem redivisão
+@pytest.mark.parametrize("nos_por_tarefa", [1, 4, None])
+def test_times_igual_a_sequencial(nos_por_tarefa):
+    for dados in instancias_times(15, semente=2100):
+        stats = {}
+        esperado = [chave(s) for s in com_ac3.iter_solucoes(dados, stats=stats)]
+        solucoes, stats_paralelo = psr_paralelo.resolver_paralelo(dados, trabalhadores=2, subproblemas_por_trabalhador=1,
+                                                                  nos_por_tarefa=nos_por_tarefa)
+        assert len(solucoes) == len(esperado) == stats_paralelo["solutions"]
+        assert {chave(s) for s in solucoes} == set(esperado)
+        assert stats_paralelo["solucoes_simetricas"] == stats["solucoes_simetricas"]
+        quantidade, _ = psr_paralelo.resolver_paralelo(dados, trabalhadores=2, nos_por_tarefa=nos_por_tarefa, apenas_contar=True)
+        assert quantidade == len(esperado)
@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+import psr_python_trab_com_ac3 as com_ac3
+import psr_python_trab_sem_ac3 as sem_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, instancias
+
+# As tabelas extensionais de C2/C3/C7 têm os mesmos arcos das lambdas da versão sem AC-3 e concordam com elas em
+# todo par de valores, chamadas direto ou compiladas em máscaras (DominiosBitset.tabela)
+@pytest.mark.parametrize("valores", [("T1", "T2"), ("T1", "T2", "T3", "T4")])
+def test_tabelas_iguais_as_lambdas(valores):
+    for dados in instancias(20, n_max=10, semente=600):
+        lista = sorted(dados["jogadores"])
+        tabelas, vizinhos, entrantes = com_ac3.construir_restricoes_binarias(lista, dados["posicoes"])
+        lambdas, vizinhos_lambdas = sem_ac3.construir_restricoes_binarias(lista, dados["posicoes"])
+        assert set(tabelas) == set(lambdas) and vizinhos == vizinhos_lambdas
+        assert sorted(arco for arcos in entrantes.values() for arco in arcos) == sorted(tabelas)
+        dominios = com_ac3.DominiosBitset({v: list(valores) for v in lista}, list(valores))
+        for arco, tabela in tabelas.items():
+            assert isinstance(tabela, com_ac3.TabelaRestricao)
+            linhas, colunas = dominios.tabela(tabela)
+            for (i, a), (j, b) in itertools.product(enumerate(dominios.valores), repeat=2):
+                assert tabela(a, b) == lambdas[arco](a, b)
+                assert bool(linhas[i] >> j & 1) == lambdas[arco](a, b)
+                assert bool(colunas[j] >> i & 1) == lambdas[arco](a, b)
+
+# Uma posição com mais jogadores que times não tem solução (casa dos pombos): a C7 global descobre isso no
+# pré-processamento, sem abrir nenhum nó; com a C7 em arcos par a par a resposta é a mesma
+@pytest.mark.parametrize("times", [2, 3])
+def test_posicao_lotada_falha_na_raiz(times):
+    for semente in range(5):
+        dados = gerar_instancia(10, semente, times=times)
+        for j in ("J6", "J7", "J8", "J9")[:times + 1]:
+            dados["posicoes"][j] = "lotada"
+        assert not bruto(dados)
+        modelo = com_ac3.compilar_modelo(dados)
+        assert not modelo.consistente
+        quantidade, stats = com_ac3.contar_solucoes(dados)
+        assert quantidade == 0 and stats["nodes"] == 0
+        assert com_ac3.contar_solucoes(dados, c7_global=False)[0] == 0
@@ -0,0 +1,15 @@
+import psr_python_trab_sem_ac3 as sem_ac3
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias
+
+# O solver sem AC-3 (com C8 no JSON como {"numero": ...} ou só o número) acha as mesmas soluções da força bruta
+def test_igual_a_forca_bruta():
+    for dados in instancias(40, n_max=10, semente=1100):
+        solucoes, _ = sem_ac3.backtracking_solver_sem_ac3(dados)
+        assert {chave(s) for s in solucoes} == bruto(dados)
+
+def test_limite_como_numero():
+    dados = gerar_instancia(10, 4, folga_limite=0.5)
+    dados["limite"] = dados["limite"]["numero"]
+    assert sem_ac3.contar_solucoes(dados)[0] == len(bruto(dados))
@@ -0,0 +1,60 @@
+import csv
+import json
+import random
+
+import pytest
+
+import psr_python_trab_com_ac3 as com_ac3
+import psr_solucoes
+from gerador_instancias import gerar_instancia
+
+from apoio import bruto, chave, instancias
+
+# Soluções aleatórias (com repetições) de n jogadores e os valores dados
+def sorteadas(n, valores, quantidade, semente):
+    rnd = random.Random(semente)
+    jogadores = [f"J{i}" for i in range(1, n + 1)]
+    unicas = [{j: rnd.choice(valores) for j in jogadores} for _ in range(quantidade)]
+    return jogadores, unicas + rnd.sample(unicas, quantidade // 3)
+
+# Ida e volta: o que entra sai igual, na ordem, em memória e depois de ir para o disco (limite de poucos registros)
+@pytest.mark.parametrize("valores", [("T1", "T2"), ("T1", "T2", "T3"), ("T1", "T2", "T3", "T4", "T5")])
+@pytest.mark.parametrize("limite_memoria", [psr_solucoes.LIMITE_MEMORIA, 40])
+def test_ida_e_volta(tmp_path, valores, limite_memoria):
+    jogadores, solucoes = sorteadas(13, valores, 60, semente=len(valores))
+    with psr_solucoes.ArmazemSolucoes(jogadores, valores, limite_memoria=limite_memoria, diretorio=tmp_path) as armazem:
+        armazem.estender(solucoes)
+        assert len(armazem) == len(solucoes)
+        assert (armazem.bytes_usados()[1] > 0) == (limite_memoria == 40)
+        assert list(armazem) == solucoes
+        assert [armazem[i] for i in range(-len(solucoes), 0)] == solucoes
+        assert armazem[5:50:7] == solucoes[5:50:7]
+        assert all(s in armazem for s in solucoes)
+        uniforme = {j: valores[0] for j in jogadores}
+        assert (uniforme in armazem) == (uniforme in solucoes)
+
+        armazem.exportar(tmp_path / "s.jsonl")
+        armazem.exportar(tmp_path / "s.csv", formato="csv")
+    with open(tmp_path / "s.jsonl") as arquivo:
+        assert [json.loads(linha) for linha in arquivo] == solucoes
+    with open(tmp_path / "s.csv", newline="") as arquivo:
+        assert list(csv.DictReader(arquivo)) == solucoes
+
+@pytest.mark.parametrize("limite_memoria", [psr_solucoes.LIMITE_MEMORIA, 40])
+def test_deduplicar(tmp_path, limite_memoria):
+    jogadores, solucoes = sorteadas(11, ("T1", "T2"), 50, semente=7)
+    unicas = list({chave(s): s for s in solucoes}.values())
+    with psr_solucoes.ArmazemSolucoes(jogadores, limite_memoria=limite_memoria, deduplicar=True, diretorio=tmp_path) as armazem:
+        assert armazem.estender(solucoes) == len(unicas)
+        assert armazem.duplicadas == len(solucoes) - len(unicas)
+        assert list(armazem) == unicas
+        assert [armazem.indice(s) for s in unicas] == list(range(len(unicas)))
+
+# armazenar_solucoes guarda exatamente as soluções da força bruta, com dois e com k times
+def test_armazenar_igual_a_forca_bruta():
+    casos = list(instancias(20, n_max=10, semente=1500)) + [gerar_instancia(8, s, times=3) for s in range(3)]
+    for dados in casos:
+        armazem, stats = com_ac3.armazenar_solucoes(dados, simetria=False)
+        with armazem:
+            assert {chave(s) for s in armazem} == bruto(dados)
+            assert len(armazem) == stats["solutions"]
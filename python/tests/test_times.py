@@ -0,0 +1,26 @@
+import pytest
+
+import psr_python_trab_com_ac3 as com_ac3
+from apoio import bruto, chave, instancias_times
+
+# Sem quebra de simetria a busca acha todas as soluções da força bruta; com ela, um representante por órbita
+# (as formas canônicas distintas da força bruta), e solucoes_simetricas recupera o total
+@pytest.mark.parametrize("opcoes", [{}, {"propagar_globais": False}, {"c7_global": False}, {"backjumping": True, "nogoods": 50},
+                                    {"heuristica": "dom_wdeg"}, {"consistencia": ["sac"]}])
+def test_orbitas_iguais_a_forca_bruta(opcoes):
+    for dados in instancias_times(25, semente=2100):
+        esperado = bruto(dados)
+        lista = sorted(dados["jogadores"])
+        simetria = com_ac3.SimetriaTimes(com_ac3.compilar_modelo(dados).classes_times, lista)
+        orbitas = {chave(simetria.canonizar(dict(s))) for s in esperado}
+
+        stats = {}
+        todas = [chave(s) for s in com_ac3.iter_solucoes(dados, stats=stats, simetria=False, **opcoes)]
+        assert len(todas) == len(esperado) and set(todas) == esperado
+        assert stats["solucoes_simetricas"] == len(esperado)
+
+        stats = {}
+        representantes = [chave(s) for s in com_ac3.iter_solucoes(dados, stats=stats, **opcoes)]
+        assert len(representantes) == len(orbitas) and set(representantes) == orbitas
+        assert stats["solucoes_simetricas"] == len(esperado)
+        assert com_ac3.contar_solucoes(dados, **opcoes)[1]["solucoes_simetricas"] == len(esperado)